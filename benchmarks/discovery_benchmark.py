@@ -0,0 +1,122 @@
+"""摄像头发现检查
+
+在临时目录中构造一个假的 /sys/class/video4linux 目录树（每个摄像头一个index为0的采集节点和
+一个index为1的元数据节点，另有不带index属性的旧内核节点和非videoN条目），检查：
+
+- enumerate_v4l2_devices只返回采集节点，并读出设备名称
+- probe_cameras并行探测，总耗时接近单次探测而不是各次之和
+- 卡住的探测（--slow-probe-s 秒）在 --timeout 截止时间到达时被放弃，不计入结果，也不拖慢整体返回
+
+任何一项不满足时以退出码1结束，可用于回归检查。不需要真实摄像头。
+
+用法:
+    python benchmarks/discovery_benchmark.py
+    python benchmarks/discovery_benchmark.py --timeout 0.5 --slow-probe-s 5 --output discovery.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from camera_discovery import enumerate_v4l2_devices, probe_cameras, discover_cameras  # noqa: E402
+
+# 假目录树中的条目: 名称 -> (index属性, name属性)，index为None时不创建index文件
+FAKE_NODES = {
+    "video0": ("0", "Integrated Camera"),
+    "video1": ("1", "Integrated Camera"),
+    "video2": ("0", "USB Camera"),
+    "video3": ("1", "USB Camera"),
+    "video10": (None, "Legacy Camera"),
+    "v4l-subdev0": ("0", "sensor"),
+}
+EXPECTED_IDS = [0, 2, 10]
+SLOW_ID = 2  # 探测时卡住的摄像头
+
+
+def build_fake_sysfs(root):
+    for entry, (index, name) in FAKE_NODES.items():
+        device_dir = os.path.join(root, entry)
+        os.makedirs(device_dir)
+        if index is not None:
+            with open(os.path.join(device_dir, "index"), "w", encoding="utf-8") as f:
+                f.write(index + "\n")
+        with open(os.path.join(device_dir, "name"), "w", encoding="utf-8") as f:
+            f.write(name + "\n")
+
+
+def make_probe(delay, slow_delay):
+    """每次探测耗时delay秒，SLOW_ID耗时slow_delay秒的假探测函数"""
+    def probe(camera_id):
+        time.sleep(slow_delay if camera_id == SLOW_ID else delay)
+        return {'width': 640, 'height': 480, 'fps': 30.0}
+    return probe
+
+
+def timed_probe(camera_ids, timeout, probe):
+    start = time.monotonic()
+    results = probe_cameras(camera_ids, timeout=timeout, probe=probe)
+    return results, time.monotonic() - start
+
+
+def run(args):
+    checks = []
+    
+    def check(name, passed, detail):
+        checks.append({"name": name, "passed": bool(passed), "detail": detail})
+    
+    with tempfile.TemporaryDirectory() as root:
+        build_fake_sysfs(root)
+        devices = enumerate_v4l2_devices(root)
+        ids = [device['id'] for device in devices]
+        check("只枚举采集节点", ids == EXPECTED_IDS, f"{ids}，期望 {EXPECTED_IDS}")
+        names = {device['id']: device['name'] for device in devices}
+        check("读取设备名称", names.get(2) == "USB Camera" and names.get(10) == "Legacy Camera", f"{names}")
+        check("目录不存在时返回空列表", enumerate_v4l2_devices(os.path.join(root, "missing")) == [], "")
+        
+        # 正常探测：并行时总耗时应接近单次探测耗时
+        results, elapsed = timed_probe(ids, args.timeout, make_probe(args.probe_s, args.probe_s))
+        check("并行探测", sorted(results) == ids and elapsed < args.probe_s * 2,
+              f"{len(ids)} 个各 {args.probe_s * 1000:.0f}ms，共 {elapsed * 1000:.0f}ms")
+        
+        # 卡住的探测：应在截止时间附近返回，并且不出现在结果中
+        results, elapsed = timed_probe(ids, args.timeout, make_probe(args.probe_s, args.slow_probe_s))
+        expected = [camera_id for camera_id in ids if camera_id != SLOW_ID]
+        check("超时截止", sorted(results) == expected and elapsed < args.timeout + 0.2,
+              f"摄像头 {SLOW_ID} 卡住 {args.slow_probe_s:g}s，{elapsed * 1000:.0f}ms 后返回 {sorted(results)}，"
+              f"截止 {args.timeout * 1000:.0f}ms")
+        
+        # 完整发现流程：名称来自sysfs，卡住的摄像头被跳过
+        cameras = discover_cameras(root, timeout=args.timeout, probe=make_probe(args.probe_s, args.slow_probe_s))
+        if sys.platform.startswith("linux"):
+            found = [(camera['id'], camera['device_name']) for camera in cameras]
+            check("发现流程", found == [(0, "Integrated Camera"), (10, "Legacy Camera")], f"{found}")
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="摄像头发现检查")
+    parser.add_argument("--timeout", type=float, default=0.5, help="探测截止时间（秒）")
+    parser.add_argument("--probe-s", type=float, default=0.1, help="正常摄像头的探测耗时（秒）")
+    parser.add_argument("--slow-probe-s", type=float, default=5.0, help="卡住的摄像头的探测耗时（秒）")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    checks = run(args)
+    for item in checks:
+        print(f"  {item['name']:<12} {'通过' if item['passed'] else '未通过'}  {item['detail']}")
+    passed = all(item["passed"] for item in checks)
+    print(f"摄像头发现检查: {'通过' if passed else '未通过'}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"checks": checks, "passed": passed}, f, indent=2, ensure_ascii=False)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""指针滤波器滞后与抖动评估
+
+将同一条轨迹分别输入各个指针滤波器，比较输出相对参考轨迹的滞后（ms）、误差和静止时的抖动。
+轨迹可以是带噪声的合成轨迹（参考轨迹为无噪声真值），也可以是关键点录制文件中的右手食指尖
+（参考轨迹为零相位滑动平均）。
+
+每个滤波器有滞后和抖动预算（FILTER_BUDGETS，可用 --budget 覆盖），抖动预算是相对未滤波输入抖动的比例，
+不随噪声水平和录制文件变化。任一滤波器超出预算时以退出码1结束，可用于回归检查。
+
+用法:
+    python benchmarks/filter_benchmark.py
+    python benchmarks/filter_benchmark.py --landmarks recordings/session.rml --prediction-ms 40
+    python benchmarks/filter_benchmark.py --budget one_euro=40:0.3 --budget kalman=40:0.5
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_FPS  # noqa: E402
+from pointer_filters import POINTER_FILTERS, create_pointer_filter  # noqa: E402
+from landmark_recording import LandmarkReplay  # noqa: E402
+
+SCREEN_SIZE = (1920, 1080)
+STATIC_SPEED = 20.0  # 参考速度低于该值（像素/秒）视为静止
+STATIC_SETTLE_S = 0.5  # 参考轨迹持续静止该时长后才计入抖动，排除运动结束后的追赶过程
+MAX_LAG_FRAMES = 10
+
+# 各滤波器的预算: (最大滞后ms, 最大抖动/未滤波抖动)，30fps下滞后以33ms为步长
+FILTER_BUDGETS = {
+    "ema": (120.0, 0.4),
+    "one_euro": (50.0, 0.4),
+    "kalman": (50.0, 0.6),
+}
+
+
+def synthetic_trajectory(noise=2.0, fps=CAMERA_FPS, seed=0):
+    """生成 静止-匀速-静止-正弦-静止 的轨迹，返回 (timestamps, noisy, reference)"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    position = np.array([400.0, 500.0])
+    
+    def hold(seconds):
+        return np.repeat(position[None, :], int(seconds * fps), axis=0)
+    
+    segments.append(hold(2))
+    steps = int(1.0 * fps)
+    ramp = position + np.outer(np.arange(1, steps + 1) / fps, [600.0, 150.0])
+    segments.append(ramp)
+    position = ramp[-1]
+    segments.append(hold(2))
+    t = np.arange(1, int(3 * fps) + 1) / fps
+    wave = position + np.stack([200 * np.sin(2 * np.pi * 0.7 * t), 120 * np.sin(2 * np.pi * 1.1 * t)], axis=1)
+    segments.append(wave)
+    position = wave[-1]
+    segments.append(hold(2))
+    
+    reference = np.concatenate(segments)
+    timestamps = np.arange(len(reference)) / fps + rng.normal(0, 0.002, len(reference))
+    timestamps = np.maximum.accumulate(timestamps)
+    noisy = reference + rng.normal(0, noise, reference.shape)
+    return timestamps, noisy, reference
+
+
+def replay_trajectory(path, window=5):
+    """从关键点录制文件中提取右手食指尖轨迹，返回 (timestamps, measured, reference)"""
+    replay = LandmarkReplay(path)
+    timestamps, points = [], []
+    for timestamp, _, analysis in replay.iter_analyses():
+        if analysis is not None:
+            timestamps.append(timestamp)
+            points.append((analysis.index_tip[0] * SCREEN_SIZE[0], analysis.index_tip[1] * SCREEN_SIZE[1]))
+    if len(points) < window * 2:
+        raise ValueError(f"录制文件中的右手帧数过少: {path}")
+    measured = np.asarray(points)
+    kernel = np.ones(window) / window
+    pad = window // 2
+    padded = np.pad(measured, ((pad, pad), (0, 0)), mode="edge")
+    reference = np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(2)], axis=1)
+    return np.asarray(timestamps), measured, reference
+
+
+def run_filter(pointer_filter, timestamps, measured):
+    output = np.empty_like(measured)
+    for i, (timestamp, (x, y)) in enumerate(zip(timestamps, measured)):
+        output[i] = pointer_filter.filter(x, y, timestamp)
+    return output
+
+
+def evaluate(output, reference, timestamps):
+    """计算滞后、误差和抖动"""
+    frame_time = float(np.median(np.diff(timestamps)))
+    
+    # 滞后：使输出与平移后的参考轨迹误差最小的帧偏移，正值表示输出落后
+    errors = {}
+    n = len(reference)
+    for shift in range(-MAX_LAG_FRAMES, MAX_LAG_FRAMES + 1):
+        if shift >= 0:
+            diff = output[shift:] - reference[:n - shift]
+        else:
+            diff = output[:n + shift] - reference[-shift:]
+        errors[shift] = float(np.sqrt(np.mean(np.sum(diff ** 2, axis=1))))
+    best_shift = min(errors, key=errors.get)
+    
+    # 抖动：参考轨迹静止时输出逐帧位移的均方根
+    ref_speed = np.linalg.norm(np.diff(reference, axis=0), axis=1) / frame_time
+    out_step = np.linalg.norm(np.diff(output, axis=0), axis=1)
+    settle = max(1, int(round(STATIC_SETTLE_S / frame_time)))
+    moving = (ref_speed >= STATIC_SPEED).astype(np.int64)
+    recent_motion = np.convolve(moving, np.ones(settle, dtype=np.int64))[:len(moving)]
+    static = recent_motion == 0
+    jitter = float(np.sqrt(np.mean(out_step[static] ** 2))) if static.any() else 0.0
+    
+    return {
+        "lag_ms": best_shift * frame_time * 1000.0,
+        "rms_error_px": errors[0],
+        "jitter_px": jitter,
+    }
+
+
+def parse_budget(text):
+    """解析 名称=滞后ms:抖动比例"""
+    try:
+        name, values = text.split("=")
+        lag_ms, jitter_ratio = values.split(":")
+        return name, (float(lag_ms), float(jitter_ratio))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"预算格式应为 名称=滞后ms:抖动比例，例如 one_euro=50:0.4: {text}")
+
+
+def check_budgets(filters, budgets):
+    """逐个滤波器检查预算，返回未达标的说明列表"""
+    raw_jitter = filters["raw"]["jitter_px"]
+    failures = []
+    for name, (max_lag_ms, max_jitter_ratio) in budgets.items():
+        stats = filters.get(name)
+        if stats is None:
+            continue
+        jitter_ratio = stats["jitter_px"] / raw_jitter if raw_jitter > 0 else 0.0
+        stats["jitter_ratio"] = jitter_ratio
+        stats["passed"] = stats["lag_ms"] <= max_lag_ms and jitter_ratio <= max_jitter_ratio
+        if stats["lag_ms"] > max_lag_ms:
+            failures.append(f"{name}: 滞后 {stats['lag_ms']:.1f}ms > {max_lag_ms:g}ms")
+        if jitter_ratio > max_jitter_ratio:
+            failures.append(f"{name}: 抖动 {jitter_ratio:.2f} 倍原始 > {max_jitter_ratio:g}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="指针滤波器滞后与抖动评估")
+    parser.add_argument("--landmarks", help="关键点录制文件，不指定时使用合成轨迹")
+    parser.add_argument("--noise", type=float, default=2.0, help="合成轨迹的噪声标准差（像素）")
+    parser.add_argument("--prediction-ms", type=float, default=0.0, help="滤波器预测外推时间")
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[], metavar="名称=滞后ms:抖动比例",
+                        help="覆盖某个滤波器的预算，可多次指定")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    budgets = dict(FILTER_BUDGETS)
+    budgets.update(args.budget)
+    
+    if args.landmarks:
+        timestamps, measured, reference = replay_trajectory(args.landmarks)
+        source = args.landmarks
+    else:
+        timestamps, measured, reference = synthetic_trajectory(noise=args.noise)
+        source = f"synthetic:noise={args.noise}"
+    
+    report = {"source": source, "prediction_ms": args.prediction_ms, "filters": {}}
+    report["filters"]["raw"] = evaluate(measured, reference, timestamps)
+    for name in POINTER_FILTERS:
+        pointer_filter = create_pointer_filter(name, prediction_ms=args.prediction_ms)
+        output = run_filter(pointer_filter, timestamps, measured)
+        report["filters"][name] = evaluate(output, reference, timestamps)
+    
+    failures = check_budgets(report["filters"], budgets)
+    report["budgets"] = budgets
+    report["passed"] = not failures
+    
+    print(f"{source}, 预测 {args.prediction_ms:.0f} ms, {len(measured)} 帧")
+    for name, stats in report["filters"].items():
+        budget = budgets.get(name)
+        budget_text = f"  预算 {budget[0]:g}ms/{budget[1]:g}倍" if budget else ""
+        print(f"  {name:<9} 滞后={stats['lag_ms']:6.1f}ms  误差={stats['rms_error_px']:6.2f}px  "
+              f"抖动={stats['jitter_px']:5.2f}px{budget_text}")
+    for failure in failures:
+        print(f"  {failure}")
+    print(f"滤波器预算: {'通过' if not failures else '未通过'}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
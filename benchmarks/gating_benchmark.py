@@ -0,0 +1,145 @@
+"""推理调度测试：空闲时进入画面的手
+
+用合成画面模拟：空场景持续 --empty-s 秒，前一段有一个非手的物体在背景中移动（运动门控放行，
+检测连续无手后进入空闲，频率降为IDLE_DETECTION_RATE_HZ），最后 --settle-s 秒画面静止，
+随后一只"手"（亮色矩形）在几帧内移入画面并保持静止 --hold-s 秒。检测器用真值代替（画面中有矩形即有手），
+使用真实的IdlePolicy和MotionGate，按模拟时钟逐帧调用should_run_inference，统计手进入后的检测次数和
+从开始进入到首次检测到手的延迟。
+
+作为对照，同时运行旧的调度顺序（运动门控在空闲策略之前）：带运动的帧被门控放行并成为参考帧后又被
+空闲策略丢弃，之后静止的手不再产生运动，一直得不到检测。
+
+新顺序在 --budget-ms 内没有检测到手时以退出码1结束，可用于回归检查。
+
+用法:
+    python benchmarks/gating_benchmark.py
+    python benchmarks/gating_benchmark.py --empty-s 5 --settle-s 0 --hold-s 3 --budget-ms 300 --output gating.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_FPS, CAMERA_WIDTH, CAMERA_HEIGHT  # noqa: E402
+from inference_gating import IdlePolicy, MotionGate, should_run_inference  # noqa: E402
+
+HAND_SIZE = (120, 160)  # 模拟手部矩形 (宽, 高)
+ENTER_FRAMES = 4  # 手从画面边缘移到停留位置经过的帧数
+OBJECT_SIZE = 100  # 背景中移动物体的边长
+
+
+def make_frames(fps, width, height, empty_s, settle_s, hold_s, seed=0):
+    """生成 (画面, 是否有手) 序列，以及手开始进入的帧序号"""
+    rng = np.random.default_rng(seed)
+    background = np.full((height, width, 3), 90, dtype=np.uint8)
+    hand_w, hand_h = HAND_SIZE
+    top = (height - hand_h) // 2
+    stop_x = width // 2
+    enter_index = int(empty_s * fps)
+    settle_index = max(0, enter_index - int(settle_s * fps))
+    frames = []
+    for index in range(enter_index + int(hold_s * fps)):
+        # 低于像素阈值的传感器噪声
+        frame = np.clip(background + rng.normal(0, 3, background.shape), 0, 255).astype(np.uint8)
+        # 背景物体在画面上方往返移动，静止阶段停在最后的位置
+        object_x = int(abs((min(index, settle_index) * 24) % (2 * (width - OBJECT_SIZE)) - (width - OBJECT_SIZE)))
+        frame[20:20 + OBJECT_SIZE, object_x:object_x + OBJECT_SIZE] = 40
+        step = index - enter_index
+        hand_present = step >= 0
+        if hand_present:
+            x = stop_x - int((stop_x + hand_w) * max(0, ENTER_FRAMES - 1 - step) / ENTER_FRAMES)
+            x0 = max(0, x)
+            if x + hand_w > 0:
+                frame[top:top + hand_h, x0:x + hand_w] = (180, 200, 230)
+            else:
+                hand_present = False
+        frames.append((frame, hand_present))
+    return frames, enter_index
+
+
+def legacy_should_run(frame, hand_present, idle_policy, motion_gate, now):
+    """旧的调度顺序：先经过运动门控，再经过空闲策略"""
+    if not motion_gate.should_run(frame, hand_present):
+        return False
+    if not idle_policy.should_run(now):
+        return False
+    idle_policy.record_run(now)
+    return True
+
+
+def run(frames, enter_index, fps, legacy):
+    idle_policy = IdlePolicy()
+    motion_gate = MotionGate()
+    hand_present = False  # 上一次检测的结果
+    runs_before, runs_after = 0, 0
+    first_detection = None
+    idle_at_entry = False
+    for index, (frame, truth) in enumerate(frames):
+        now = index / fps
+        if index == enter_index:
+            idle_at_entry = idle_policy.idle
+        if legacy:
+            run_inference = legacy_should_run(frame, hand_present, idle_policy, motion_gate, now)
+        else:
+            run_inference = should_run_inference(frame, hand_present, idle_policy, motion_gate, now=now)
+        if not run_inference:
+            continue
+        hand_present = truth
+        idle_policy.report(hand_present)
+        if index < enter_index:
+            runs_before += 1
+            continue
+        runs_after += 1
+        if hand_present and first_detection is None:
+            first_detection = index
+    return {
+        "order": "legacy" if legacy else "current",
+        "idle_at_entry": idle_at_entry,
+        "runs_before_entry": runs_before,
+        "runs_after_entry": runs_after,
+        "detection_latency_ms": (first_detection - enter_index) / fps * 1000.0 if first_detection is not None
+        else None,
+        "gate_hits": motion_gate.hits,
+        "gate_skips": motion_gate.skips,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="推理调度测试：空闲时进入画面的手")
+    parser.add_argument("--fps", type=float, default=CAMERA_FPS, help="模拟帧率")
+    parser.add_argument("--empty-s", type=float, default=3.0, help="手进入前空场景的时长（秒）")
+    parser.add_argument("--settle-s", type=float, default=0.1,
+                        help="手进入前画面完全静止的时长（秒），短于空闲检测间隔时手在两次空闲检测之间进入")
+    parser.add_argument("--hold-s", type=float, default=3.0, help="手进入后保持静止的时长（秒）")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="从手开始进入到首次检测到手的延迟上限（毫秒）")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    frames, enter_index = make_frames(args.fps, CAMERA_WIDTH, CAMERA_HEIGHT, args.empty_s, args.settle_s,
+                                     args.hold_s)
+    results = [run(frames, enter_index, args.fps, legacy) for legacy in (True, False)]
+    for result in results:
+        latency = result["detection_latency_ms"]
+        print(f"{'旧顺序' if result['order'] == 'legacy' else '当前顺序'}: "
+              f"进入时{'空闲' if result['idle_at_entry'] else '未空闲'}, 进入前检测 {result['runs_before_entry']} 次, "
+              f"进入后检测 {result['runs_after_entry']} 次, "
+              f"首次检测到手 {'未检测到' if latency is None else f'{latency:.0f}ms'}, "
+              f"门控放行 {result['gate_hits']} / 跳过 {result['gate_skips']}")
+    
+    latency = results[-1]["detection_latency_ms"]
+    passed = latency is not None and latency <= args.budget_ms
+    print(f"空闲时进入的手 {args.budget_ms:.0f}ms 内被检测到: {'通过' if passed else '未通过'}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "passed": passed}, f, indent=2, ensure_ascii=False)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
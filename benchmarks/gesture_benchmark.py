@@ -0,0 +1,276 @@
+"""手势点击去抖评估
+
+比较原来的"单帧检测 + 3秒点击间隔"与GestureStateMachine（N-of-M投票 + 滞回）在带标注的手势序列上的表现：
+有效点击检出率、误触发次数、双击和拖动是否成功、按下到注入的延迟（帧）。
+
+标注序列由脚本合成：空闲、指向、快速连续点击、双击、按住拖动等片段，每帧按 --noise 的概率替换为
+随机的错误分类，并按 --dropout 的概率丢失手部。也可以用 --landmarks 回放关键点录制文件，
+此时没有标注，只输出两种方法产生的按键事件时间线。
+
+状态机在任一噪声水平下平均每轮漏检超过 --max-missed 次、误触发超过 --max-extra 次，
+或平均按下延迟超过 --max-latency-frames 帧时以退出码1结束，可用于回归检查（原实现只作对照，不参与判定）。
+
+用法:
+    python benchmarks/gesture_benchmark.py
+    python benchmarks/gesture_benchmark.py --noise 0.1 0.2 --seeds 20
+    python benchmarks/gesture_benchmark.py --max-missed 0.5 --max-extra 0.5 --max-latency-frames 3
+    python benchmarks/gesture_benchmark.py --landmarks recordings/session.rml
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_FPS, DOUBLE_CLICK_INTERVAL  # noqa: E402
+from gesture_recognizer import HandAnalysis, INDEX_FINGER_TIP  # noqa: E402
+from gesture_controller import GestureController  # noqa: E402
+from mouse_controller import MouseController  # noqa: E402
+from mouse_backends import RecordingMouseAPI  # noqa: E402
+from landmark_recording import LandmarkReplay  # noqa: E402
+
+LEGACY_CLICK_INTERVAL = 3.0  # 原实现的点击间隔（秒）
+
+# 每种手势对应的 (食指, 中指, 无名指, 小指) 伸直状态
+POSES = {
+    "point": [True, False, False, False],
+    "press": [True, True, False, False],
+    "fist": [False, False, False, False],
+}
+
+# 标注脚本: (手势, 时长秒, 片段类型)，片段类型用于统计
+SCRIPT = [
+    ("fist", 1.0, None),
+    ("point", 1.5, None),
+    ("press", 0.2, "click"),
+    ("point", 0.6, None),
+    ("press", 0.2, "click"),
+    ("point", 0.3, None),
+    ("press", 0.2, "click"),  # 与上一次点击间隔不到3秒的连续点击
+    ("point", 1.0, None),
+    ("press", 0.15, "double"),
+    ("point", 0.2, None),
+    ("press", 0.15, "double"),
+    ("point", 1.0, None),
+    ("press", 1.2, "drag"),
+    ("point", 1.0, None),
+    (None, 0.5, None),  # 手离开画面
+    ("point", 1.0, None),
+    ("press", 0.25, "click"),
+    ("fist", 1.0, None),
+]
+
+
+def make_analysis(pose, x, y):
+    """构造食指尖位于 (x, y) 的HandAnalysis"""
+    landmarks = np.zeros((21, 3), dtype=np.float32)
+    landmarks[INDEX_FINGER_TIP] = (x, y, 0.0)
+    return HandAnalysis(landmarks, "Right", 1.0, POSES[pose], True)
+
+
+def synthetic_sequence(noise, dropout, fps=CAMERA_FPS, seed=0):
+    """按SCRIPT生成带噪声的逐帧分析结果
+
+    返回 (timestamps, analyses, segments)，segments为 (类型, 开始时间, 结束时间) 列表
+    """
+    rng = np.random.default_rng(seed)
+    timestamps, analyses, segments = [], [], []
+    t = 0.0
+    x, y = 0.5, 0.5
+    for pose, duration, kind in SCRIPT:
+        frames = max(1, int(round(duration * fps)))
+        if kind is not None:
+            segments.append((kind, t, t + frames / fps))
+        for _ in range(frames):
+            # 拖动和指向时食指尖缓慢移动
+            if pose in ("point", "press"):
+                x = float(np.clip(x + rng.normal(0, 0.004), 0.1, 0.9))
+                y = float(np.clip(y + rng.normal(0, 0.004), 0.1, 0.9))
+            observed = pose
+            if rng.random() < noise:
+                observed = rng.choice([p for p in POSES if p != pose])
+            if observed is None or rng.random() < dropout:
+                analysis = None
+            else:
+                analysis = make_analysis(observed, x, y)
+            timestamps.append(t)
+            analyses.append(analysis)
+            t += 1.0 / fps
+    return np.asarray(timestamps), analyses, segments
+
+
+def run_legacy(timestamps, analyses):
+    """原实现：任意一帧食指+中指且距上次点击超过3秒即点击，返回按键事件 [(时间, 'click')]"""
+    events = []
+    last_click = -LEGACY_CLICK_INTERVAL
+    for timestamp, analysis in zip(timestamps, analyses):
+        if analysis is not None and analysis.index_and_middle and timestamp - last_click >= LEGACY_CLICK_INTERVAL:
+            events.append((float(timestamp), 'click'))
+            last_click = timestamp
+    return events
+
+
+def run_state_machine(timestamps, analyses):
+    """GestureController + GestureStateMachine，返回按键事件 [(时间, 'down'/'up')]"""
+    mouse_api = RecordingMouseAPI()
+    controller = GestureController(MouseController(mouse_api), mode="absolute", active_region=(0.0, 0.0, 1.0, 1.0))
+    events = []
+    for timestamp, analysis in zip(timestamps, analyses):
+        count = len(mouse_api.events)
+        controller.update(analysis, timestamp=float(timestamp))
+        # 使用帧时间而不是记录替身的墙钟时间，便于与标注对齐
+        events.extend((float(timestamp), kind) for _, kind, _ in mouse_api.events[count:]
+                      if kind in ('down', 'up', 'click'))
+    return events
+
+
+def evaluate(events, segments, fps=CAMERA_FPS):
+    """将按下事件与标注片段匹配，统计检出、误触发、双击、拖动和按下延迟"""
+    presses = [t for t, kind in events if kind in ('down', 'click')]
+    releases = [t for t, kind in events if kind == 'up']
+    tolerance = 0.2  # 片段结束后允许的检测延迟（秒）
+    matched = set()
+    latencies = []
+    detected = {"click": 0, "double": 0, "drag": 0}
+    totals = {"click": 0, "double": 0, "drag": 0}
+    double_ok = 0
+    drags_ok = 0
+    previous_double = None  # 双击第一下的按下时间，未检出时为None
+
+    for kind, start, end in segments:
+        totals[kind] += 1
+        hits = [i for i, t in enumerate(presses) if start <= t <= end + tolerance and i not in matched]
+        if hits:
+            index = hits[0]
+            matched.add(index)
+            detected[kind] += 1
+            latencies.append((presses[index] - start) * fps)
+        if kind == "double":
+            # 双击片段成对出现，第二下与第一下的间隔不超过DOUBLE_CLICK_INTERVAL才算成功
+            if totals[kind] % 2 == 1:
+                previous_double = presses[hits[0]] if hits else None
+            elif hits and previous_double is not None and presses[hits[0]] - previous_double <= DOUBLE_CLICK_INTERVAL:
+                double_ok += 1
+        if kind == "drag" and hits:
+            # 按住期间左键一直保持按下：下一次释放在片段结束之后
+            press_time = presses[hits[0]]
+            next_release = next((t for t in releases if t > press_time), None)
+            if next_release is not None and next_release >= end - tolerance:
+                drags_ok += 1
+
+    expected = sum(totals.values())
+    return {
+        "expected_presses": expected,
+        "detected": sum(detected.values()),
+        "recall": sum(detected.values()) / expected if expected else 0.0,
+        "false_triggers": len(presses) - len(matched),
+        "double_clicks_ok": f"{double_ok}/{totals['double'] // 2}",
+        "drags_ok": f"{drags_ok}/{totals['drag']}",
+        "press_latency_frames": float(np.mean(latencies)) if latencies else None,
+        "by_kind": {kind: f"{detected[kind]}/{totals[kind]}" for kind in totals},
+    }
+
+
+def aggregate(results):
+    """合并多个随机种子的结果"""
+    expected = sum(r["expected_presses"] for r in results)
+    detected = sum(r["detected"] for r in results)
+    latencies = [r["press_latency_frames"] for r in results if r["press_latency_frames"] is not None]
+
+    def ratio_sum(key):
+        numerators, denominators = zip(*(map(int, r[key].split("/")) for r in results))
+        return f"{sum(numerators)}/{sum(denominators)}"
+
+    return {
+        "recall": detected / expected if expected else 0.0,
+        "missed_per_run": (expected - detected) / len(results),
+        "false_triggers_per_run": sum(r["false_triggers"] for r in results) / len(results),
+        "double_clicks_ok": ratio_sum("double_clicks_ok"),
+        "drags_ok": ratio_sum("drags_ok"),
+        "press_latency_frames": float(np.mean(latencies)) if latencies else None,
+    }
+
+
+def replay_events(path):
+    """回放关键点录制文件，输出两种方法的按键事件"""
+    replay = LandmarkReplay(path)
+    timestamps, analyses = [], []
+    for timestamp, _, analysis in replay.iter_analyses():
+        timestamps.append(timestamp)
+        analyses.append(analysis)
+    timestamps = np.asarray(timestamps)
+    return {
+        "frames": len(analyses),
+        "legacy": run_legacy(timestamps, analyses),
+        "state_machine": run_state_machine(timestamps, analyses),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="手势点击去抖评估")
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0, 0.05, 0.1, 0.2],
+                        help="每帧分类错误的概率，可指定多个")
+    parser.add_argument("--dropout", type=float, default=0.02, help="每帧丢失手部的概率")
+    parser.add_argument("--seeds", type=int, default=10, help="每个噪声水平运行的随机种子数")
+    parser.add_argument("--landmarks", action="append", default=[], help="关键点录制文件，可多次指定")
+    parser.add_argument("--max-missed", type=float, default=1.0, help="状态机平均每轮漏检次数的上限")
+    parser.add_argument("--max-extra", type=float, default=1.0, help="状态机平均每轮误触发次数的上限")
+    parser.add_argument("--max-latency-frames", type=float, default=4.0, help="状态机平均按下延迟的上限（帧）")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+
+    report = {"synthetic": [], "recordings": []}
+    failures = []
+    print(f"{'噪声':>6} {'方法':<14}{'检出率':>8}{'漏检/次':>9}{'误触发/次':>10}{'双击':>8}{'拖动':>8}{'按下延迟(帧)':>14}")
+    for noise in args.noise:
+        results = {"legacy": [], "state_machine": []}
+        for seed in range(args.seeds):
+            timestamps, analyses, segments = synthetic_sequence(noise, args.dropout, seed=seed)
+            results["legacy"].append(evaluate(run_legacy(timestamps, analyses), segments))
+            results["state_machine"].append(evaluate(run_state_machine(timestamps, analyses), segments))
+        for method, runs in results.items():
+            summary = aggregate(runs)
+            report["synthetic"].append({"noise": noise, "method": method, **summary})
+            latency = summary["press_latency_frames"]
+            print(f"{noise:>6.2f} {method:<14}{summary['recall']:>8.0%}{summary['missed_per_run']:>9.2f}"
+                  f"{summary['false_triggers_per_run']:>10.2f}{summary['double_clicks_ok']:>8}{summary['drags_ok']:>8}"
+                  f"{latency if latency is None else round(latency, 1):>14}")
+            if method == "state_machine":
+                if summary["missed_per_run"] > args.max_missed:
+                    failures.append(f"噪声 {noise:.2f}: 漏检 {summary['missed_per_run']:.2f}/次 > {args.max_missed:g}")
+                if summary["false_triggers_per_run"] > args.max_extra:
+                    failures.append(f"噪声 {noise:.2f}: 误触发 {summary['false_triggers_per_run']:.2f}/次 "
+                                    f"> {args.max_extra:g}")
+                if latency is None or latency > args.max_latency_frames:
+                    failures.append(f"噪声 {noise:.2f}: 按下延迟 {latency if latency is None else round(latency, 1)} 帧 "
+                                    f"> {args.max_latency_frames:g}")
+
+    for path in args.landmarks:
+        result = replay_events(path)
+        result["source"] = path
+        report["recordings"].append(result)
+        print(f"\n{path}: {result['frames']} 帧")
+        for method in ("legacy", "state_machine"):
+            events = result[method]
+            timeline = ", ".join(f"{t:.2f}s {kind}" for t, kind in events[:20])
+            print(f"  {method:<14}{len(events):>4} 个事件: {timeline}{' ...' if len(events) > 20 else ''}")
+
+    passed = not failures
+    report["passed"] = passed
+    for failure in failures:
+        print(f"  {failure}")
+    print(f"\n点击阈值 漏检 <= {args.max_missed:g}/次, 误触发 <= {args.max_extra:g}/次, "
+          f"按下延迟 <= {args.max_latency_frames:g} 帧: {'通过' if passed else '未通过'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""端到端"手部移动 → 光标移动"延迟回放测试
+
+合成一段目标 静止-移动 交替的画面，经 CameraHandler（后台捕获线程）→ 识别 → GestureController
+→ MouseController → AsyncMouseInjector 注入到记录替身中，统计两种延迟：
+
+- e2e_move: 每次注入完成时间减去触发它的帧的捕获时间（流水线携带的时间戳）
+- onset: 目标从静止开始移动的那一帧的捕获时间，到记录替身收到下一次光标移动的时间
+
+合成画面中没有真实的手，识别阶段用色块定位代替MediaPipe，可用 --inference-ms 模拟模型推理耗时，
+--inject-ms 模拟系统注入耗时。onset延迟的p95超过 --budget-ms 时以退出码1结束，可用于回归检查。
+
+用法:
+    python benchmarks/latency_benchmark.py
+    python benchmarks/latency_benchmark.py --inference-ms 20 --budget-ms 120 --output latency.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS  # noqa: E402
+from camera_handler import CameraHandler  # noqa: E402
+from frame_sources import SyntheticSource  # noqa: E402
+from gesture_recognizer import analyze_hand, INDEX_FINGER_TIP  # noqa: E402
+from gesture_controller import GestureController  # noqa: E402
+from mouse_controller import MouseController  # noqa: E402
+from mouse_backends import AsyncMouseInjector, RecordingMouseAPI  # noqa: E402
+from latency_metrics import LatencyMetrics  # noqa: E402
+
+TARGET_COLOR = (120, 160, 210)  # 与SyntheticSource绘制的色块颜色一致（BGR）
+
+# 只伸出食指的手部姿态，坐标相对于食指尖
+_POSE = np.zeros((21, 3), dtype=np.float32)
+_POSE[:, 1] = 0.12  # 其余手指的指尖和关节都在食指尖下方
+_POSE[0] = (0.0, 0.25, 0.0)  # 手腕
+_POSE[3] = (0.08, 0.18, 0.0)  # 拇指第一关节
+_POSE[4] = (0.03, 0.22, 0.0)  # 拇指尖靠近手腕，视为弯曲
+_POSE[7] = (0.0, 0.03, 0.0)  # 食指第二关节
+_POSE[8] = (0.0, 0.0, 0.0)  # 食指尖
+for _tip, _dip in ((12, 11), (16, 15), (20, 19)):
+    _POSE[_tip, 1] = 0.15  # 指尖低于第二关节，视为弯曲
+    _POSE[_dip, 1] = 0.10
+
+
+class StepTargetSource(SyntheticSource):
+    """目标交替 静止hold秒 / 水平移动move秒 的合成帧源，记录每次开始移动那一帧的捕获时间"""
+    
+    def __init__(self, cycles=10, hold=0.5, move=0.5, fps=CAMERA_FPS, **kwargs):
+        self.hold_frames = int(round(hold * fps))
+        self.move_frames = int(round(move * fps))
+        self.cycle_frames = self.hold_frames + self.move_frames
+        super().__init__(fps=fps, count=cycles * self.cycle_frames, **kwargs)
+        self.onsets = []  # 每次开始移动那一帧的捕获时间
+    
+    def target_position(self, index):
+        cycle, phase = divmod(index, self.cycle_frames)
+        # 偶数周期从左向右，奇数周期从右向左
+        start, end = (0.3, 0.7) if cycle % 2 == 0 else (0.7, 0.3)
+        progress = max(0, phase - self.hold_frames + 1) / self.move_frames
+        return start + (end - start) * min(1.0, progress), 0.5
+    
+    def read(self):
+        index = self.frames_read
+        ret, frame = super().read()
+        if ret and index % self.cycle_frames == self.hold_frames:
+            self.onsets.append(self.last_timestamp)
+        return ret, frame
+
+
+class MarkerRecognizer:
+    """用色块定位代替MediaPipe的识别器，接口与GestureRecognizer一致"""
+    
+    MEDIAPIPE_AVAILABLE = True
+    
+    def __init__(self, inference_delay=0.0):
+        self.inference_delay = inference_delay
+    
+    def process_frame(self, frame):
+        mask = cv2.inRange(frame, np.subtract(TARGET_COLOR, 10), np.add(TARGET_COLOR, 10))
+        moments = cv2.moments(mask, binaryImage=True)
+        if self.inference_delay:
+            time.sleep(self.inference_delay)
+        if moments['m00'] == 0:
+            return None
+        height, width = frame.shape[:2]
+        return moments['m10'] / moments['m00'] / width, moments['m01'] / moments['m00'] / height
+    
+    def analyze(self, results):
+        if results is None:
+            return None
+        landmarks = _POSE.copy()
+        landmarks[:, 0] += results[0] - _POSE[INDEX_FINGER_TIP, 0]
+        landmarks[:, 1] += results[1] - _POSE[INDEX_FINGER_TIP, 1]
+        return analyze_hand(landmarks)
+
+
+class DelayedRecordingMouseAPI(RecordingMouseAPI):
+    """每次注入前等待固定时间的记录替身，模拟系统注入耗时"""
+    
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+    
+    def moveRel(self, dx, dy):
+        if self.delay:
+            time.sleep(self.delay)
+        super().moveRel(dx, dy)
+    
+    def moveTo(self, x, y):
+        if self.delay:
+            time.sleep(self.delay)
+        super().moveTo(x, y)
+
+
+def summarize(samples):
+    """计算一组延迟样本（秒）的统计信息，单位毫秒"""
+    if not len(samples):
+        return {"count": 0}
+    values = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+    }
+
+
+def onset_latencies(onsets, events):
+    """每次目标开始移动后，到下一次光标移动事件的时间"""
+    move_times = np.array([t for t, kind, _ in events if kind in ("move", "move_to")])
+    latencies = []
+    for onset in onsets:
+        index = np.searchsorted(move_times, onset, side="right")
+        if index < move_times.size:
+            latencies.append(move_times[index] - onset)
+    return latencies
+
+
+def run(args):
+    source = StepTargetSource(cycles=args.cycles, hold=args.hold, move=args.move, fps=args.fps,
+                              width=args.width, height=args.height)
+    sink = DelayedRecordingMouseAPI(args.inject_ms / 1000.0)
+    metrics = LatencyMetrics(window=4096)
+    injector = AsyncMouseInjector(sink)
+    mouse_controller = MouseController(injector, pointer_filter=args.filter, metrics=metrics)
+    gesture_controller = GestureController(mouse_controller, mode="absolute", active_region=(0.0, 0.0, 1.0, 1.0))
+    recognizer = MarkerRecognizer(args.inference_ms / 1000.0)
+    
+    handler = CameraHandler()
+    if not handler.open_camera(source, threaded=True):
+        raise RuntimeError("无法打开合成帧源")
+    last_seq = 0
+    frames = 0
+    try:
+        while True:
+            ret, frame, timestamp, seq = handler.wait_for_frame(last_seq, timeout=0.5)
+            if not ret:
+                if not handler.is_capturing():
+                    break
+                continue
+            last_seq = seq
+            frames += 1
+            analysis = recognizer.analyze(recognizer.process_frame(frame))
+            gesture_controller.update(analysis, timestamp=timestamp)
+        injector.flush()
+    finally:
+        handler.close_camera()
+        mouse_controller.close()
+    
+    return {
+        "frames": frames,
+        "captured": handler.get_capture_stats()["captured"],
+        "settings": {key: getattr(args, key) for key in
+                     ("fps", "cycles", "hold", "move", "inference_ms", "inject_ms", "filter", "budget_ms")},
+        "e2e_move": summarize(metrics.values("e2e_move")),
+        "onset": summarize(onset_latencies(source.onsets, sink.events)),
+        "onsets": len(source.onsets),
+        "mouse_events": len(sink.events),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="端到端手部移动到光标移动的延迟测试")
+    parser.add_argument("--cycles", type=int, default=10, help="静止-移动周期数")
+    parser.add_argument("--hold", type=float, default=0.5, help="每个周期静止时长（秒）")
+    parser.add_argument("--move", type=float, default=0.5, help="每个周期移动时长（秒）")
+    parser.add_argument("--fps", type=float, default=CAMERA_FPS, help="合成画面帧率")
+    parser.add_argument("--width", type=int, default=CAMERA_WIDTH, help="合成画面宽度")
+    parser.add_argument("--height", type=int, default=CAMERA_HEIGHT, help="合成画面高度")
+    parser.add_argument("--inference-ms", type=float, default=0.0, help="模拟的模型推理耗时（毫秒）")
+    parser.add_argument("--inject-ms", type=float, default=0.0, help="模拟的系统注入耗时（毫秒）")
+    parser.add_argument("--filter", default="one_euro", help="指针滤波器（one_euro、kalman、ema、none）")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="onset延迟p95的上限（毫秒）")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    
+    print(f"{result['frames']}/{result['captured']} 帧, {result['onsets']} 次开始移动, "
+          f"{result['mouse_events']} 次光标移动")
+    for name in ("e2e_move", "onset"):
+        stats = result[name]
+        if stats["count"]:
+            print(f"  {name:<9} n={stats['count']:<5} p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms "
+                  f"p99={stats['p99_ms']:.1f}ms max={stats['max_ms']:.1f}ms")
+    
+    onset = result["onset"]
+    passed = onset["count"] > 0 and onset["p95_ms"] <= args.budget_ms
+    result["passed"] = passed
+    print(f"延迟预算 p95 <= {args.budget_ms:.0f}ms: {'通过' if passed else '未通过'}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""多摄像头融合测试
+
+生成两段视频文件（或使用 --sources 指定的视频/摄像头），色块在两个视角中同步移动，
+但在不同时间段分别被遮挡；两路并行捕获和推理后融合为一路，统计每个视角单独使用时
+和融合后检测到手的帧比例、融合输出中最长的无手间隔和视角切换次数。
+--fail-after 可以让第二个视角在指定秒数后断开（视频提前结束），检查融合结果是否继续。
+
+默认用色块定位代替MediaPipe（与latency_benchmark相同），--mediapipe 使用真实模型，
+此时需要用 --sources 提供拍有手的视频。
+
+用法:
+    python benchmarks/multi_camera_benchmark.py
+    python benchmarks/multi_camera_benchmark.py --fail-after 4
+    python benchmarks/multi_camera_benchmark.py --sources left.mp4 right.mp4 --mediapipe
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_FPS  # noqa: E402
+from gesture_recognizer import GestureRecognizer  # noqa: E402
+from latency_metrics import LatencyMetrics  # noqa: E402
+from multi_camera import MultiCameraPipeline  # noqa: E402
+from latency_benchmark import MarkerRecognizer, TARGET_COLOR  # noqa: E402
+
+# 各视角色块被遮挡的时间段（秒）
+OCCLUSIONS = [(2.0, 3.5), (5.0, 6.5)]
+
+
+def write_view_video(path, view, duration, fps, width, height, fail_after=None):
+    """写一个视角的测试视频：色块沿水平方向往返移动，在OCCLUSIONS[view]时间段内被遮挡"""
+    frames = int(round((fail_after if fail_after is not None else duration) * fps))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"无法写入测试视频 {path}")
+    rng = np.random.default_rng(view)
+    background = rng.integers(0, 40, size=(height, width, 3), dtype=np.uint8)
+    start, end = OCCLUSIONS[view % len(OCCLUSIONS)]
+    for index in range(frames):
+        t = index / fps
+        frame = background.copy()
+        if not start <= t < end:
+            x = 0.5 + 0.3 * np.sin(t * 1.5)
+            # 第二个视角从侧面拍摄，位置略有偏移
+            cv2.circle(frame, (int(width * (x + 0.05 * view)), height // 2), 40, TARGET_COLOR, -1)
+        writer.write(frame)
+    writer.release()
+
+
+def longest_gap(flags, fps):
+    """连续无手的最长时长（秒）"""
+    longest = current = 0
+    for flag in flags:
+        current = 0 if flag else current + 1
+        longest = max(longest, current)
+    return longest / fps
+
+
+def run(args, sources):
+    metrics = LatencyMetrics(window=4096)
+    if args.mediapipe:
+        factory = GestureRecognizer
+    else:
+        factory = MarkerRecognizer
+    pipeline = MultiCameraPipeline(sources, factory, mirror=False, metrics=metrics)
+    if not pipeline.start(args.width, args.height, args.fps, realtime=True):
+        raise RuntimeError("无法打开任何帧源")
+    
+    outputs = []
+    start = time.monotonic()
+    try:
+        while True:
+            result = pipeline.wait_for_result(timeout=0.5)
+            if result is None:
+                if not pipeline.is_running():
+                    break
+                continue
+            outputs.append((result.timestamp, result.view, result.analysis is not None))
+    finally:
+        pipeline.stop()
+    elapsed = time.monotonic() - start
+    
+    stats = pipeline.get_stats()
+    flags = [present for _, _, present in outputs]
+    return {
+        "sources": [str(source) for source in sources],
+        "elapsed_s": elapsed,
+        "views": [
+            {**view, "hand_ratio": view["hand_frames"] / view["frames"] if view["frames"] else 0.0}
+            for view in stats["views"]
+        ],
+        "fused": {
+            "outputs": len(outputs),
+            "fps": len(outputs) / elapsed if elapsed else 0.0,
+            "hand_ratio": sum(flags) / len(flags) if flags else 0.0,
+            "longest_gap_s": longest_gap(flags, args.fps),
+            "switches": stats["switches"],
+            "stale": stats["stale"],
+            "dropped_results": stats["dropped_results"],
+        },
+        "inference_p95_ms": float(np.percentile(metrics.values("inference"), 95) * 1000.0)
+        if metrics.values("inference").size else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多摄像头融合测试")
+    parser.add_argument("--sources", nargs="+", help="帧源（视频文件、摄像头索引），默认生成两段测试视频")
+    parser.add_argument("--mediapipe", action="store_true", help="使用MediaPipe代替色块定位")
+    parser.add_argument("--duration", type=float, default=8.0, help="生成视频的时长（秒）")
+    parser.add_argument("--fail-after", type=float, help="第二个视角在该秒数后断开")
+    parser.add_argument("--fps", type=float, default=CAMERA_FPS, help="生成视频的帧率")
+    parser.add_argument("--width", type=int, default=640, help="生成视频的宽度")
+    parser.add_argument("--height", type=int, default=480, help="生成视频的高度")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [int(source) if source.isdigit() else source for source in args.sources or []]
+        if not sources:
+            for view in range(2):
+                path = os.path.join(directory, f"view{view}.avi")
+                write_view_video(path, view, args.duration, args.fps, args.width, args.height,
+                                 args.fail_after if view == 1 else None)
+                sources.append(path)
+        result = run(args, sources)
+    
+    for index, view in enumerate(result["views"]):
+        print(f"视角 #{index}: {view['frames']} 帧, 有手 {view['hand_ratio']:.0%}, 被输出 {view['outputs']} 帧")
+    fused = result["fused"]
+    print(f"融合: {fused['outputs']} 帧 ({fused['fps']:.1f} FPS), 有手 {fused['hand_ratio']:.0%}, "
+          f"最长无手间隔 {fused['longest_gap_s'] * 1000:.0f}ms, 切换 {fused['switches']} 次, "
+          f"过期丢弃 {fused['stale']} 次")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
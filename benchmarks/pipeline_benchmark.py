@@ -0,0 +1,267 @@
+"""离线端到端流水线基准测试
+
+使用录制的视频文件或合成帧驱动 CameraHandler → GestureRecognizer → GestureController → MouseController，
+鼠标操作由RecordingMouseAPI记录而不会真正移动鼠标。帧源通过CameraHandler的后台捕获线程读取，与界面和
+无界面模式一样每次只取最新一帧，处理慢于帧源时旧帧被丢弃（统计在dropped_frames中），capture阶段为帧从
+捕获到被流水线取走经过的时间。输出各阶段延迟百分位、帧率和每帧CPU时间，
+并可保存为JSON以便比较不同版本的性能。也可以回放关键点录制文件，只测试手势分析和鼠标控制逻辑。
+
+用法:
+    python benchmarks/pipeline_benchmark.py --video session.mp4 --output result.json
+    python benchmarks/pipeline_benchmark.py --synthetic 300
+    python benchmarks/pipeline_benchmark.py --video session.mp4 --inference-scale 0.5 --output half.json
+    python benchmarks/pipeline_benchmark.py --landmarks recordings/session.rml
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT, HAND_INFERENCE_SCALE  # noqa: E402
+from camera_handler import CameraHandler  # noqa: E402
+from frame_sources import SyntheticSource, VideoFileSource  # noqa: E402
+from gesture_recognizer import GestureRecognizer  # noqa: E402
+from gesture_controller import GestureController  # noqa: E402
+from mouse_controller import MouseController  # noqa: E402
+from mouse_backends import RecordingMouseAPI  # noqa: E402
+from landmark_recording import LandmarkReplay  # noqa: E402
+from inference_gating import MotionGate  # noqa: E402
+
+
+STAGES = ("capture", "mirror", "gate", "inference", "analysis", "control", "total")
+
+
+def camera_frames(source, name, stats):
+    """通过CameraHandler的线程捕获逐个取出最新帧，产生 (frame, timestamp)，结束后在stats中填入捕获统计"""
+    handler = CameraHandler()
+    if not handler.open_camera(source, threaded=True):
+        raise RuntimeError(f"无法打开帧源: {name}")
+    try:
+        seq = 0
+        while True:
+            ret, frame, timestamp, seq = handler.wait_for_frame(seq, timeout=1.0)
+            if ret:
+                yield frame, timestamp
+            elif not handler.is_capturing():
+                break
+    finally:
+        stats.update(handler.get_capture_stats())
+        handler.close_camera()
+
+
+def synthetic_frames(count, stats, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, seed=0, realtime=False):
+    """生成带噪声背景和移动色块的合成帧"""
+    source = SyntheticSource(width, height, count=count, realtime=realtime, seed=seed)
+    return camera_frames(source, f"synthetic:{count}", stats)
+
+
+def video_frames(path, stats, realtime=False):
+    """读取视频文件，realtime为True时按文件帧率输出"""
+    return camera_frames(VideoFileSource(path, realtime=realtime), path, stats)
+
+
+def summarize(samples):
+    """计算一组耗时样本（秒）的统计信息，单位毫秒"""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+    }
+
+
+def run_pipeline(frames, recognizer, mirror=True, motion_gate=None, capture_stats=None):
+    """运行一次完整流水线，frames产生 (frame, timestamp)，返回统计结果"""
+    mouse_api = RecordingMouseAPI()
+    mouse_controller = MouseController(mouse_api)
+    gesture_controller = GestureController(mouse_controller)
+    
+    timings = {stage: [] for stage in STAGES}
+    frame_count = 0
+    hands_detected = 0
+    analysis = None
+    
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    iterator = iter(frames)
+    while True:
+        item = next(iterator, None)
+        if item is None:
+            break
+        frame, timestamp = item
+        t0 = time.perf_counter()
+        # capture: 帧从捕获到被流水线取走经过的时间
+        timings["capture"].append(max(0.0, time.monotonic() - timestamp))
+        if mirror:
+            frame = cv2.flip(frame, 1)
+        t2 = time.perf_counter()
+        run = motion_gate is None or motion_gate.should_run(frame, analysis is not None)
+        tg = time.perf_counter()
+        if run:
+            results = recognizer.process_frame(frame)
+            t3 = time.perf_counter()
+            analysis = recognizer.analyze(results)
+            t4 = time.perf_counter()
+            timings["inference"].append(t3 - tg)
+            timings["analysis"].append(t4 - t3)
+        else:
+            # 跳过推理时沿用上一帧的分析结果（门控只在上一帧无手时跳过，即None）
+            t4 = tg
+        gesture_controller.update(analysis, timestamp=timestamp)
+        t5 = time.perf_counter()
+        
+        timings["mirror"].append(t2 - t0)
+        timings["gate"].append(tg - t2)
+        timings["control"].append(t5 - t4)
+        timings["total"].append(t5 - t0)
+        frame_count += 1
+        if analysis is not None:
+            hands_detected += 1
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+    
+    moves = sum(1 for _, kind, _ in mouse_api.events if kind in ("move", "move_to"))
+    clicks = sum(1 for _, kind, _ in mouse_api.events if kind == "click")
+    return {
+        "frames": frame_count,
+        "hands_detected": hands_detected,
+        "wall_time_s": wall_time,
+        "fps": frame_count / wall_time if wall_time > 0 else 0.0,
+        "cpu_time_per_frame_ms": cpu_time / frame_count * 1000.0 if frame_count else 0.0,
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+        "mouse_events": {"move": moves, "click": clicks},
+        "gate_skip_ratio": motion_gate.skip_ratio if motion_gate is not None else 0.0,
+        "captured_frames": capture_stats.get("captured", frame_count) if capture_stats else frame_count,
+        "dropped_frames": capture_stats.get("dropped", 0) if capture_stats else 0,
+    }
+
+
+def run_replay(replay):
+    """回放关键点录制文件，只运行分析和鼠标控制阶段"""
+    mouse_api = RecordingMouseAPI()
+    gesture_controller = GestureController(MouseController(mouse_api))
+    
+    timings = {stage: [] for stage in ("analysis", "control", "total")}
+    hands_detected = 0
+    
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    timestamps = replay.timestamps
+    for index in range(len(replay)):
+        t0 = time.perf_counter()
+        analysis = replay.analyze(index)
+        t1 = time.perf_counter()
+        gesture_controller.update(analysis, timestamp=float(timestamps[index]))
+        t2 = time.perf_counter()
+        
+        timings["analysis"].append(t1 - t0)
+        timings["control"].append(t2 - t1)
+        timings["total"].append(t2 - t0)
+        if analysis is not None:
+            hands_detected += 1
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+    
+    frame_count = len(replay)
+    moves = sum(1 for _, kind, _ in mouse_api.events if kind in ("move", "move_to"))
+    clicks = sum(1 for _, kind, _ in mouse_api.events if kind == "click")
+    return {
+        "frames": frame_count,
+        "hands_detected": hands_detected,
+        "wall_time_s": wall_time,
+        "fps": frame_count / wall_time if wall_time > 0 else 0.0,
+        "cpu_time_per_frame_ms": cpu_time / frame_count * 1000.0 if frame_count else 0.0,
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+        "mouse_events": {"move": moves, "click": clicks},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="RemoteMouse离线流水线基准测试")
+    parser.add_argument("--video", action="append", default=[], help="录制的视频文件，可多次指定")
+    parser.add_argument("--synthetic", type=int, default=0, help="生成指定数量的合成帧")
+    parser.add_argument("--landmarks", action="append", default=[], help="关键点录制文件，可多次指定")
+    parser.add_argument("--no-mirror", action="store_true", help="不进行镜像翻转")
+    parser.add_argument("--realtime", action="store_true",
+                        help="视频和合成帧按帧率实时输出（默认尽可能快，测试吞吐量）")
+    parser.add_argument("--motion-gate", type=float, metavar="THRESHOLD",
+                        help="启用运动门控并设置变化像素比例阈值")
+    parser.add_argument("--inference-scale", type=float, default=HAND_INFERENCE_SCALE,
+                        help="整帧送入MediaPipe前的缩放比例，与默认分辨率比较推理耗时和检测率")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    if not args.video and not args.landmarks and args.synthetic <= 0:
+        args.synthetic = 300
+    return args
+
+
+def make_motion_gate(args):
+    """根据命令行参数创建运动门控，未启用时返回None"""
+    if args.motion_gate is None:
+        return None
+    return MotionGate(threshold=args.motion_gate)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    recognizer = GestureRecognizer(inference_scale=args.inference_scale)
+    
+    runs = []
+    for path in args.video:
+        stats = {}
+        result = run_pipeline(video_frames(path, stats, args.realtime), recognizer, mirror=not args.no_mirror,
+                              motion_gate=make_motion_gate(args), capture_stats=stats)
+        result["source"] = path
+        runs.append(result)
+    for path in args.landmarks:
+        result = run_replay(LandmarkReplay(path))
+        result["source"] = path
+        runs.append(result)
+    if args.synthetic > 0:
+        stats = {}
+        result = run_pipeline(synthetic_frames(args.synthetic, stats, realtime=args.realtime), recognizer,
+                              mirror=not args.no_mirror, motion_gate=make_motion_gate(args), capture_stats=stats)
+        result["source"] = f"synthetic:{args.synthetic}"
+        runs.append(result)
+    
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mediapipe_available": recognizer.MEDIAPIPE_AVAILABLE,
+        "inference_scale": args.inference_scale,
+        "runs": runs,
+    }
+    
+    for run in runs:
+        print(f"{run['source']}: {run['frames']} 帧, {run['fps']:.1f} FPS, "
+              f"CPU {run['cpu_time_per_frame_ms']:.2f} ms/帧, 门控跳过 {run.get('gate_skip_ratio', 0.0):.0%}"
+              + (f", 捕获 {run['captured_frames']} 帧, 丢弃 {run['dropped_frames']} 帧" if "captured_frames" in run else ""))
+        for stage, stats in run["stages"].items():
+            if stats["count"]:
+                print(f"  {stage:<10} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                      f"p99={stats['p99_ms']:.2f}ms")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已保存到 {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
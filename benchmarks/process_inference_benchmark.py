@@ -0,0 +1,126 @@
+"""多进程推理吞吐量测试
+
+用不限速的合成帧分别测试本进程内串行推理和1..N个工作进程的ProcessInferencePool，
+统计每秒处理的帧数、相对单进程的加速比，并检查结果是否按帧序号输出。
+默认的识别器在色块定位前做一段占用GIL的纯Python计算（--cost-ms），模拟MediaPipe加Python胶水代码
+的CPU开销；--mediapipe 使用真实的GestureRecognizer（合成帧中没有手，只测检测开销）。
+
+用法:
+    python benchmarks/process_inference_benchmark.py
+    python benchmarks/process_inference_benchmark.py --workers 1 2 4 8 --frames 600 --cost-ms 15
+    python benchmarks/process_inference_benchmark.py --mediapipe --output process.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT  # noqa: E402
+from frame_sources import SyntheticSource  # noqa: E402
+from gesture_recognizer import GestureRecognizer  # noqa: E402
+from process_inference import ProcessInferencePool, default_recognizer_factory  # noqa: E402
+from latency_benchmark import MarkerRecognizer  # noqa: E402
+
+
+class BusyMarkerRecognizer(MarkerRecognizer):
+    """每帧先做cost秒占用GIL的计算再定位色块，模拟CPU密集的推理"""
+    
+    def __init__(self, cost=0.01):
+        super().__init__()
+        self.cost = cost
+    
+    def process_frame(self, frame):
+        end = time.perf_counter() + self.cost
+        value = 0
+        while time.perf_counter() < end:
+            value += 1
+        return super().process_frame(frame)
+    
+    def load_model(self):
+        return True
+
+
+def make_frames(count, width, height):
+    """预先生成合成帧，避免帧生成本身成为瓶颈"""
+    with SyntheticSource(width, height, count=count, realtime=False) as source:
+        source.open()
+        return [frame.copy() for frame in source]
+
+
+def run_inline(frames, factory):
+    """在本进程中逐帧串行推理"""
+    recognizer = factory()
+    start = time.perf_counter()
+    for frame in frames:
+        recognizer.analyze(recognizer.process_frame(frame))
+    return len(frames) / (time.perf_counter() - start)
+
+
+def run_pool(frames, factory, workers):
+    """用workers个工作进程推理，槽位用完时先等待结果再提交，保证每帧都被处理"""
+    pool = ProcessInferencePool(workers, factory, analyzer=GestureRecognizer(lazy=True).analyze_hands)
+    pool.start()
+    received = []
+    try:
+        start = time.perf_counter()
+        for seq, frame in enumerate(frames, start=1):
+            while pool.pending() >= pool.slots:
+                received.extend(result['seq'] for result in pool.poll(timeout=0.005))
+            pool.submit(frame, seq)
+            received.extend(result['seq'] for result in pool.poll())
+        while len(received) + pool.skipped_results < len(frames):
+            received.extend(result['seq'] for result in pool.poll(timeout=0.05))
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+    return {
+        "workers": workers,
+        "fps": len(received) / elapsed,
+        "in_order": received == sorted(received),
+        "skipped": pool.skipped_results,
+        "dropped": pool.dropped_frames,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程推理吞吐量测试")
+    parser.add_argument("--frames", type=int, default=300, help="测试帧数")
+    parser.add_argument("--workers", type=int, nargs="+", help="工作进程数，默认1到CPU核数")
+    parser.add_argument("--cost-ms", type=float, default=10.0, help="模拟识别器每帧占用GIL的计算时间（毫秒）")
+    parser.add_argument("--mediapipe", action="store_true", help="使用MediaPipe代替模拟识别器")
+    parser.add_argument("--width", type=int, default=CAMERA_WIDTH, help="帧宽度")
+    parser.add_argument("--height", type=int, default=CAMERA_HEIGHT, help="帧高度")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, max(1, cores // 2), cores} - {0})
+    if args.mediapipe:
+        factory = default_recognizer_factory()
+    else:
+        factory = partial(BusyMarkerRecognizer, args.cost_ms / 1000.0)
+    frames = make_frames(args.frames, args.width, args.height)
+    
+    print(f"CPU核数 {cores}, {len(frames)} 帧 {args.width}x{args.height}")
+    inline_fps = run_inline(frames, factory)
+    print(f"  本进程串行       {inline_fps:7.1f} FPS")
+    report = {"cores": cores, "frames": len(frames), "inline_fps": inline_fps, "pool": []}
+    for count in workers:
+        result = run_pool(frames, factory, count)
+        result["speedup"] = result["fps"] / inline_fps
+        report["pool"].append(result)
+        print(f"  {count:>2} 个工作进程    {result['fps']:7.1f} FPS  x{result['speedup']:.2f}  "
+              f"{'按序' if result['in_order'] else '乱序'}  跳过 {result['skipped']}  丢弃 {result['dropped']}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
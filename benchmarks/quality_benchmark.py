@@ -0,0 +1,157 @@
+"""画质控制测试
+
+用不限速的合成帧驱动识别器，中间一段时间模拟机器变慢（推理耗时乘以 --slowdown），
+分别在关闭和开启QualityController时统计各阶段摊到每帧的处理时间、检测比例和画质等级，
+检查控制器能否在变慢时把每帧耗时压回目标以内、恢复后回到高画质，以及调整次数是否克制。
+
+默认的识别器按推理分辨率和模型复杂度估算耗时并忙等（耗时 ≈ --base-ms × 缩放² × 复杂度系数），
+--mediapipe 使用真实的GestureRecognizer（合成帧中没有手，只测检测开销）。
+
+用法:
+    python benchmarks/quality_benchmark.py
+    python benchmarks/quality_benchmark.py --base-ms 30 --slowdown 3 --target-ms 25
+    python benchmarks/quality_benchmark.py --mediapipe --frames 900 --output quality.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT, QUALITY_TARGET_FRAME_MS  # noqa: E402
+from gesture_recognizer import GestureRecognizer  # noqa: E402
+from quality_controller import QualityController  # noqa: E402
+from process_inference_benchmark import make_frames  # noqa: E402
+
+# 模型复杂度对推理耗时的影响（相对复杂度1）
+COMPLEXITY_COST = {0: 0.6, 1: 1.0}
+
+# 变慢阶段在测试中的位置（帧比例）
+SLOW_PHASE = (0.3, 0.65)
+
+
+class SimulatedRecognizer:
+    """按画质等级估算推理耗时并忙等的识别器"""
+    
+    def __init__(self, base_ms):
+        self.base = base_ms / 1000.0
+        self.inference_scale = 1.0
+        self.model_complexity = 1
+        self.load = 1.0  # 模拟的机器负载倍数
+    
+    def set_inference_quality(self, inference_scale, model_complexity):
+        self.inference_scale = inference_scale
+        self.model_complexity = model_complexity
+    
+    def process_frame(self, frame):
+        cost = self.base * self.inference_scale ** 2 * COMPLEXITY_COST[self.model_complexity] * self.load
+        end = time.perf_counter() + cost
+        while time.perf_counter() < end:
+            pass
+        return None
+    
+    def analyze(self, results):
+        return None
+
+
+class LoadedRecognizer(GestureRecognizer):
+    """在真实推理后追加忙等，使耗时按负载倍数放大"""
+    
+    load = 1.0
+    
+    def process_frame(self, frame):
+        start = time.perf_counter()
+        results = super().process_frame(frame)
+        end = start + (time.perf_counter() - start) * self.load
+        while time.perf_counter() < end:
+            pass
+        return results
+
+
+def phase_of(index, frames):
+    start, end = SLOW_PHASE
+    if index < frames * start:
+        return "normal"
+    if index < frames * end:
+        return "slow"
+    return "recovered"
+
+
+def run(frames, total, recognizer, slowdown, target_ms, quality_control):
+    """处理total帧（循环使用frames），返回各阶段的统计"""
+    controller = QualityController(recognizer, target_ms=target_ms) if quality_control else None
+    phases = {name: {"frames": 0, "detections": 0, "time": 0.0, "levels": []}
+              for name in ("normal", "slow", "recovered")}
+    for index in range(total):
+        frame = frames[index % len(frames)]
+        phase = phase_of(index, total)
+        recognizer.load = slowdown if phase == "slow" else 1.0
+        stats = phases[phase]
+        stats["frames"] += 1
+        if controller is not None:
+            stats["levels"].append(controller.level)
+            if not controller.should_detect():
+                continue
+        start = time.perf_counter()
+        recognizer.analyze(recognizer.process_frame(frame))
+        elapsed = time.perf_counter() - start
+        stats["time"] += elapsed
+        stats["detections"] += 1
+        if controller is not None:
+            controller.observe(elapsed)
+    
+    report = {}
+    for name, stats in phases.items():
+        report[name] = {
+            "frame_ms": stats["time"] / stats["frames"] * 1000.0 if stats["frames"] else 0.0,
+            "detection_ratio": stats["detections"] / stats["frames"] if stats["frames"] else 0.0,
+            "final_level": stats["levels"][-1] if stats["levels"] else 0,
+            "mean_level": float(np.mean(stats["levels"])) if stats["levels"] else 0.0,
+        }
+    return {
+        "quality_control": quality_control,
+        "phases": report,
+        "changes": controller.history if controller is not None else [],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="画质控制测试")
+    parser.add_argument("--frames", type=int, default=1200, help="测试帧数")
+    parser.add_argument("--base-ms", type=float, default=20.0, help="模拟识别器在最高画质下的推理耗时（毫秒）")
+    parser.add_argument("--slowdown", type=float, default=2.5, help="变慢阶段的耗时倍数")
+    parser.add_argument("--target-ms", type=float, default=QUALITY_TARGET_FRAME_MS, help="每帧处理时间目标（毫秒）")
+    parser.add_argument("--mediapipe", action="store_true", help="使用MediaPipe代替模拟识别器")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    frames = make_frames(min(args.frames, 60), CAMERA_WIDTH, CAMERA_HEIGHT)
+    results = []
+    for quality_control in (False, True):
+        if args.mediapipe:
+            recognizer = LoadedRecognizer(hand_tracking=False)
+        else:
+            recognizer = SimulatedRecognizer(args.base_ms)
+        result = run(frames, args.frames, recognizer, args.slowdown, args.target_ms, quality_control)
+        results.append(result)
+        print(f"画质控制{'开启' if quality_control else '关闭'} (目标 {args.target_ms:.1f}ms/帧):")
+        for name, label in (("normal", "正常"), ("slow", f"变慢x{args.slowdown:g}"), ("recovered", "恢复")):
+            phase = result["phases"][name]
+            status = "达标" if phase["frame_ms"] <= args.target_ms else "超出"
+            print(f"  {label:<8} 每帧 {phase['frame_ms']:6.1f}ms ({status}), 检测比例 {phase['detection_ratio']:.0%}, "
+                  f"平均等级 {phase['mean_level']:.1f}, 阶段末等级 {phase['final_level']}")
+        if quality_control:
+            print(f"  调整 {len(result['changes'])} 次")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
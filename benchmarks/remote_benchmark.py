@@ -0,0 +1,200 @@
+"""远程鼠标回环测试
+
+在本机启动RemoteMouseReceiver（注入到记录替身）和UDPMouseSender，按固定速率和不限速两种方式
+发送相对移动（每隔一段插入一次点击），统计单向延迟（发送 → 接收端收到）和发送 → 注入完成的延迟
+分位数、每秒发送和处理的包数，以及迟到丢弃、丢失和重复的包数。回环中两端共用同一个单调时钟，
+单向延迟可以直接相减得到。
+
+--loss 和 --reorder 在两端之间插入一个转发器，按概率丢弃或交换相邻的包，检查接收端是否丢弃
+迟到的位移、不重放，且点击不因丢包而丢失。
+
+用法:
+    python benchmarks/remote_benchmark.py
+    python benchmarks/remote_benchmark.py --packets 20000 --rate 2000
+    python benchmarks/remote_benchmark.py --loss 0.05 --reorder 0.05 --output remote.json
+"""
+
+import argparse
+import json
+import os
+import random
+import select
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from latency_metrics import LatencyMetrics  # noqa: E402
+from mouse_backends import RecordingMouseAPI  # noqa: E402
+from mouse_controller import MouseController  # noqa: E402
+from remote_mouse import RemoteMouseReceiver, UDPMouseSender  # noqa: E402
+
+# 每隔这么多个移动包插入一次点击
+CLICK_EVERY = 100
+
+
+class LossyRelay:
+    """在发送端和接收端之间转发UDP包，按概率丢弃或与下一个包交换顺序"""
+    
+    def __init__(self, target, loss=0.0, reorder=0.0, seed=0):
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = random.Random(seed)
+        self.front = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.front.bind(("127.0.0.1", 0))
+        self.address = self.front.getsockname()
+        self.back = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.back.connect(target)
+        self.client = None
+        self.held = None
+        self.dropped = 0
+        self.reordered = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while self._running:
+            readable, _, _ = select.select([self.front, self.back], [], [], 0.05)
+            for sock in readable:
+                if sock is self.back:
+                    # 接收端的回复（屏幕尺寸）原样转发
+                    data = self.back.recv(64)
+                    if self.client is not None:
+                        self.front.sendto(data, self.client)
+                    continue
+                data, self.client = self.front.recvfrom(64)
+                if self.rng.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                if self.held is None and self.rng.random() < self.reorder:
+                    self.held = data
+                    self.reordered += 1
+                    continue
+                self.back.send(data)
+                if self.held is not None:
+                    self.back.send(self.held)
+                    self.held = None
+    
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.front.close()
+        self.back.close()
+
+
+def percentiles(values):
+    if not len(values):
+        return None
+    return {f"p{q}_ms": float(np.percentile(values, q) * 1000.0) for q in (50, 95, 99)}
+
+
+def run(packets, rate, loss=0.0, reorder=0.0):
+    """发送packets个移动包，rate为每秒包数（0表示不限速），返回统计结果"""
+    metrics = LatencyMetrics(window=max(packets, 1))
+    sink = RecordingMouseAPI()
+    controller = MouseController(sink, pointer_filter=None, metrics=metrics)
+    receiver = RemoteMouseReceiver(controller, "127.0.0.1", 0, same_clock=True, metrics=metrics)
+    # 不限速时接收缓冲区要能容纳突发
+    receiver.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    receiver_thread = threading.Thread(target=receiver.run, daemon=True)
+    receiver_thread.start()
+    
+    relay = None
+    target = receiver.address
+    if loss > 0 or reorder > 0:
+        relay = LossyRelay(receiver.address, loss, reorder)
+        target = relay.address
+    sender = UDPMouseSender(*target)
+    sender.size()
+    
+    interval = 1.0 / rate if rate > 0 else 0.0
+    clicks = 0
+    start = time.perf_counter()
+    for index in range(packets):
+        if interval:
+            deadline = start + index * interval
+            while time.perf_counter() < deadline:
+                pass
+        sender.moveRel(1, 0)
+        if index % CLICK_EVERY == CLICK_EVERY - 1:
+            sender.click()
+            clicks += 1
+    send_elapsed = time.perf_counter() - start
+    
+    # 等待接收端处理完所有已到达的包（心跳不计入）
+    previous = -1
+    while receiver.moves + receiver.buttons + receiver.late + receiver.duplicates != previous:
+        previous = receiver.moves + receiver.buttons + receiver.late + receiver.duplicates
+        time.sleep(0.1)
+    receiver.stop()
+    receiver_thread.join(timeout=1.0)
+    sender.close()
+    if relay is not None:
+        relay.close()
+    receiver.close()
+    
+    stats = receiver.get_stats()
+    received_clicks = sum(1 for _, kind, _ in sink.events if kind == 'click')
+    # 接收端吞吐量按第一个到最后一个注入事件的时间计算
+    receive_elapsed = sink.events[-1][0] - sink.events[0][0] if len(sink.events) > 1 else 0.0
+    return {
+        "rate": rate,
+        "packets": packets,
+        "clicks": clicks,
+        "send_pps": (packets + clicks * sender.button_repeat) / send_elapsed,
+        "receive_pps": len(sink.events) / receive_elapsed if receive_elapsed else 0.0,
+        "one_way": percentiles(metrics.values("network")),
+        "send_to_inject": percentiles(metrics.values("e2e_move")),
+        "applied_moves": stats["moves"],
+        "late_dropped": stats["late"],
+        "lost": stats["lost"],
+        "duplicates": stats["duplicates"],
+        "received_clicks": received_clicks,
+        "cursor_error_px": packets - (sink.x - sink.screen_width // 2),
+        "relay_dropped": relay.dropped if relay is not None else 0,
+        "relay_reordered": relay.reordered if relay is not None else 0,
+    }
+
+
+def describe(result):
+    label = f"{result['rate']:.0f} 包/秒" if result['rate'] else "不限速"
+    one_way = result["one_way"] or {}
+    inject = result["send_to_inject"] or {}
+    print(f"{label}: 发送 {result['send_pps']:.0f} 包/秒, 接收端处理 {result['receive_pps']:.0f} 包/秒")
+    print(f"  单向延迟 p50 {one_way.get('p50_ms', 0):.3f} / p95 {one_way.get('p95_ms', 0):.3f} / "
+          f"p99 {one_way.get('p99_ms', 0):.3f} ms, 发送到注入 p95 {inject.get('p95_ms', 0):.3f} ms")
+    print(f"  执行移动 {result['applied_moves']}/{result['packets']}, 迟到丢弃 {result['late_dropped']}, "
+          f"丢失 {result['lost']}, 重复按键 {result['duplicates']}, "
+          f"点击 {result['received_clicks']}/{result['clicks']}, 光标误差 {result['cursor_error_px']} 像素")
+    if result["relay_dropped"] or result["relay_reordered"]:
+        print(f"  转发器丢弃 {result['relay_dropped']} 包, 交换顺序 {result['relay_reordered']} 次")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="远程鼠标回环测试")
+    parser.add_argument("--packets", type=int, default=5000, help="每轮发送的移动包数")
+    parser.add_argument("--rate", type=float, nargs="+", default=[1000.0, 0.0],
+                        help="发送速率（包/秒），0表示不限速")
+    parser.add_argument("--loss", type=float, default=0.0, help="转发器丢包概率")
+    parser.add_argument("--reorder", type=float, default=0.0, help="转发器交换相邻包顺序的概率")
+    parser.add_argument("--output", help="将结果保存为JSON文件")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for rate in args.rate:
+        result = run(args.packets, rate, args.loss, args.reorder)
+        describe(result)
+        results.append(result)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
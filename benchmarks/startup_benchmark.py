@@ -0,0 +1,102 @@
+"""启动时间基准测试
+
+多次以 --startup-trace 启动程序，统计从启动进程到首个窗口显示（time-to-first-window）
+以及到首次完成手势推理（time-to-first-inference）的时间。默认运行 src/main.py，
+也可以通过 --command 指定PyInstaller打包后的可执行文件。
+
+用法:
+    python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --command dist/CameraMouseControl --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def measure_once(command, timeout):
+    """启动一次程序，返回以进程启动为起点的各里程碑耗时（秒）"""
+    fd, trace_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(trace_path)
+    try:
+        start = time.time()
+        completed = subprocess.run(command + ["--startup-trace", trace_path],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=timeout)
+        if not os.path.exists(trace_path):
+            raise RuntimeError(f"程序未写出启动记录 (退出码 {completed.returncode}): "
+                               f"{completed.stderr.decode(errors='replace')[-500:]}")
+        with open(trace_path, encoding="utf-8") as f:
+            trace = json.load(f)
+    finally:
+        if os.path.exists(trace_path):
+            os.remove(trace_path)
+    
+    result = {'mediapipe_available': trace.get('mediapipe_available', False)}
+    for key in ('first_window', 'model_loaded', 'first_inference'):
+        if key in trace:
+            result[key] = trace[key] - start
+    if 'inference_time' in trace:
+        result['inference_time'] = trace['inference_time']
+    return result
+
+
+def summarize(samples):
+    values = np.asarray(samples) * 1000.0
+    return {
+        'count': int(values.size),
+        'median_ms': float(np.median(values)),
+        'min_ms': float(values.min()),
+        'max_ms': float(values.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动时间基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="启动次数")
+    parser.add_argument("--command", help="要测试的命令（默认: 当前Python运行src/main.py）")
+    parser.add_argument("--timeout", type=float, default=120.0, help="单次启动超时（秒）")
+    parser.add_argument("--output", help="将结果写入JSON文件")
+    args = parser.parse_args()
+    
+    if args.command:
+        command = shlex.split(args.command)
+    else:
+        command = [sys.executable, os.path.join(SRC_DIR, "main.py")]
+    
+    runs = []
+    for i in range(args.runs):
+        run = measure_once(command, args.timeout)
+        runs.append(run)
+        parts = [f"{key}={run[key] * 1000:.0f}ms" for key in ('first_window', 'model_loaded', 'first_inference')
+                 if key in run]
+        print(f"第 {i + 1} 次: {' '.join(parts)}")
+    
+    report = {'command': command, 'runs': runs}
+    print(f"\n{'里程碑':<18}{'中位数':>10}{'最小':>10}{'最大':>10}")
+    for key in ('first_window', 'model_loaded', 'first_inference'):
+        samples = [run[key] for run in runs if key in run]
+        if not samples:
+            continue
+        stats = summarize(samples)
+        report[key] = stats
+        print(f"{key:<18}{stats['median_ms']:>10.0f}{stats['min_ms']:>10.0f}{stats['max_ms']:>10.0f}")
+    if not all(run['mediapipe_available'] for run in runs):
+        print("注意: MediaPipe不可用，未测得首次推理时间")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,10 @@ block_cipher = None
 # 分析阶段：分析脚本及其依赖关系
 a = Analysis(
     # 主程序入口文件
-    ['camera_app.py'],
+    ['src/main.py'],
     
-    # 模块搜索路径，为空表示使用默认路径
-    pathex=[],
+    # 模块搜索路径：src目录下的模块以顶层模块方式导入
+    pathex=['src'],
     
     # 额外的二进制文件，一般为空
     binaries=[],
@@ -35,6 +35,8 @@ a = Analysis(
         'mediapipe.python.solutions.hands',  # MediaPipe手部检测模块
         'mediapipe.python.solutions.drawing_utils',  # MediaPipe绘图工具
         'mediapipe.python.solutions.drawing_styles',  # MediaPipe绘图样式
+        'gui_main_window',  # 图形界面（在main()中延迟导入）
+        'headless',  # 无界面模式（在main()中延迟导入）
         'cv2',  # OpenCV库
         'numpy',  # 数值计算库
         'pyautogui',  # 自动化控制库
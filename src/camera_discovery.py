@@ -0,0 +1,160 @@
+"""摄像头发现模块，负责枚举、并行探测和缓存本地摄像头
+
+Linux下优先读取 /sys/class/video4linux 得到候选设备及其名称，只探测真正的采集节点；
+其他系统回退到依次尝试索引0-9。所有候选设备并行探测并带有超时，结果保存到本地缓存，
+界面启动时可以先用缓存填充列表，探测完成后再更正。
+"""
+
+import json
+import os
+import platform
+import re
+import threading
+import time
+import cv2
+from constants import CAMERA_CACHE_FILE, CAMERA_PROBE_TIMEOUT, CAMERA_MAX_INDEX
+
+SYSFS_VIDEO_ROOT = "/sys/class/video4linux"
+
+
+def _read_sysfs_value(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def enumerate_v4l2_devices(sysfs_root=SYSFS_VIDEO_ROOT):
+    """枚举sysfs中的V4L2采集设备，返回按索引排序的 [{'id', 'name', 'path'}]
+    
+    同一个物理摄像头通常会注册多个videoN节点（采集节点和元数据节点），
+    sysfs中的index属性为0的节点才是采集节点。
+    """
+    try:
+        entries = os.listdir(sysfs_root)
+    except OSError:
+        return []
+    
+    devices = []
+    for entry in entries:
+        match = re.fullmatch(r"video(\d+)", entry)
+        if not match:
+            continue
+        device_dir = os.path.join(sysfs_root, entry)
+        node_index = _read_sysfs_value(os.path.join(device_dir, "index"))
+        if node_index is not None and node_index != "0":
+            continue
+        devices.append({
+            'id': int(match.group(1)),
+            'name': _read_sysfs_value(os.path.join(device_dir, "name")),
+            'path': f"/dev/{entry}",
+        })
+    devices.sort(key=lambda device: device['id'])
+    return devices
+
+
+def probe_camera(camera_id):
+    """打开摄像头并抓取一帧，返回能力信息字典，不可用时返回None"""
+    cap = cv2.VideoCapture(camera_id)
+    try:
+        if not cap.isOpened() or not cap.grab():
+            return None
+        return {
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': float(cap.get(cv2.CAP_PROP_FPS)),
+        }
+    finally:
+        cap.release()
+
+
+def probe_cameras(camera_ids, timeout=CAMERA_PROBE_TIMEOUT, probe=probe_camera):
+    """并行探测多个摄像头，超时未返回的视为不可用，返回 {id: 能力信息}"""
+    results = {}
+    lock = threading.Lock()
+    
+    def worker(camera_id):
+        try:
+            info = probe(camera_id)
+        except Exception as e:
+            print(f"检测摄像头 {camera_id} 时出错: {e}")
+            info = None
+        if info is not None:
+            with lock:
+                results[camera_id] = info
+    
+    # 使用守护线程，卡住的驱动调用不会阻止程序退出
+    threads = [threading.Thread(target=worker, args=(camera_id,), daemon=True) for camera_id in camera_ids]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    with lock:
+        return dict(results)
+
+
+def camera_display_name(position, count, device_name=None):
+    """根据摄像头在列表中的位置生成显示名称（不含ID）"""
+    if device_name:
+        return device_name
+    if count == 1:
+        return "内置摄像头"
+    elif position == 0:
+        return "主摄像头"
+    elif position == 1:
+        return "副摄像头"
+    return f"外接摄像头 {position + 1}"
+
+
+def build_cameras_info(cameras):
+    """为探测结果分配显示名称，返回 {id: {'id', 'name', ...}}"""
+    cameras_info = {}
+    for position, camera in enumerate(cameras):
+        info = dict(camera)
+        info['name'] = camera_display_name(position, len(cameras), camera.get('device_name'))
+        cameras_info[camera['id']] = info
+    return cameras_info
+
+
+def discover_cameras(sysfs_root=SYSFS_VIDEO_ROOT, timeout=CAMERA_PROBE_TIMEOUT, probe=probe_camera):
+    """发现可用摄像头，返回按ID排序的 [{'id', 'device_name', 'path', 'width', 'height', 'fps'}]"""
+    candidates = []
+    if platform.system() == "Linux":
+        candidates = enumerate_v4l2_devices(sysfs_root)
+    if not candidates:
+        candidates = [{'id': i, 'name': None, 'path': None} for i in range(CAMERA_MAX_INDEX)]
+    
+    probed = probe_cameras([candidate['id'] for candidate in candidates], timeout, probe)
+    cameras = []
+    for candidate in candidates:
+        capabilities = probed.get(candidate['id'])
+        if capabilities is None:
+            continue
+        camera = {'id': candidate['id'], 'device_name': candidate['name'], 'path': candidate['path']}
+        camera.update(capabilities)
+        cameras.append(camera)
+    return cameras
+
+
+def load_camera_cache(path=CAMERA_CACHE_FILE):
+    """读取缓存的摄像头列表，不存在或无效时返回空列表"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cameras = json.load(f)["cameras"]
+        return [camera for camera in cameras if isinstance(camera.get('id'), int)]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return []
+
+
+def save_camera_cache(cameras, path=CAMERA_CACHE_FILE):
+    """保存摄像头列表到缓存文件"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"updated": time.time(), "cameras": cameras}, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"无法保存摄像头缓存 {path}: {e}")
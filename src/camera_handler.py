@@ -2,7 +2,20 @@
 
 import cv2
 import platform
-from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS
+import threading
+import time
+from camera_discovery import discover_cameras, build_cameras_info, load_camera_cache, save_camera_cache
+from frame_sources import FrameSource, create_frame_source
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAPTURE_MAX_FAILURES, FRAME_SOURCE_REALTIME
+
+
+class _CaptureThreadState:
+    """单个捕获线程的停止标志和帧源释放责任，线程被替换后仍由它自己持有"""
+    
+    def __init__(self):
+        self.stop = threading.Event()
+        self.exited = False
+        self.release_source = False  # 为True时由捕获线程在退出时释放帧源
 
 
 class CameraHandler:
@@ -11,35 +24,179 @@ class CameraHandler:
     def __init__(self):
         self.cap = None
         self.current_camera_info = {}
+        
+        # 线程捕获模式：后台线程持续读取，只保留最新一帧
+        self.threaded = False
+        self._capture_thread = None
+        self._capture_state = None
+        self._capture_running = False
+        self._frame_lock = threading.Condition()  # 新帧到达时通知等待者
+        self._latest_frame = None
+        self._latest_timestamp = 0.0
+        self._frame_seq = 0  # 已捕获帧的序号
+        self._consumed_seq = 0  # 最近一次被读取的帧序号
+        self.dropped_frames = 0  # 未被读取就被覆盖的帧数
     
-    def open_camera(self, camera_index):
-        """打开指定索引的摄像头"""
+    def open_camera(self, camera_index, threaded=False, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+                    realtime=FRAME_SOURCE_REALTIME):
+        """打开帧源，threaded为True时启动后台捕获线程
+        
+        camera_index可以是摄像头索引、视频文件路径、"synthetic[:帧数]"或已创建的FrameSource，
+        realtime只对视频文件和合成帧源有效
+        """
         # 释放之前的摄像头（如果已打开）
         if self.cap is not None:
-            self.cap.release()
+            self.close_camera()
             
-        # 打开新摄像头
-        self.cap = cv2.VideoCapture(camera_index)
-        if self.cap.isOpened():
-            # 设置摄像头参数以获得更好的性能
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-            self.cap.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
-            return True
-        return False
+        # 打开新帧源，摄像头会协商低延迟采集模式
+        source = camera_index
+        if not isinstance(source, FrameSource):
+            source = create_frame_source(camera_index, width, height, fps, realtime=realtime)
+        if not source.open():
+            source.release()
+            return False
+        self.cap = source
+        name = source.kind if isinstance(camera_index, FrameSource) else camera_index
+        print(f"帧源已打开: {name} {source.describe()}")
+        if threaded:
+            self.start_capture_thread()
+        return True
+    
+    def get_source_settings(self):
+        """返回当前帧源实际生效的参数（分辨率、帧率、像素格式等），未打开时返回空字典"""
+        if self.cap is None:
+            return {}
+        return self.cap.settings()
     
     def close_camera(self):
         """关闭当前摄像头"""
+        released_by_thread = self.stop_capture_thread()
         if self.cap is not None:
-            self.cap.release()
+            if not released_by_thread:
+                self.cap.release()
             self.cap = None
     
+    def start_capture_thread(self):
+        """启动后台捕获线程"""
+        if self._capture_thread is not None:
+            return
+        with self._frame_lock:
+            self._latest_frame = None
+            self._latest_timestamp = 0.0
+            self._frame_seq = 0
+            self._consumed_seq = 0
+            self.dropped_frames = 0
+        self._capture_running = True
+        self.threaded = True
+        self._capture_state = _CaptureThreadState()
+        self._capture_thread = threading.Thread(target=self._capture_loop, args=(self.cap, self._capture_state),
+                                                name="camera-capture", daemon=True)
+        self._capture_thread.start()
+    
+    def stop_capture_thread(self):
+        """停止后台捕获线程
+        
+        返回True表示线程未能在超时内退出（read()仍阻塞在驱动中），帧源已交给捕获线程在退出时释放，
+        调用方不能再释放它，否则会与正在进行的read()冲突
+        """
+        thread, state = self._capture_thread, self._capture_state
+        self._capture_running = False
+        self._capture_thread = None
+        self._capture_state = None
+        self.threaded = False
+        if thread is None:
+            return False
+        state.stop.set()
+        thread.join(timeout=1.0)
+        with self._frame_lock:
+            if state.exited:
+                return False
+            state.release_source = True
+        print("捕获线程未能在1秒内退出，帧源将在读取返回后由捕获线程释放")
+        return True
+    
+    def _capture_loop(self, cap, state):
+        """捕获线程主循环：持续读取帧并覆盖缓冲区中的旧帧"""
+        failures = 0
+        while not state.stop.is_set():
+            if not cap.isOpened():
+                break
+            ret, frame = cap.read()
+            # 优先使用帧源提供的捕获时间（摄像头驱动时间戳），否则使用读取完成的时间
+            timestamp = getattr(cap, 'last_timestamp', 0.0) or time.monotonic()
+            if not ret:
+                # 连续读取失败（设备断开或视频文件结束）时退出捕获线程
+                failures += 1
+                if failures >= CAPTURE_MAX_FAILURES:
+                    print("摄像头连续读取失败，停止捕获")
+                    break
+                # 读取失败时稍作等待，避免空转占满CPU
+                time.sleep(0.005)
+                continue
+            failures = 0
+            with self._frame_lock:
+                if state.stop.is_set():
+                    # 已被停止的线程不再写入缓冲区，之后可能已经换成了新的帧源
+                    break
+                if self._frame_seq > self._consumed_seq:
+                    self.dropped_frames += 1
+                self._latest_frame = frame
+                self._latest_timestamp = timestamp
+                self._frame_seq += 1
+                self._frame_lock.notify_all()
+        with self._frame_lock:
+            state.exited = True
+            release = state.release_source
+            if not state.stop.is_set():
+                # 读取失败自行退出，通知等待新帧的调用方
+                self._capture_running = False
+            self._frame_lock.notify_all()
+        if release:
+            cap.release()
+    
+    def read_latest_frame(self, last_seq=None):
+        """非阻塞读取最新一帧，返回 (ret, frame, timestamp, seq)
+        
+        如果传入last_seq且缓冲区中没有比它更新的帧，则ret为False
+        """
+        with self._frame_lock:
+            frame = self._latest_frame
+            seq = self._frame_seq
+            timestamp = self._latest_timestamp
+            if frame is None or (last_seq is not None and seq <= last_seq):
+                return False, None, timestamp, seq
+            self._consumed_seq = seq
+        return True, frame, timestamp, seq
+    
+    def wait_for_frame(self, last_seq, timeout=None):
+        """阻塞等待比last_seq更新的帧，返回 (ret, frame, timestamp, seq)"""
+        with self._frame_lock:
+            self._frame_lock.wait_for(
+                lambda: self._frame_seq > last_seq or not self._capture_running, timeout)
+        return self.read_latest_frame(last_seq)
+    
     def read_frame(self):
         """读取当前摄像头帧"""
+        if self.threaded:
+            ret, frame, _, _ = self.read_latest_frame()
+            return ret, frame
         if self.cap is not None and self.cap.isOpened():
             return self.cap.read()
         return False, None
     
+    def get_capture_stats(self):
+        """获取捕获统计信息"""
+        with self._frame_lock:
+            return {
+                'captured': self._frame_seq,
+                'dropped': self.dropped_frames,
+                'timestamp': self._latest_timestamp,
+            }
+    
+    def is_capturing(self):
+        """检查后台捕获线程是否仍在运行"""
+        return self.threaded and self._capture_running
+    
     def is_opened(self):
         """检查摄像头是否已打开"""
         return self.cap is not None and self.cap.isOpened()
@@ -81,34 +238,12 @@ class CameraHandler:
             return f"摄像头 {device_id}"
 
     def search_cameras(self):
-        """搜索本地摄像头设备"""
-        available_cameras = []
-        for i in range(10):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                # 测试摄像头是否真正可用（尝试读取一帧）
-                ret, _ = cap.read()
-                if ret:
-                    available_cameras.append(i)
-                cap.release()
-            else:
-                break
-        
-        # 根据摄像头数量为其分配更有意义的名称
-        cameras_info = {}
-        for idx, cam_id in enumerate(available_cameras):
-            if len(available_cameras) == 1:
-                camera_name = f"内置摄像头 ({cam_id})"
-            elif idx == 0:
-                camera_name = f"主摄像头 ({cam_id})"
-            elif idx == 1:
-                camera_name = f"副摄像头 ({cam_id})"
-            else:
-                camera_name = f"外接摄像头 {idx+1} ({cam_id})"
-                
-            cameras_info[cam_id] = {
-                'id': cam_id,
-                'name': camera_name.split(' (')[0]  # 提取名称部分
-            }
-        
-        return available_cameras, cameras_info
\ No newline at end of file
+        """搜索本地摄像头设备（并行探测），并更新缓存"""
+        cameras = discover_cameras()
+        save_camera_cache(cameras)
+        return [camera['id'] for camera in cameras], build_cameras_info(cameras)
+    
+    def cached_cameras(self):
+        """返回上次搜索缓存的摄像头列表，格式与search_cameras相同"""
+        cameras = load_camera_cache()
+        return [camera['id'] for camera in cameras], build_cameras_info(cameras)
@@ -1,19 +1,125 @@
 """全局常量和配置"""
 
+import os
+
 # 摄像头配置
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_FPS = 30
+CAMERA_THREADED_CAPTURE = True  # 使用后台线程捕获，只保留最新帧
+CAPTURE_MAX_FAILURES = 200  # 连续读取失败多少次后停止捕获线程（约1秒）
+CAMERA_FOURCC = "MJPG"  # 请求的像素格式，MJPG在USB摄像头上通常延迟最低，为空字符串时使用驱动默认格式
+CAMERA_BUFFER_SIZE = 1  # 驱动缓冲帧数，1表示总是读取最新帧，为0时不设置
+DRIVER_TIMESTAMP_MAX_AGE = 1.0  # 驱动时间戳与当前时间相差超过该值（秒）时视为不可用
+FRAME_SOURCE_REALTIME = True  # 视频文件和合成帧源按帧率实时输出，False时尽可能快地输出
+
+# 多摄像头配置：每个摄像头独立捕获和推理，结果按置信度和时间戳融合为一路
+MULTI_CAMERA_MAX_AGE = 0.15  # 其他视角的结果超过该时间（秒）视为过期，不参与融合
+MULTI_CAMERA_SWITCH_MARGIN = 0.1  # 其他视角的置信度需高出当前视角该值才切换，避免来回跳动
+MULTI_CAMERA_QUEUE_SIZE = 8  # 融合结果队列长度，消费跟不上时丢弃最旧的结果
+
+# 摄像头发现配置
+CAMERA_MAX_INDEX = 10  # 无法枚举设备时依次尝试的索引数量
+CAMERA_PROBE_TIMEOUT = 3.0  # 并行探测的总超时（秒）
+CAMERA_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "remote_mouse", "cameras.json")
 
 # 手势识别配置
 HAND_DETECTION_CONFIDENCE = 0.7
 HAND_TRACKING_CONFIDENCE = 0.5
 MAX_NUM_HANDS = 2
+HAND_MODEL_COMPLEXITY = 1  # MediaPipe手部关键点模型复杂度，0为轻量模型，1为完整模型（默认）
+SINGLE_HAND_MODE = False  # 只检测和跟踪一只手（max_num_hands=1），画面中只有控制手时可减少推理耗时
+
+# 手部身份跟踪配置：按手腕位置跨帧匹配，控制手不随左右分类跳变而丢失
+HAND_IDENTITY_TRACKING = True
+HAND_TRACK_MAX_DISTANCE = 0.15  # 相邻帧手腕最大位移（归一化坐标）
+HAND_TRACK_MAX_MISSED = 5  # 轨迹连续丢失超过该帧数即删除
+HAND_TRACK_LABEL_DECAY = 0.8  # 左右分类证据每帧衰减系数
+
+# 推理分辨率：整帧送入MediaPipe前的缩放比例，小于1时降低缩放和颜色转换开销，适合低功耗设备。
+# 视频模式的MediaPipe在手被跟踪期间本身就跳过手掌检测，不再单独裁剪手部区域。开启画质控制时由其接管
+HAND_INFERENCE_SCALE = 1.0
+
+# 多进程推理配置：大于0时在这么多个工作进程中运行手部检测，帧通过共享内存传递
+INFERENCE_PROCESSES = 0
+INFERENCE_RING_SLOTS = 0  # 共享内存帧槽位数，0表示工作进程数的2倍
+INFERENCE_REORDER_TIMEOUT = 0.5  # 某一帧超过该时间（秒）仍未返回时跳过，不再等待按序输出
+
+# 空闲模式配置：连续多帧未检测到手时降低检测频率
+IDLE_AFTER_FRAMES = 30  # 连续无手帧数阈值
+IDLE_DETECTION_RATE_HZ = 4.0  # 空闲时的检测频率
+
+# 运动门控配置：画面静止且无手时跳过推理
+MOTION_GATE_ENABLED = True
+MOTION_GATE_SIZE = (64, 48)  # 比较用小图尺寸 (宽, 高)
+MOTION_GATE_PIXEL_THRESHOLD = 20  # 单个像素灰度变化阈值
+MOTION_GATE_THRESHOLD = 0.01  # 变化像素比例超过该值视为有运动
+
+# 画质控制配置：根据实测的每帧处理时间自动调整推理分辨率、模型复杂度和检测间隔
+QUALITY_CONTROL_ENABLED = False
+QUALITY_TARGET_FRAME_MS = 25.0  # 每帧处理时间目标（毫秒），略低于TIMER_INTERVAL_MS，为显示留出余量
+QUALITY_LEVELS = (  # 从高到低的画质等级: (推理分辨率缩放, 模型复杂度, 每隔几帧检测一次)
+    (1.0, 1, 1),
+    (1.0, 0, 1),
+    (0.75, 0, 1),
+    (0.5, 0, 1),
+    (0.5, 0, 2),
+    (0.5, 0, 3),
+)
+QUALITY_SMOOTHING = 0.1  # 每帧耗时的指数平滑系数
+QUALITY_UPGRADE_RATIO = 0.6  # 平滑耗时低于目标的该倍数时才考虑升级
+QUALITY_DOWNGRADE_FRAMES = 10  # 连续超出目标这么多次检测后降级
+QUALITY_UPGRADE_FRAMES = 90  # 连续低于升级阈值这么多次检测后升级，刚升级就被迫降回时加倍
+QUALITY_SETTLE_FRAMES = 15  # 每次调整后丢弃的测量次数（模型重建等一次性开销）
+
+# 手势状态机配置（按下/松开去抖）
+GESTURE_VOTE_WINDOW = 5  # 投票窗口帧数M
+GESTURE_ENTER_VOTES = 3  # 手势在窗口中达到该帧数才进入对应状态
+GESTURE_EXIT_VOTES = 1  # 手势在窗口中降到该帧数及以下才退出，小于进入票数形成滞回
+GESTURE_DRAG_ENABLED = True  # True: 按下手势时按下左键、松开时释放，可按住拖动; False: 按下手势时立即完成一次点击
+DRAG_HOLD_TIME = 0.35  # 按住超过该时间（秒）后光标跟随食指移动，即拖动
+DOUBLE_CLICK_INTERVAL = 0.5  # 两次按下间隔小于该时间（秒）计为双击
 
 # 鼠标控制配置
 MOUSE_SMOOTH_FACTOR = 0.2
 MOUSE_MAX_VELOCITY = 100
-CLICK_INTERVAL = 3  # 秒
+MOUSE_CONTROL_MODE = "relative"  # "relative": 按手指位移相对移动; "absolute": 将校准区域映射到整个屏幕
+ACTIVE_REGION = (0.2, 0.2, 0.8, 0.8)  # 绝对定位的默认活动区域 (x0, y0, x1, y1)，画面归一化坐标
+CALIBRATION_FILE = "calibration.json"  # 活动区域校准结果保存位置
+CALIBRATION_MARGIN = 0.02  # 校准时在手指活动范围外额外收缩的边距，便于到达屏幕边缘
+
+# 鼠标注入配置
+MOUSE_BACKEND = "pyautogui"  # 可选: "pyautogui", "xtest", "recording"
+MOUSE_ASYNC_INJECTION = True  # 在独立线程中注入鼠标事件并合并未执行的移动
+MOUSE_BACKEND_TIMEOUT = 2.0  # 异步注入时等待注入线程创建后端的最长时间（秒），超时视为后端不可用
+
+# 远程鼠标配置（UDP，捕获端发送、光标所在主机接收）
+REMOTE_MOUSE_TARGET = None  # "主机:端口"，设置后图形界面把鼠标事件发送到远程接收端而不是本机
+REMOTE_PORT = 47800  # 接收端默认监听端口
+REMOTE_BUTTON_REPEAT = 3  # 按键包连续发送的次数，接收端按序号去重
+REMOTE_HEARTBEAT_INTERVAL = 0.2  # 发送端心跳间隔（秒），心跳携带左键状态，用于补上丢失的按键包
+REMOTE_TIMEOUT = 1.0  # 接收端超过这么久没有收到发送端的包时释放按下的左键（秒）
+REMOTE_SIZE_TIMEOUT = 1.0  # 发送端等待接收端返回屏幕尺寸的时间（秒）
+REMOTE_DEFAULT_SCREEN_SIZE = (1920, 1080)  # 未收到接收端屏幕尺寸时使用
+
+# 指针滤波配置
+POINTER_FILTER = "one_euro"  # 可选: "one_euro", "kalman", "ema", "none"（原有的速度平滑）
+POINTER_PREDICTION_MS = 0.0  # 按估计速度向前外推的时间，用于补偿捕获和推理延迟
+ONE_EURO_MIN_CUTOFF = 1.0  # 最小截止频率（Hz），越小静止时越稳
+ONE_EURO_BETA = 0.01  # 速度对截止频率的影响，越大快速移动时滞后越小
+ONE_EURO_D_CUTOFF = 1.0  # 速度估计的截止频率（Hz）
+KALMAN_PROCESS_NOISE = 1.0e5  # 加速度噪声强度（像素/秒²）²
+KALMAN_MEASUREMENT_NOISE = 4.0  # 测量噪声方差（像素²）
+
+# 关键点录制配置
+RECORDING_DIR = "recordings"  # 录制文件保存目录
+
+# 延迟统计配置
+METRICS_ENABLED = True  # 记录各阶段耗时，开销很小，可以一直开启
+METRICS_WINDOW = 512  # 每个阶段保留的最近样本数
+METRICS_EXPORT_FILE = None  # 定期导出统计的文件，扩展名为.prom时写Prometheus文本格式，否则追加JSONL
+METRICS_EXPORT_INTERVAL = 10.0  # 导出间隔（秒）
+METRICS_PANEL_REFRESH = 0.5  # 覆盖层延迟面板的刷新间隔（秒）
 
 # 界面配置
 WINDOW_TITLE = "隔空控制鼠标"
@@ -21,6 +127,7 @@ WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 VIDEO_LABEL_MIN_WIDTH = 640
 VIDEO_LABEL_MIN_HEIGHT = 480
+PREVIEW_OPENGL = False  # 使用QOpenGLWidget显示预览，由GPU完成缩放
 
 # 更新频率配置
 TIMER_INTERVAL_MS = 30  # 约33 FPS
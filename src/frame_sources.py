@@ -0,0 +1,337 @@
+"""帧源模块，为摄像头、视频文件和合成画面提供统一的读取接口
+
+所有帧源都实现与cv2.VideoCapture相同的 isOpened() / read() / release() 接口，可直接交给CameraHandler的捕获线程。
+open()返回是否成功，settings()返回实际生效的参数（分辨率、帧率、像素格式等），
+last_timestamp为最近一帧的捕获时间（time.monotonic()时钟）。
+视频文件和合成帧源支持按帧率实时节拍输出（realtime=True）或尽可能快地输出（realtime=False，用于吞吐量测试）。
+"""
+
+import platform
+import time
+import cv2
+import numpy as np
+from constants import DRIVER_TIMESTAMP_MAX_AGE, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAMERA_FOURCC, CAMERA_BUFFER_SIZE
+
+
+def decode_fourcc(value):
+    """将CAP_PROP_FOURCC返回的数值转换为四字符字符串"""
+    value = int(value)
+    if value <= 0:
+        return ""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+class FramePacer:
+    """按固定帧率节拍输出：每次wait()阻塞到下一帧的预定时间"""
+    
+    def __init__(self, fps):
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self._next_time = None
+    
+    def reset(self):
+        self._next_time = None
+    
+    def wait(self):
+        if self.interval <= 0:
+            return
+        now = time.monotonic()
+        if self._next_time is None:
+            self._next_time = now
+        delay = self._next_time - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -self.interval:
+            # 落后超过一帧（例如调用方处理过慢）时重新对齐，不连续突发输出追赶
+            self._next_time = now
+        self._next_time += self.interval
+
+
+class FrameSource:
+    """帧源基类"""
+    
+    kind = "base"
+    
+    def __init__(self):
+        self._opened = False
+        self.frames_read = 0
+        self.last_timestamp = 0.0  # 最近一帧的捕获时间（time.monotonic()）
+    
+    def open(self):
+        """打开帧源，返回是否成功"""
+        raise NotImplementedError
+    
+    def read(self):
+        """读取下一帧，返回 (ret, frame)"""
+        raise NotImplementedError
+    
+    def release(self):
+        self._opened = False
+    
+    def isOpened(self):
+        return self._opened
+    
+    def settings(self):
+        """返回帧源实际生效的参数"""
+        return {'kind': self.kind}
+    
+    def describe(self):
+        """返回实际参数的简短描述，用于日志和界面显示"""
+        settings = self.settings()
+        text = f"{settings.get('width', '?')}x{settings.get('height', '?')}@{settings.get('fps', 0):.1f}"
+        if settings.get('fourcc'):
+            text += f" {settings['fourcc']}"
+        if settings.get('realtime') is False:
+            text += " (不限速)"
+        return text
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+    
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                break
+            yield frame
+
+
+class CameraSource(FrameSource):
+    """摄像头帧源，打开时协商最低延迟的采集模式
+    
+    依次请求MJPG像素格式（USB摄像头在高分辨率下通常只有MJPG能达到满帧率）、目标分辨率和帧率，
+    并把驱动缓冲区设为1帧，避免读到排队的旧帧。驱动不一定接受这些请求，打开后会读回实际值，
+    并以第一帧的实际尺寸为准。
+    """
+    
+    kind = "camera"
+    
+    def __init__(self, device, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+                 fourcc=CAMERA_FOURCC, buffer_size=CAMERA_BUFFER_SIZE):
+        super().__init__()
+        self.device = device
+        self.requested = {'width': width, 'height': height, 'fps': fps,
+                          'fourcc': fourcc, 'buffer_size': buffer_size}
+        self.negotiated = {}
+        self.cap = None
+        self._first_frame = None
+        self._first_timestamp = 0.0
+        self.driver_timestamps = False  # 最近一帧是否使用了驱动提供的缓冲区时间戳
+    
+    def open(self):
+        self.release()
+        # Linux下直接使用V4L2后端，避免GStreamer等后端额外的缓冲
+        if platform.system() == "Linux":
+            self.cap = cv2.VideoCapture(self.device, cv2.CAP_V4L2)
+            if not self.cap.isOpened():
+                self.cap = cv2.VideoCapture(self.device)
+        else:
+            self.cap = cv2.VideoCapture(self.device)
+        if not self.cap.isOpened():
+            return False
+        
+        requested = self.requested
+        # 像素格式需要在分辨率之前设置，部分驱动在切换格式时会重置分辨率
+        if requested['fourcc']:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*requested['fourcc']))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, requested['width'])
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, requested['height'])
+        self.cap.set(cv2.CAP_PROP_FPS, requested['fps'])
+        if requested['buffer_size']:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, requested['buffer_size'])
+        
+        self.negotiated = {
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': float(self.cap.get(cv2.CAP_PROP_FPS)),
+            'fourcc': decode_fourcc(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            'buffer_size': int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+            'backend': self.cap.getBackendName(),
+        }
+        # 属性读回值不一定可靠，以实际输出的第一帧尺寸为准
+        ret, frame = self.cap.read()
+        if ret:
+            self.negotiated['height'], self.negotiated['width'] = frame.shape[:2]
+            self._first_frame = frame
+            self._first_timestamp = self._frame_timestamp()
+        self._opened = True
+        self._report_mismatches()
+        return True
+    
+    def _report_mismatches(self):
+        """打印驱动未接受的请求参数"""
+        requested, negotiated = self.requested, self.negotiated
+        mismatches = []
+        if (negotiated['width'], negotiated['height']) != (requested['width'], requested['height']):
+            mismatches.append(f"分辨率 {requested['width']}x{requested['height']} -> "
+                              f"{negotiated['width']}x{negotiated['height']}")
+        if negotiated['fps'] and abs(negotiated['fps'] - requested['fps']) > 0.5:
+            mismatches.append(f"帧率 {requested['fps']} -> {negotiated['fps']:.1f}")
+        if requested['fourcc'] and negotiated['fourcc'] and negotiated['fourcc'] != requested['fourcc']:
+            mismatches.append(f"像素格式 {requested['fourcc']} -> {negotiated['fourcc']}")
+        if requested['buffer_size'] and negotiated['buffer_size'] not in (0, requested['buffer_size']):
+            mismatches.append(f"缓冲区 {requested['buffer_size']} -> {negotiated['buffer_size']}")
+        if mismatches:
+            print(f"摄像头 {self.device} 未接受部分参数: {', '.join(mismatches)}")
+    
+    def _frame_timestamp(self):
+        """返回刚读取的帧的捕获时间
+        
+        V4L2后端的CAP_PROP_POS_MSEC是驱动填写的缓冲区时间戳（与time.monotonic()同为CLOCK_MONOTONIC），
+        比读取完成的时间更早、更准确。其他后端可能返回0或从打开开始计算的时间，
+        与当前时间相差过大时改用读取完成的时间。
+        """
+        now = time.monotonic()
+        driver_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        self.driver_timestamps = 0.0 <= now - driver_time < DRIVER_TIMESTAMP_MAX_AGE
+        return driver_time if self.driver_timestamps else now
+    
+    def read(self):
+        if self._first_frame is not None:
+            frame, self._first_frame = self._first_frame, None
+            self.last_timestamp = self._first_timestamp
+            self.frames_read += 1
+            return True, frame
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read()
+        if ret:
+            self.last_timestamp = self._frame_timestamp()
+            self.frames_read += 1
+        return ret, frame
+    
+    def release(self):
+        super().release()
+        self._first_frame = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def isOpened(self):
+        return self._opened and self.cap is not None and self.cap.isOpened()
+    
+    def settings(self):
+        return {'kind': self.kind, 'device': self.device, 'requested': dict(self.requested),
+                'driver_timestamps': self.driver_timestamps, **self.negotiated}
+
+
+class VideoFileSource(FrameSource):
+    """视频文件帧源，realtime为True时按文件帧率输出，loop为True时循环播放"""
+    
+    kind = "file"
+    
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.cap = None
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.pacer = None
+    
+    def open(self):
+        self.release()
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS)) or float(CAMERA_FPS)
+        self.pacer = FramePacer(self.fps if self.realtime else 0)
+        self._opened = True
+        return True
+    
+    def read(self):
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.frames_read > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        self.pacer.wait()
+        self.last_timestamp = time.monotonic()
+        self.frames_read += 1
+        return True, frame
+    
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def settings(self):
+        return {'kind': self.kind, 'path': self.path, 'width': self.width, 'height': self.height,
+                'fps': self.fps, 'realtime': self.realtime, 'loop': self.loop}
+
+
+class SyntheticSource(FrameSource):
+    """合成帧源：带噪声的背景上一个沿正弦轨迹移动的色块，count为None时无限输出"""
+    
+    kind = "synthetic"
+    
+    def __init__(self, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS, count=None,
+                 realtime=True, seed=0, period=None):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.fps = float(fps)
+        self.count = count
+        self.realtime = realtime
+        self.seed = seed
+        # 色块完整移动一次的帧数，默认为count（与原基准测试的合成帧一致）或5秒
+        self.period = period or count or int(self.fps * 5)
+        self.pacer = FramePacer(self.fps if realtime else 0)
+        self._background = None
+    
+    def open(self):
+        rng = np.random.default_rng(self.seed)
+        self._background = rng.integers(0, 40, size=(self.height, self.width, 3), dtype=np.uint8)
+        self.frames_read = 0
+        self.pacer.reset()
+        self._opened = True
+        return True
+    
+    def read(self):
+        if not self._opened or (self.count is not None and self.frames_read >= self.count):
+            return False, None
+        frame = self._background.copy()
+        x, y = self.target_position(self.frames_read)
+        cv2.circle(frame, (int(self.width * x), int(self.height * y)), 40, (120, 160, 210), -1)
+        self.pacer.wait()
+        self.last_timestamp = time.monotonic()
+        self.frames_read += 1
+        return True, frame
+    
+    def target_position(self, index):
+        """第index帧色块中心的归一化坐标，子类可以覆盖以生成其他轨迹"""
+        t = (index % self.period) / max(1, self.period - 1)
+        return 0.2 + 0.6 * t, 0.5 + 0.2 * np.sin(t * 6.28)
+    
+    def settings(self):
+        return {'kind': self.kind, 'width': self.width, 'height': self.height, 'fps': self.fps,
+                'count': self.count, 'realtime': self.realtime}
+
+
+def create_frame_source(source, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS, realtime=True):
+    """根据描述创建帧源（未打开）
+    
+    source可以是摄像头索引（int或数字字符串）、设备路径（/dev/video*）、
+    "synthetic" / "synthetic:帧数"，或视频文件路径
+    """
+    if isinstance(source, int):
+        return CameraSource(source, width, height, fps)
+    source = str(source)
+    if source.isdigit():
+        return CameraSource(int(source), width, height, fps)
+    if source.startswith("/dev/video"):
+        return CameraSource(source, width, height, fps)
+    if source == "synthetic" or source.startswith("synthetic:"):
+        _, _, count = source.partition(":")
+        return SyntheticSource(width, height, fps, count=int(count) if count else None, realtime=realtime)
+    return VideoFileSource(source, realtime=realtime)
@@ -0,0 +1,183 @@
+"""手势控制模块，负责将手部分析结果映射为鼠标移动和点击"""
+
+import json
+import os
+import time
+from gesture_state import GestureStateMachine, STATE_POINTING, GESTURE_POINT
+from constants import MOUSE_CONTROL_MODE, ACTIVE_REGION, CALIBRATION_FILE, CALIBRATION_MARGIN, GESTURE_DRAG_ENABLED
+
+
+def load_active_region(path=CALIBRATION_FILE):
+    """读取保存的活动区域，文件不存在或无效时返回默认区域"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            region = tuple(float(v) for v in json.load(f)["active_region"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return ACTIVE_REGION
+    if len(region) != 4 or region[2] <= region[0] or region[3] <= region[1]:
+        return ACTIVE_REGION
+    return region
+
+
+def save_active_region(region, path=CALIBRATION_FILE):
+    """保存活动区域"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"active_region": list(region)}, f, indent=2)
+
+
+class GestureController:
+    """手势控制器类，根据每帧的HandAnalysis驱动MouseController
+    
+    relative模式下按食指尖位移相对移动光标；absolute模式下将画面中的活动区域映射到整个屏幕，
+    食指尖位置直接决定光标位置，不会随时间漂移。
+    点击由GestureStateMachine去抖：drag_enabled为True时按下手势按下左键、松开手势释放左键，
+    按住超过DRAG_HOLD_TIME后光标跟随食指移动（拖动）；为False时按下手势立即完成一次点击。
+    """
+    
+    def __init__(self, mouse_controller, mode=MOUSE_CONTROL_MODE, active_region=None, drag_enabled=GESTURE_DRAG_ENABLED):
+        self.mouse_controller = mouse_controller
+        self.mode = mode
+        self.drag_enabled = drag_enabled
+        self.gesture_state = GestureStateMachine()
+        self.last_events = None  # 最近一帧的GestureEvents
+        self.hand_id = None  # 当前控制手的跟踪ID
+        self.active_region = active_region if active_region is not None else load_active_region()
+        self.calibration_points = None  # 校准过程中收集的食指尖位置
+        self.right_index_finger_detected_prev = False  # 上一帧是否检测到右手食指
+        self.prev_index_tip_x = None  # 上一帧食指尖x坐标
+        self.prev_index_tip_y = None  # 上一帧食指尖y坐标
+    
+    def reset(self):
+        """重置跟踪变量、手势状态和鼠标速度，释放仍按下的左键"""
+        self.reset_tracking()
+        self.gesture_state.reset()
+        self.hand_id = None
+        self.mouse_controller.mouse_up()
+    
+    def reset_tracking(self):
+        """重置相对移动的跟踪变量和鼠标速度，下一次移动从当前食指位置重新开始"""
+        self.right_index_finger_detected_prev = False
+        self.prev_index_tip_x = None
+        self.prev_index_tip_y = None
+        self.mouse_controller.reset_velocity()
+    
+    def update(self, analysis, mouse_control_enabled=True, click_enabled=True, timestamp=None):
+        """根据一帧的分析结果执行鼠标动作，timestamp为该帧的捕获时间
+        
+        返回 (mouse_control_active, click_executed)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if analysis is not None and analysis.hand_id != self.hand_id:
+            # 控制权换到另一只手时，之前的投票和相对位移都不再适用
+            if self.hand_id is not None:
+                self.reset()
+            self.hand_id = analysis.hand_id
+        events = self.gesture_state.update(analysis, timestamp)
+        self.last_events = events
+        
+        # 按下手势：去抖后的进入/退出分别对应按下/释放左键
+        click_executed = False
+        if not click_enabled:
+            self.mouse_controller.mouse_up()
+        elif events.press:
+            if self.drag_enabled:
+                click_executed = self.mouse_controller.mouse_down(timestamp)
+            else:
+                click_executed = self.mouse_controller.left_click(timestamp)
+        elif events.release:
+            self.mouse_controller.mouse_up(timestamp)
+        
+        # 指针状态下本帧只伸出食指，或按住拖动中，则由食指尖控制光标
+        pointing = events.state == STATE_POINTING and events.gesture == GESTURE_POINT
+        dragging = events.dragging and self.drag_enabled and analysis is not None
+        if self.right_index_finger_detected_prev and events.state != STATE_POINTING and not dragging:
+            # 离开指针状态（包括按下后、拖动开始前，此时食指会轻微抖动）时停止相对跟踪，
+            # 再次移动时从当时的食指位置重新开始，避免光标跳动
+            self.reset_tracking()
+        
+        mouse_control_active = False
+        if pointing and self.calibration_points is not None:
+            self.calibration_points.append(analysis.index_tip)
+        elif mouse_control_enabled and (pointing or dragging):
+            if self.mode == "absolute":
+                self.control_mouse_absolute(analysis.index_tip, timestamp)
+            else:
+                self.control_mouse_with_right_index_finger(analysis.index_tip, timestamp)
+            mouse_control_active = True
+        
+        return mouse_control_active, click_executed
+    
+    def control_mouse_absolute(self, finger_pos, timestamp=None):
+        """将活动区域内的食指尖位置映射为屏幕绝对坐标"""
+        x0, y0, x1, y1 = self.active_region
+        u = min(1.0, max(0.0, (finger_pos[0] - x0) / (x1 - x0)))
+        v = min(1.0, max(0.0, (finger_pos[1] - y0) / (y1 - y0)))
+        screen_x = u * (self.mouse_controller.screen_width - 1)
+        screen_y = v * (self.mouse_controller.screen_height - 1)
+        self.mouse_controller.move_mouse_absolute(screen_x, screen_y, timestamp)
+    
+    def start_calibration(self):
+        """开始校准：之后伸出食指时只记录位置，不移动光标"""
+        self.calibration_points = []
+    
+    def finish_calibration(self, save=True):
+        """结束校准，用记录到的食指尖活动范围作为活动区域
+        
+        采集点不足时保持原区域并返回None
+        """
+        points = self.calibration_points
+        self.calibration_points = None
+        if not points or len(points) < 10:
+            return None
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        x0, x1 = min(xs) + CALIBRATION_MARGIN, max(xs) - CALIBRATION_MARGIN
+        y0, y1 = min(ys) + CALIBRATION_MARGIN, max(ys) - CALIBRATION_MARGIN
+        if x1 - x0 < 0.05 or y1 - y0 < 0.05:
+            return None
+        self.active_region = (x0, y0, x1, y1)
+        self.mouse_controller.reset_velocity()
+        if save:
+            try:
+                save_active_region(self.active_region)
+            except OSError as e:
+                print(f"无法保存校准结果: {e}")
+        return self.active_region
+    
+    @property
+    def calibrating(self):
+        return self.calibration_points is not None
+    
+    def control_mouse_with_right_index_finger(self, finger_pos, timestamp=None):
+        """使用右手食指控制鼠标，finger_pos为归一化的食指尖坐标"""
+        if finger_pos is None:
+            return
+        
+        # Get screen dimensions
+        screen_width, screen_height = self.mouse_controller.screen_width, self.mouse_controller.screen_height
+        
+        # Convert normalized coordinates to screen coordinates (keep sub-pixel precision)
+        screen_x = finger_pos[0] * screen_width
+        screen_y = finger_pos[1] * screen_height
+        
+        # If this is the first frame detecting the right index finger, record initial position
+        if not self.right_index_finger_detected_prev:
+            self.prev_index_tip_x = screen_x
+            self.prev_index_tip_y = screen_y
+            self.right_index_finger_detected_prev = True
+            # Reset mouse controller velocity
+            self.mouse_controller.reset_velocity()
+            return
+        
+        # Calculate movement distance
+        dx = screen_x - self.prev_index_tip_x
+        dy = screen_y - self.prev_index_tip_y
+        
+        # Move mouse using the mouse controller
+        self.mouse_controller.move_mouse_relative(dx, dy, timestamp)
+        
+        # Update previous frame coordinates
+        self.prev_index_tip_x = screen_x
+        self.prev_index_tip_y = screen_y
+        self.right_index_finger_detected_prev = True
@@ -1,55 +1,182 @@
 """手势识别模块，负责使用MediaPipe进行手部检测和手势识别"""
 
+import importlib.util
+import threading
 import cv2
-import math
-import time
-from constants import HAND_DETECTION_CONFIDENCE, HAND_TRACKING_CONFIDENCE, MAX_NUM_HANDS
+import numpy as np
+from constants import HAND_DETECTION_CONFIDENCE, HAND_TRACKING_CONFIDENCE, MAX_NUM_HANDS, HAND_MODEL_COMPLEXITY, \
+    HAND_INFERENCE_SCALE, SINGLE_HAND_MODE, HAND_IDENTITY_TRACKING
+from hand_tracker import HandTracker
+
+
+# MediaPipe手部关键点索引（与HandLandmark枚举一致，避免每帧访问枚举属性）
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_FINGER_DIP = 7
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_DIP = 11
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_DIP = 15
+RING_FINGER_TIP = 16
+PINKY_DIP = 19
+PINKY_TIP = 20
+
+# 食指、中指、无名指、小指的指尖和第二关节索引
+_FINGER_TIPS = np.array([INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP])
+_FINGER_DIPS = np.array([INDEX_FINGER_DIP, MIDDLE_FINGER_DIP, RING_FINGER_DIP, PINKY_DIP])
+_THUMB_POINTS = np.array([THUMB_TIP, THUMB_IP])
+
+# 拇指弯曲判断系数：thumb tip到手腕的距离小于thumb ip到手腕距离的该倍数即视为弯曲
+THUMB_BENT_RATIO = 1.2
+
+
+class HandAnalysis:
+    """单帧手部分析结果"""
+    
+    __slots__ = ('landmarks', 'label', 'score', 'extended', 'thumb_bent',
+                 'index_only', 'index_and_middle', 'index_tip', 'hand_id')
+    
+    def __init__(self, landmarks, label, score, extended, thumb_bent, hand_id=None):
+        self.landmarks = landmarks  # (21, 3) 归一化关键点坐标
+        self.label = label  # 手的左右标签
+        self.score = score  # 左右分类置信度
+        self.hand_id = hand_id  # HandTracker分配的跨帧ID，未启用身份跟踪时为None
+        self.extended = extended  # 食指、中指、无名指、小指是否伸直
+        self.thumb_bent = thumb_bent
+        
+        index_ext, middle_ext, ring_ext, pinky_ext = extended
+        # 只有食指伸直，其他手指弯曲
+        self.index_only = bool(index_ext and not middle_ext and not ring_ext and not pinky_ext and thumb_bent)
+        # 食指和中指伸直，其他手指弯曲
+        self.index_and_middle = bool(index_ext and middle_ext and not ring_ext and not pinky_ext and thumb_bent)
+        self.index_tip = (float(landmarks[INDEX_FINGER_TIP, 0]), float(landmarks[INDEX_FINGER_TIP, 1]))
+
+
+def landmarks_to_array(hand_landmarks):
+    """将MediaPipe的关键点列表转换为 (21, 3) 的NumPy数组"""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+def analyze_hand(landmarks, label="Right", score=1.0, hand_id=None):
+    """对 (21, 3) 关键点数组进行一次向量化分析，返回HandAnalysis"""
+    # 指尖y坐标小于第二关节y坐标（更靠近图像顶部）即视为伸直
+    extended = landmarks[_FINGER_TIPS, 1] < landmarks[_FINGER_DIPS, 1]
+    
+    # 拇指判断：当拇指伸直时，其tip会远离手腕；弯曲时会靠近手腕
+    offsets = landmarks[_THUMB_POINTS, :2] - landmarks[WRIST, :2]
+    thumb_distance, thumb_ip_distance = np.hypot(offsets[:, 0], offsets[:, 1])
+    thumb_bent = bool(thumb_distance < thumb_ip_distance * THUMB_BENT_RATIO)
+    
+    return HandAnalysis(landmarks, label, score, extended.tolist(), thumb_bent, hand_id)
 
 
 class GestureRecognizer:
     """手势识别器类，负责手势检测和识别"""
     
-    def __init__(self):
-        # 尝试导入MediaPipe用于手势识别
-        try:
-            from mediapipe.python.solutions import hands
-            from mediapipe.python.solutions import drawing_utils
-            from mediapipe.python.solutions import drawing_styles
-            self.mp_hands = hands
-            self.mp_drawing = drawing_utils
-            self.mp_drawing_styles = drawing_styles
-            self.MEDIAPIPE_AVAILABLE = True
-            
-            # 初始化手部检测器
-            self.hands = self.mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=MAX_NUM_HANDS,
-                min_detection_confidence=HAND_DETECTION_CONFIDENCE,
-                min_tracking_confidence=HAND_TRACKING_CONFIDENCE
-            )
-        except ImportError:
-            self.MEDIAPIPE_AVAILABLE = False
-            self.mp_hands = None
-            self.mp_drawing = None
-            self.mp_drawing_styles = None
-            self.hands = None
-            print("MediaPipe未安装，手势识别功能将不可用")
+    def __init__(self, max_num_hands=MAX_NUM_HANDS,
+                 min_detection_confidence=HAND_DETECTION_CONFIDENCE,
+                 min_tracking_confidence=HAND_TRACKING_CONFIDENCE, lazy=False,
+                 single_hand=SINGLE_HAND_MODE, hand_tracking=HAND_IDENTITY_TRACKING,
+                 model_complexity=HAND_MODEL_COMPLEXITY, inference_scale=HAND_INFERENCE_SCALE):
+        # 手部身份跟踪：控制手由跨帧轨迹决定，而不是每帧重新按左右标签查找
+        self.hand_tracker = HandTracker("Right") if hand_tracking else None
+        
+        # 单手模式下检测器只搜索和跟踪一只手
+        self.single_hand = single_hand
+        self.max_num_hands = 1 if single_hand else max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        
+        # 画质等级：整帧推理前的缩放比例和模型复杂度，可由QualityController在运行时调整
+        self.model_complexity = model_complexity
+        self.inference_scale = inference_scale
+        self._hands_complexity = None  # 当前Hands实例使用的模型复杂度
+        
+        # MediaPipe导入和Hands图构建开销较大，延迟到load_model时进行。
+        # 在此之前只根据模块是否存在估计可用性，不实际导入
+        self.mp_hands = None
+        self.mp_drawing = None
+        self.mp_drawing_styles = None
+        self.hands = None
+        self.model_loaded = False
+        self.MEDIAPIPE_AVAILABLE = importlib.util.find_spec("mediapipe") is not None
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self.load_model()
+    
+    def load_model(self):
+        """导入MediaPipe并初始化手部检测器，可在任意线程调用，重复调用无副作用
+        
+        返回MediaPipe是否可用
+        """
+        with self._load_lock:
+            if self.model_loaded:
+                return self.MEDIAPIPE_AVAILABLE
+            # 尝试导入MediaPipe用于手势识别
+            try:
+                from mediapipe.python.solutions import hands
+                from mediapipe.python.solutions import drawing_utils
+                from mediapipe.python.solutions import drawing_styles
+                self.mp_hands = hands
+                self.mp_drawing = drawing_utils
+                self.mp_drawing_styles = drawing_styles
+                
+                # 初始化手部检测器
+                self._create_hands()
+                self.MEDIAPIPE_AVAILABLE = True
+            except ImportError:
+                self.MEDIAPIPE_AVAILABLE = False
+                self.mp_hands = None
+                self.mp_drawing = None
+                self.mp_drawing_styles = None
+                self.hands = None
+                print("MediaPipe未安装，手势识别功能将不可用")
+            self.model_loaded = True
+            return self.MEDIAPIPE_AVAILABLE
+    
+    def _create_hands(self):
+        """按当前配置创建Hands实例，调用方持有_load_lock"""
+        if self.hands is not None:
+            self.hands.close()
+        self.hands = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=self.max_num_hands,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence
+        )
+        self._hands_complexity = self.model_complexity
+    
+    def set_inference_quality(self, inference_scale, model_complexity):
+        """设置整帧推理的缩放比例和模型复杂度，可在任意线程调用，复杂度变化时下一帧推理前重建模型"""
+        self.inference_scale = inference_scale
+        self.model_complexity = model_complexity
+    
+    def _to_rgb(self, frame):
+        """按inference_scale缩小整帧并转换为RGB，关键点为归一化坐标，不受缩放影响"""
+        scale = self.inference_scale
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     
     def process_frame(self, frame):
-        """处理图像帧以检测手部"""
+        """处理图像帧以检测手部，模型尚未加载时先加载"""
+        if not self.model_loaded:
+            self.load_model()
         if not self.MEDIAPIPE_AVAILABLE or self.hands is None:
             return None
+        if self.model_complexity != self._hands_complexity:
+            with self._load_lock:
+                self._create_hands()
         
-        # 将BGR图像转换为RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # 处理图像以检测手部
-        results = self.hands.process(rgb_frame)
+        # 将BGR图像转换为RGB并处理图像以检测手部
+        results = self.hands.process(self._to_rgb(frame))
         return results
     
     def draw_landmarks(self, frame, results):
         """在图像上绘制手部关键点"""
-        if not self.MEDIAPIPE_AVAILABLE or not results.multi_hand_landmarks:
+        if self.mp_drawing is None or not results or not results.multi_hand_landmarks:
             return frame
         
         for hand_landmarks in results.multi_hand_landmarks:
@@ -63,135 +190,55 @@ class GestureRecognizer:
             )
         return frame
     
-    def detect_right_index_finger_only(self, results):
-        """检测是否只伸出右手食指"""
-        if not self.MEDIAPIPE_AVAILABLE or not results.multi_hand_landmarks or not results.multi_handedness:
-            return "NO"
-        
-        # 查找右手
-        right_hand_landmarks = None
-        right_hand_index = -1
-        
-        for i, handedness in enumerate(results.multi_handedness):
-            if handedness.classification[0].label == "Right":
-                right_hand_landmarks = results.multi_hand_landmarks[i]
-                right_hand_index = i
-                break
-        
-        if right_hand_landmarks is None:
-            return "NO"
-        
-        # 获取右手关键点
-        landmarks = right_hand_landmarks.landmark
-        
-        # 获取各个手指关键点
-        index_tip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_TIP.value]
-        index_dip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_DIP.value]
-        middle_tip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP.value]
-        middle_dip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_DIP.value]
-        ring_tip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_TIP.value]
-        ring_dip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_DIP.value]
-        pinky_tip = landmarks[self.mp_hands.HandLandmark.PINKY_TIP.value]
-        pinky_dip = landmarks[self.mp_hands.HandLandmark.PINKY_DIP.value]
-        thumb_tip = landmarks[self.mp_hands.HandLandmark.THUMB_TIP.value]
-        thumb_ip = landmarks[self.mp_hands.HandLandmark.THUMB_IP.value]
-        
-        wrist = landmarks[self.mp_hands.HandLandmark.WRIST.value]
-        
-        # 判断食指是否伸直（指尖y坐标小于第二关节y坐标，即更靠近图像顶部）
-        index_extended = index_tip.y < index_dip.y
-        
-        # 判断其他手指是否弯曲（指尖y坐标大于第二关节y坐标，即更靠近图像底部）
-        middle_bent = middle_tip.y > middle_dip.y
-        ring_bent = ring_tip.y > ring_dip.y
-        pinky_bent = pinky_tip.y > pinky_dip.y
-        
-        # 拇指判断：当拇指伸直时，其tip会远离手腕；弯曲时会靠近手腕
-        # 计算拇指tip到手腕的距离，以及thumb_ip到手腕的距离
-        thumb_distance = math.sqrt((thumb_tip.x - wrist.x)**2 + (thumb_tip.y - wrist.y)**2)
-        thumb_ip_distance = math.sqrt((thumb_ip.x - wrist.x)**2 + (thumb_ip.y - wrist.y)**2)
-        
-        # 拇指弯曲：thumb tip相对靠近手腕
-        thumb_bent = thumb_distance < thumb_ip_distance * 1.2  # 乘以系数允许一些变化
-        
-        # 综合判断：只有食指伸直，其他手指弯曲
-        if index_extended and middle_bent and ring_bent and pinky_bent and thumb_bent:
-            return "YES"
-        else:
-            return "NO"
-    
-    def detect_right_index_and_middle_fingers(self, results):
-        """检测是否伸出右手食指和中指"""
-        if not self.MEDIAPIPE_AVAILABLE or not results.multi_hand_landmarks or not results.multi_handedness:
-            return "NO"
-        
-        # 查找右手
-        right_hand_landmarks = None
-        right_hand_index = -1
-        
-        for i, handedness in enumerate(results.multi_handedness):
-            if handedness.classification[0].label == "Right":
-                right_hand_landmarks = results.multi_hand_landmarks[i]
-                right_hand_index = i
-                break
-        
-        if right_hand_landmarks is None:
-            return "NO"
-        
-        # 获取右手关键点
-        landmarks = right_hand_landmarks.landmark
-        
-        # 获取各个手指关键点
-        index_tip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_TIP.value]
-        index_dip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_DIP.value]
-        middle_tip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP.value]
-        middle_dip = landmarks[self.mp_hands.HandLandmark.MIDDLE_FINGER_DIP.value]
-        ring_tip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_TIP.value]
-        ring_dip = landmarks[self.mp_hands.HandLandmark.RING_FINGER_DIP.value]
-        pinky_tip = landmarks[self.mp_hands.HandLandmark.PINKY_TIP.value]
-        pinky_dip = landmarks[self.mp_hands.HandLandmark.PINKY_DIP.value]
-        thumb_tip = landmarks[self.mp_hands.HandLandmark.THUMB_TIP.value]
-        thumb_ip = landmarks[self.mp_hands.HandLandmark.THUMB_IP.value]
-        
-        wrist = landmarks[self.mp_hands.HandLandmark.WRIST.value]
-        
-        # 判断食指和中指是否伸直（指尖y坐标小于第二关节y坐标，即更靠近图像顶部）
-        index_extended = index_tip.y < index_dip.y
-        middle_extended = middle_tip.y < middle_dip.y
-        
-        # 判断其他手指是否弯曲（指尖y坐标大于第二关节y坐标，即更靠近图像底部）
-        ring_bent = ring_tip.y > ring_dip.y
-        pinky_bent = pinky_tip.y > pinky_dip.y
-        
-        # 拇指判断：当拇指伸直时，其tip会远离手腕；弯曲时会靠近手腕
-        thumb_distance = math.sqrt((thumb_tip.x - wrist.x)**2 + (thumb_tip.y - wrist.y)**2)
-        thumb_ip_distance = math.sqrt((thumb_ip.x - wrist.x)**2 + (thumb_ip.y - wrist.y)**2)
-        
-        # 拇指弯曲：thumb tip相对靠近手腕
-        thumb_bent = thumb_distance < thumb_ip_distance * 1.2  # 乘以系数允许一些变化
-        
-        # 综合判断：食指和中指伸直，其他手指弯曲
-        if index_extended and middle_extended and ring_bent and pinky_bent and thumb_bent:
-            return "YES"
-        else:
-            return "NO"
-    
-    def get_right_index_finger_position(self, results):
-        """获取右手食指尖的位置坐标"""
-        if not self.MEDIAPIPE_AVAILABLE or not results.multi_hand_landmarks or not results.multi_handedness:
+    def find_hand(self, results, label="Right"):
+        """查找指定标签的第一只手，返回 (landmarks, score)，未找到返回None"""
+        if not results or not results.multi_hand_landmarks or not results.multi_handedness:
             return None
-        
-        # 查找右手
-        right_hand_landmarks = None
         for i, handedness in enumerate(results.multi_handedness):
-            if handedness.classification[0].label == "Right":
-                right_hand_landmarks = results.multi_hand_landmarks[i]
-                break
+            classification = handedness.classification[0]
+            if classification.label == label:
+                return results.multi_hand_landmarks[i], classification.score
+        return None
+    
+    def detected_hands(self, results):
+        """返回当前帧检测到的 [(label, score, landmarks)]，landmarks为 (21, 3) 数组"""
+        if not results or not results.multi_hand_landmarks or not results.multi_handedness:
+            return []
+        return [
+            (handedness.classification[0].label, handedness.classification[0].score, landmarks_to_array(hand_landmarks))
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness)
+        ]
+    
+    def analyze(self, results):
+        """对当前帧的右手进行一次性分析，未检测到右手时返回None
         
-        if right_hand_landmarks is None:
+        启用身份跟踪时每帧只应调用一次（会推进HandTracker）：控制手一旦选定，即使本帧被分类为左手也继续返回它；
+        同一帧需要多种判断时，复用返回的HandAnalysis
+        """
+        if not self.MEDIAPIPE_AVAILABLE:
             return None
-        
-        # 获取右手食指尖坐标
-        landmarks = right_hand_landmarks.landmark
-        index_tip = landmarks[self.mp_hands.HandLandmark.INDEX_FINGER_TIP.value]
-        return index_tip.x, index_tip.y
\ No newline at end of file
+        if self.hand_tracker is not None:
+            return self.analyze_hands(self.detected_hands(results))
+        hand = self.find_hand(results, "Right")
+        if hand is None:
+            return None
+        hand_landmarks, score = hand
+        return analyze_hand(landmarks_to_array(hand_landmarks), "Right", score)
+    
+    def analyze_hands(self, hands, label="Right"):
+        """对已提取的 [(label, score, landmarks)] 做控制手选择和分析，用于检测在其他进程中完成的情况"""
+        if self.hand_tracker is not None:
+            track = self.hand_tracker.update(hands)
+            if track is None:
+                return None
+            return analyze_hand(track.landmarks, track.label, track.score, track.id)
+        for hand_label, score, landmarks in hands:
+            if hand_label == label:
+                return analyze_hand(landmarks, label, score)
+        return None
+    
+    def set_model_state(self, available):
+        """模型由工作进程加载时，在本进程中同步加载状态，不导入MediaPipe"""
+        with self._load_lock:
+            self.MEDIAPIPE_AVAILABLE = bool(available)
+            self.model_loaded = True
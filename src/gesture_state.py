@@ -0,0 +1,114 @@
+"""手势状态机模块，对逐帧的手势分类做时间上的去抖
+
+单帧分类结果有噪声：一帧误识别的"食指+中指"不应触发点击，短暂丢失的"食指"也不应打断指针移动。
+状态机对最近M帧的分类投票，某个手势在窗口中达到进入票数才进入对应状态，降到退出票数以下才退出
+（进入票数大于退出票数，形成滞回）。按下手势进入时发出press，退出时发出release，
+release之后才能再次press，因此可以快速连续点击、双击，也可以按住拖动。
+"""
+
+from collections import deque
+from constants import GESTURE_VOTE_WINDOW, GESTURE_ENTER_VOTES, GESTURE_EXIT_VOTES, \
+    DRAG_HOLD_TIME, DOUBLE_CLICK_INTERVAL
+
+# 单帧手势分类
+GESTURE_POINT = "point"  # 只伸出食指
+GESTURE_PRESS = "press"  # 伸出食指和中指
+
+# 去抖后的状态
+STATE_IDLE = "idle"
+STATE_POINTING = "pointing"
+STATE_PRESSED = "pressed"
+
+
+def classify_gesture(analysis):
+    """将单帧HandAnalysis分类为GESTURE_POINT、GESTURE_PRESS或None"""
+    if analysis is None:
+        return None
+    if analysis.index_and_middle:
+        return GESTURE_PRESS
+    if analysis.index_only:
+        return GESTURE_POINT
+    return None
+
+
+class GestureEvents:
+    """一帧更新后的状态和事件"""
+    
+    __slots__ = ('gesture', 'state', 'press', 'release', 'double_click', 'drag_started', 'dragging')
+    
+    def __init__(self, gesture, state):
+        self.gesture = gesture  # 本帧的原始分类
+        self.state = state  # 去抖后的状态
+        self.press = False  # 本帧进入按下状态
+        self.release = False  # 本帧退出按下状态
+        self.double_click = False  # 本次按下与上一次按下的间隔小于DOUBLE_CLICK_INTERVAL
+        self.drag_started = False  # 本帧按住时间达到DRAG_HOLD_TIME
+        self.dragging = False  # 处于按住拖动中
+
+
+class GestureStateMachine:
+    """基于N-of-M投票和滞回的手势状态机"""
+    
+    def __init__(self, window=GESTURE_VOTE_WINDOW, enter_votes=GESTURE_ENTER_VOTES, exit_votes=GESTURE_EXIT_VOTES,
+                 drag_hold_time=DRAG_HOLD_TIME, double_click_interval=DOUBLE_CLICK_INTERVAL):
+        if not 0 <= exit_votes < enter_votes <= window:
+            raise ValueError("需要满足 0 <= exit_votes < enter_votes <= window")
+        self.enter_votes = enter_votes
+        self.exit_votes = exit_votes
+        self.drag_hold_time = drag_hold_time
+        self.double_click_interval = double_click_interval
+        self._history = deque(maxlen=window)
+        self.state = STATE_IDLE
+        self.press_time = None  # 最近一次进入按下状态的时间
+        self.last_press_time = None  # 上一次按下的时间，用于判断双击
+        self.dragging = False
+        self.press_count = 0
+        self.double_click_count = 0
+    
+    def reset(self):
+        """清空投票窗口并回到空闲状态（不发出release，由调用方负责释放按键）"""
+        self._history.clear()
+        self.state = STATE_IDLE
+        self.press_time = None
+        self.dragging = False
+    
+    def votes(self, gesture):
+        """返回投票窗口中该手势的帧数"""
+        return sum(1 for g in self._history if g == gesture)
+    
+    def update(self, analysis, timestamp):
+        """输入一帧的分析结果和捕获时间（秒），返回GestureEvents"""
+        gesture = classify_gesture(analysis)
+        self._history.append(gesture)
+        press_votes = self.votes(GESTURE_PRESS)
+        point_votes = self.votes(GESTURE_POINT)
+        events = GestureEvents(gesture, self.state)
+        
+        if self.state == STATE_PRESSED:
+            if press_votes <= self.exit_votes:
+                events.release = True
+                self.dragging = False
+                self.press_time = None
+                self.state = STATE_POINTING if point_votes > self.exit_votes else STATE_IDLE
+            elif not self.dragging and timestamp - self.press_time >= self.drag_hold_time:
+                self.dragging = True
+                events.drag_started = True
+        elif press_votes >= self.enter_votes:
+            # 按下优先于指针移动
+            events.press = True
+            self.state = STATE_PRESSED
+            self.press_time = timestamp
+            self.press_count += 1
+            if self.last_press_time is not None and timestamp - self.last_press_time <= self.double_click_interval:
+                events.double_click = True
+                self.double_click_count += 1
+            self.last_press_time = timestamp
+        elif self.state == STATE_POINTING:
+            if point_votes <= self.exit_votes:
+                self.state = STATE_IDLE
+        elif point_votes >= self.enter_votes:
+            self.state = STATE_POINTING
+        
+        events.state = self.state
+        events.dragging = self.dragging
+        return events
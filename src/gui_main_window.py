@@ -1,27 +1,49 @@
 """GUI主窗口模块，负责界面元素和交互逻辑"""
 
+import os
 import sys
+import time
+import importlib.util
 import cv2
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QPushButton, QComboBox, QFrame, QCheckBox)
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, QTimer, QThread, Signal
 
 # 导入自定义模块
 from camera_handler import CameraHandler
 from gesture_recognizer import GestureRecognizer
 from mouse_controller import MouseController
+from mouse_backends import MouseBackendError
+from inference_worker import InferenceWorker, ProcessInferenceWorker
+from gesture_controller import GestureController
+from landmark_recording import LandmarkRecorder
+from inference_gating import IdlePolicy, MotionGate, should_run_inference
+from quality_controller import QualityController
+from latency_metrics import LatencyMetrics, MetricsExporter
+from video_widget import create_video_widget
+from hud_overlay import HudOverlay, HUD_GREEN, HUD_YELLOW, HUD_ORANGE, HUD_BLUE, HUD_CYAN, HUD_MAGENTA, HUD_GRAY
+from gesture_recognizer import landmarks_to_array
 
-# 检查pyautogui是否可用
-try:
-    import pyautogui
-    pyautogui.FAILSAFE = True  # 启用安全模式，将鼠标移到屏幕角落会暂停
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
+# 检查pyautogui是否可用，只查找模块不导入，实际导入在鼠标注入线程中进行
+PYAUTOGUI_AVAILABLE = importlib.util.find_spec("pyautogui") is not None
+if not PYAUTOGUI_AVAILABLE:
     print("pyautogui未安装，鼠标控制功能将不可用")
 
 
+class CameraDiscoveryWorker(QThread):
+    """在后台线程中搜索摄像头，完成后通过cameras_found信号返回结果"""
+    
+    cameras_found = Signal(object, object)  # (available_cameras, cameras_info)
+    
+    def __init__(self, camera_handler, parent=None):
+        super().__init__(parent)
+        self.camera_handler = camera_handler
+    
+    def run(self):
+        available_cameras, cameras_info = self.camera_handler.search_cameras()
+        self.cameras_found.emit(available_cameras, cameras_info)
+
+
 class CameraApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -29,13 +51,60 @@ class CameraApp(QMainWindow):
         self.setWindowTitle(WINDOW_TITLE)
         self.setGeometry(100, 100, WINDOW_WIDTH, WINDOW_HEIGHT)
         
-        # 检查pyautogui是否可用
-        self.PYAUTOGUI_AVAILABLE = PYAUTOGUI_AVAILABLE
+        # 检查pyautogui是否可用，发送到远程接收端时本机不需要pyautogui
+        from constants import REMOTE_MOUSE_TARGET
+        self.PYAUTOGUI_AVAILABLE = PYAUTOGUI_AVAILABLE or bool(REMOTE_MOUSE_TARGET)
+        
+        # 各阶段延迟统计，可选地定期导出到文件
+        from constants import METRICS_ENABLED, METRICS_EXPORT_FILE
+        self.metrics = LatencyMetrics() if METRICS_ENABLED else None
+        self.metrics_exporter = None
+        if self.metrics is not None and METRICS_EXPORT_FILE:
+            self.metrics_exporter = MetricsExporter(self.metrics, METRICS_EXPORT_FILE)
+        self.show_metrics = False  # 是否在预览上显示延迟面板
+        self.metrics_lines = []
+        self.metrics_lines_time = 0.0
         
         # 初始化模块
         self.camera_handler = CameraHandler()
-        self.gesture_recognizer = GestureRecognizer()
-        self.mouse_controller = MouseController()
+        # MediaPipe模型延迟加载：打开摄像头或首次启用手势识别时在推理线程中加载
+        self.gesture_recognizer = GestureRecognizer(lazy=True)
+        self.model_loading = False
+        mouse_api = None
+        if REMOTE_MOUSE_TARGET:
+            from remote_mouse import UDPMouseSender, parse_address
+            mouse_api = UDPMouseSender(*parse_address(REMOTE_MOUSE_TARGET, default_host="127.0.0.1"))
+        self.mouse_controller = MouseController(mouse_api, metrics=self.metrics)
+        self.gesture_controller = GestureController(self.mouse_controller)
+        
+        # 后台推理线程：推理与捕获、渲染流水线并行，INFERENCE_PROCESSES大于0时检测在多个进程中进行
+        from constants import INFERENCE_PROCESSES
+        if INFERENCE_PROCESSES > 0:
+            self.inference_worker = ProcessInferenceWorker(self.gesture_recognizer, INFERENCE_PROCESSES,
+                                                           metrics=self.metrics)
+        else:
+            self.inference_worker = InferenceWorker(self.gesture_recognizer, metrics=self.metrics)
+        self.inference_worker.result_ready.connect(self.on_inference_result)
+        self.inference_worker.model_loaded.connect(self.on_model_loaded)
+        self.inference_worker.start()
+        
+        # 画质控制：按推理耗时调整推理分辨率、模型复杂度和检测间隔，多进程推理时只调整检测间隔
+        from constants import QUALITY_CONTROL_ENABLED
+        self.quality_controller = None
+        if QUALITY_CONTROL_ENABLED:
+            self.quality_controller = QualityController(
+                None if INFERENCE_PROCESSES > 0 else self.gesture_recognizer, parallelism=INFERENCE_PROCESSES)
+        # 上次画质测量之后界面线程处理各帧（取帧到显示）的累计耗时和帧数，与推理、控制耗时一起计入每帧开销
+        self.gui_frame_time = 0.0
+        self.gui_frames = 0
+        
+        # 空闲策略：画面中长时间无手时降低检测频率
+        self.idle_policy = IdlePolicy()
+        
+        # 运动门控：画面静止且上一帧无手时跳过推理
+        from constants import MOTION_GATE_ENABLED
+        self.motion_gate = MotionGate() if MOTION_GATE_ENABLED else None
+        self.hand_present = False  # 最近一次推理是否检测到手
         
         # 初始化变量
         self.timer = QTimer()
@@ -54,9 +123,16 @@ class CameraApp(QMainWindow):
         
         # 鼠标控制相关
         self.mouse_control_enabled = False  # 鼠标控制开关
-        self.right_index_finger_detected_prev = False  # 上一帧是否检测到右手食指
-        self.prev_index_tip_x = None  # 上一帧食指尖x坐标
-        self.prev_index_tip_y = None  # 上一帧食指尖y坐标
+        
+        # 最近一次处理的捕获帧序号，用于跳过没有新帧的定时器周期
+        self.last_frame_seq = 0
+        
+        # 最近一次推理结果及其对应的手势状态，由推理线程信号更新
+        self.latest_results = None
+        self.right_index_finger_text = "NO"
+        self.right_index_middle_text = "NO"
+        self.mouse_control_active = False
+        self.click_executed = False
         
         # 创建UI
         self.init_ui()
@@ -96,6 +172,26 @@ class CameraApp(QMainWindow):
         self.mouse_control_checkbox.setChecked(False)
         self.mouse_control_checkbox.stateChanged.connect(self.toggle_mouse_control)
         
+        # 鼠标定位模式选择和活动区域校准按钮
+        self.mouse_mode_combo = QComboBox()
+        self.mouse_mode_combo.addItem("相对移动", "relative")
+        self.mouse_mode_combo.addItem("绝对定位", "absolute")
+        self.mouse_mode_combo.setCurrentIndex(self.mouse_mode_combo.findData(self.gesture_controller.mode))
+        self.mouse_mode_combo.currentIndexChanged.connect(self.on_mouse_mode_changed)
+        self.calibrate_btn = QPushButton("校准区域")
+        self.calibrate_btn.clicked.connect(self.toggle_calibration)
+        
+        # 关键点录制切换复选框
+        self.recording_checkbox = QCheckBox("录制关键点")
+        self.recording_checkbox.setChecked(False)
+        self.recording_checkbox.stateChanged.connect(self.toggle_recording)
+        
+        # 延迟面板切换复选框
+        self.metrics_checkbox = QCheckBox("延迟面板")
+        self.metrics_checkbox.setChecked(False)
+        self.metrics_checkbox.setEnabled(self.metrics is not None)
+        self.metrics_checkbox.stateChanged.connect(self.toggle_metrics_panel)
+        
         # 添加到控制布局
         control_layout.addWidget(QLabel("摄像头:"))
         control_layout.addWidget(self.camera_combo)
@@ -104,6 +200,10 @@ class CameraApp(QMainWindow):
         control_layout.addWidget(self.mirror_checkbox)
         control_layout.addWidget(self.hand_gesture_checkbox)
         control_layout.addWidget(self.mouse_control_checkbox)
+        control_layout.addWidget(self.mouse_mode_combo)
+        control_layout.addWidget(self.calibrate_btn)
+        control_layout.addWidget(self.recording_checkbox)
+        control_layout.addWidget(self.metrics_checkbox)
         control_layout.addStretch()
         
         # 摄像头信息显示
@@ -112,49 +212,74 @@ class CameraApp(QMainWindow):
         
         # 视频显示区域
         from constants import VIDEO_LABEL_MIN_WIDTH, VIDEO_LABEL_MIN_HEIGHT
-        self.video_label = QLabel()
-        self.video_label.setAlignment(Qt.AlignCenter)
+        from constants import PREVIEW_OPENGL
+        self.video_label = create_video_widget(PREVIEW_OPENGL)
         self.video_label.setMinimumSize(VIDEO_LABEL_MIN_WIDTH, VIDEO_LABEL_MIN_HEIGHT)
-        self.video_label.setStyleSheet("border: 1px solid gray;")
+        self.video_label.metrics = self.metrics
+        self.hud_overlay = HudOverlay()
+        self.video_label.set_overlay(self.hud_overlay)
         
         # 添加布局到主布局
         main_layout.addLayout(control_layout)
         main_layout.addWidget(self.camera_info_label)
-        main_layout.addWidget(self.video_label, alignment=Qt.AlignCenter)
-        
-        # 搜索可用摄像头
-        self.search_cameras()
+        main_layout.addWidget(self.video_label)
         
         # 连接摄像头选择变化事件
         self.camera_combo.currentIndexChanged.connect(self.on_camera_changed)
+        
+        # 先用缓存立即填充摄像头列表，再在后台重新搜索并更正
+        self.discovery_worker = None
+        self.populate_cameras(*self.camera_handler.cached_cameras())
+        self.search_cameras()
 
     def search_cameras(self):
-        """搜索本地摄像头设备"""
-        self.camera_combo.clear()
-        
-        # 使用摄像头处理器搜索摄像头
-        available_cameras, cameras_info = self.camera_handler.search_cameras()
+        """在后台搜索本地摄像头设备，不阻塞界面"""
+        if self.discovery_worker is not None and self.discovery_worker.isRunning():
+            return
+        self.refresh_cameras_btn.setEnabled(False)
+        self.refresh_cameras_btn.setText("正在搜索...")
+        self.discovery_worker = CameraDiscoveryWorker(self.camera_handler, self)
+        self.discovery_worker.cameras_found.connect(self.on_cameras_found)
+        self.discovery_worker.start()
+    
+    def on_cameras_found(self, available_cameras, cameras_info):
+        """后台搜索完成后更新摄像头列表"""
+        self.refresh_cameras_btn.setEnabled(True)
+        self.refresh_cameras_btn.setText("刷新摄像头列表")
+        self.populate_cameras(available_cameras, cameras_info)
+    
+    def populate_cameras(self, available_cameras, cameras_info):
+        """用摄像头列表填充下拉框，尽量保持当前选择"""
+        selected_id = self.camera_combo.currentData()
+        camera_opened = self.camera_handler.is_opened()
+        
+        # 正在使用的摄像头可能因被占用而探测失败，保留它
+        if camera_opened and selected_id not in (None, -1) and selected_id not in cameras_info:
+            previous_info = self.camera_handler.current_camera_info.get(selected_id)
+            if previous_info is not None:
+                available_cameras = sorted(list(available_cameras) + [selected_id])
+                cameras_info = dict(cameras_info)
+                cameras_info[selected_id] = previous_info
         self.camera_handler.current_camera_info = cameras_info
         
-        # 根据摄像头数量为其分配更有意义的名称
-        for idx, cam_id in enumerate(available_cameras):
-            if len(available_cameras) == 1:
-                camera_name = f"内置摄像头 ({cam_id})"
-            elif idx == 0:
-                camera_name = f"主摄像头 ({cam_id})"
-            elif idx == 1:
-                camera_name = f"副摄像头 ({cam_id})"
-            else:
-                camera_name = f"外接摄像头 {idx+1} ({cam_id})"
-                
-            self.camera_combo.addItem(camera_name, cam_id)
+        self.camera_combo.blockSignals(True)
+        self.camera_combo.clear()
+        for cam_id in available_cameras:
+            self.camera_combo.addItem(f"{cameras_info[cam_id]['name']} ({cam_id})", cam_id)
         
         # 如果没有找到摄像头
         if self.camera_combo.count() == 0:
             self.camera_combo.addItem("未找到摄像头", -1)
-            self.open_close_btn.setEnabled(False)
+            self.open_close_btn.setEnabled(camera_opened)
         else:
             self.open_close_btn.setEnabled(True)
+            index = self.camera_combo.findData(selected_id)
+            if index >= 0:
+                self.camera_combo.setCurrentIndex(index)
+        self.camera_combo.blockSignals(False)
+        
+        if not camera_opened:
+            self.on_camera_changed()
     
     def on_camera_changed(self):
         """当摄像头选择发生变化时更新信息显示"""
@@ -182,28 +307,108 @@ class CameraApp(QMainWindow):
             self.hand_gesture_checkbox.setChecked(False)
             return
         self.hand_gesture_enabled = bool(state)
+        if self.hand_gesture_enabled:
+            self.start_model_load()
+        else:
+            self.reset_gesture_state()
+    
+    def start_model_load(self):
+        """在推理线程中后台加载手势模型，已加载或正在加载时不重复请求"""
+        if self.gesture_recognizer.model_loaded or self.model_loading:
+            return
+        self.model_loading = True
+        self.inference_worker.request_model_load()
+    
+    def on_model_loaded(self, available):
+        """模型加载完成（在界面线程中执行）"""
+        self.model_loading = False
+        if not available:
+            self.hand_gesture_checkbox.setChecked(False)
+            self.camera_info_label.setText("MediaPipe不可用，手势识别功能已禁用")
+    
+    def reset_gesture_state(self):
+        """清除最近一次推理结果和手势状态"""
+        self.latest_results = None
+        self.video_label.set_hands([])
+        self.right_index_finger_text = "NO"
+        self.right_index_middle_text = "NO"
+        self.mouse_control_active = False
+        self.click_executed = False
+        self.gesture_controller.reset()
+        self.idle_policy.reset()
+        self.hand_present = False
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
     
     def toggle_mouse_control(self, state):
         """切换鼠标控制模式"""
         # 检查pyautogui是否可用
-        try:
-            import pyautogui
-            pyautogui_available = True
-        except ImportError:
-            pyautogui_available = False
-            
-        if not pyautogui_available:
+        if not self.PYAUTOGUI_AVAILABLE:
             self.mouse_control_checkbox.setChecked(False)
             return
         self.mouse_control_enabled = bool(state)
         if not self.mouse_control_enabled:
-            # 如果禁用鼠标控制，重置跟踪变量
-            self.right_index_finger_detected_prev = False
-            self.prev_index_tip_x = None
-            self.prev_index_tip_y = None
-            # Also reset the mouse controller velocity
-            self.mouse_controller.reset_velocity()
+            # 如果禁用鼠标控制，重置跟踪变量和鼠标速度
+            self.gesture_controller.reset()
 
+    def disable_mouse_backend(self, error):
+        """鼠标后端不可用时关闭鼠标控制和点击，之后的帧不再访问后端"""
+        print(f"鼠标后端不可用，已禁用鼠标控制: {error}")
+        self.PYAUTOGUI_AVAILABLE = False
+        self.mouse_control_enabled = False
+        self.mouse_control_active = False
+        self.click_executed = False
+        self.mouse_control_checkbox.setChecked(False)
+        self.camera_info_label.setText(f"鼠标后端不可用，鼠标控制已禁用: {error}")
+    
+    def on_mouse_mode_changed(self):
+        """切换相对移动/绝对定位模式"""
+        self.gesture_controller.mode = self.mouse_mode_combo.currentData()
+        self.gesture_controller.reset()
+    
+    def toggle_calibration(self):
+        """开始或结束活动区域校准"""
+        if not self.gesture_controller.calibrating:
+            self.gesture_controller.start_calibration()
+            self.calibrate_btn.setText("完成校准")
+            self.camera_info_label.setText("校准中：伸出右手食指并移动到希望映射到屏幕四角的位置")
+            return
+        region = self.gesture_controller.finish_calibration()
+        self.calibrate_btn.setText("校准区域")
+        if region is None:
+            self.camera_info_label.setText("校准失败：采集到的食指位置太少或范围太小")
+        else:
+            self.camera_info_label.setText(
+                f"校准完成，活动区域: ({region[0]:.2f}, {region[1]:.2f}) - ({region[2]:.2f}, {region[3]:.2f})")
+    
+    def toggle_recording(self, state):
+        """切换关键点录制"""
+        if state:
+            from constants import RECORDING_DIR
+            path = os.path.join(RECORDING_DIR, time.strftime("session_%Y%m%d_%H%M%S.rml"))
+            try:
+                self.inference_worker.recorder = LandmarkRecorder(path)
+            except OSError as e:
+                print(f"无法创建录制文件 {path}: {e}")
+                self.recording_checkbox.setChecked(False)
+                return
+            self.camera_info_label.setText(f"正在录制关键点: {path}")
+        else:
+            self.stop_recording()
+    
+    def stop_recording(self):
+        """停止关键点录制并关闭文件"""
+        recorder = self.inference_worker.recorder
+        self.inference_worker.recorder = None
+        if recorder is not None:
+            recorder.close()
+            self.camera_info_label.setText(f"录制已保存: {recorder.path} ({recorder.frames_written} 帧)")
+    
+    def toggle_metrics_panel(self, state):
+        """切换预览上的延迟面板"""
+        self.show_metrics = bool(state)
+        self.metrics_lines_time = 0.0
+    
     def toggle_camera(self):
         """打开或关闭摄像头"""
         if not self.camera_handler.is_opened():
@@ -217,21 +422,29 @@ class CameraApp(QMainWindow):
         if camera_index is None or camera_index == -1:
             return
             
-        # 使用摄像头处理器打开摄像头
-        if self.camera_handler.open_camera(camera_index):
+        # 使用摄像头处理器打开摄像头（后台线程捕获，界面线程只取最新帧）
+        from constants import CAMERA_THREADED_CAPTURE
+        self.last_frame_seq = 0
+        if self.camera_handler.open_camera(camera_index, threaded=CAMERA_THREADED_CAPTURE):
             # 更新按钮文本
             self.open_close_btn.setText("关闭摄像头")
             
             # 更新摄像头信息显示
             camera_info = self.camera_handler.current_camera_info.get(camera_index)
+            # 显示驱动实际接受的分辨率、帧率和像素格式
+            mode = self.camera_handler.cap.describe()
             if camera_info:
-                self.camera_info_label.setText(f"摄像头已开启: {camera_info['name']} (ID: {camera_info['id']})")
+                self.camera_info_label.setText(
+                    f"摄像头已开启: {camera_info['name']} (ID: {camera_info['id']}) {mode}")
             else:
-                self.camera_info_label.setText(f"摄像头已开启: 摄像头 {camera_index}")
+                self.camera_info_label.setText(f"摄像头已开启: 摄像头 {camera_index} {mode}")
             
             # 启动定时器来更新帧
             from constants import TIMER_INTERVAL_MS
             self.timer.start(TIMER_INTERVAL_MS)  # 约33 FPS
+            
+            # 预先在后台加载手势模型，启用手势识别时无需等待
+            self.start_model_load()
         else:
             # 显示错误信息
             self.video_label.setText("无法打开摄像头")
@@ -261,21 +474,41 @@ class CameraApp(QMainWindow):
     
     def update_frame(self):
         """更新视频帧"""
-        ret, frame = self.camera_handler.read_frame()
+        metrics = self.metrics
+        frame_start = time.perf_counter()
+        timestamp = None
+        if self.camera_handler.threaded:
+            ret, frame, timestamp, seq = self.camera_handler.read_latest_frame(self.last_frame_seq)
+            if not ret and self.camera_handler.is_capturing():
+                # 捕获线程尚未产生新帧，等待下一个周期
+                return
+            if ret:
+                self.last_frame_seq = seq
+                if metrics is not None:
+                    # capture: 帧从捕获到被界面线程取走经过的时间
+                    metrics.record("capture", time.monotonic() - timestamp)
+        else:
+            ret, frame = self.camera_handler.read_frame()
         if ret:
+            stage_start = time.perf_counter()
             # 如果启用镜像模式，则翻转图像
             if self.mirror_mode:
                 frame = cv2.flip(frame, 1)  # 水平翻转
+            if metrics is not None:
+                now = time.perf_counter()
+                metrics.record("mirror", now - stage_start)
+                stage_start = now
             
-            # 如果启用了手势识别且MediaPipe可用，则进行手势检测
-            results = None
-            if self.hand_gesture_enabled and self.gesture_recognizer.MEDIAPIPE_AVAILABLE:
-                # 处理图像以检测手部
-                results = self.gesture_recognizer.process_frame(frame)
-                
-                # 如果检测到手部，则绘制关键点
-                if results and results.multi_hand_landmarks:
-                    frame = self.gesture_recognizer.draw_landmarks(frame, results)
+            # 如果启用了手势识别且MediaPipe可用，则将帧提交给后台推理线程
+            # 帧数据在整个流水线中只读，HUD和骨架在显示时叠加
+            if self.hand_gesture_enabled and self.gesture_recognizer.model_loaded \
+                    and self.gesture_recognizer.MEDIAPIPE_AVAILABLE:
+                run_inference = self.should_run_inference(frame)
+                if metrics is not None:
+                    now = time.perf_counter()
+                    metrics.record("gate", now - stage_start)
+                if run_inference:
+                    self.inference_worker.submit(frame, self.last_frame_seq, timestamp)
             
             # 计算帧率
             self.frame_count += 1
@@ -287,127 +520,142 @@ class CameraApp(QMainWindow):
                 self.frame_count = 0
                 self.fps_start_time = current_time
             
-            # 在帧上绘制FPS信息
-            fps_text = f"FPS: {self.current_fps:.1f}"
-            cv2.putText(frame, fps_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-            # 如果启用了手势识别，添加手势识别指示
-            if self.hand_gesture_enabled:
-                gesture_text = "Hand Gesture: ON"
-                cv2.putText(frame, gesture_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
-                
-                # 检测是否只伸出右手食指
-                right_index_finger_text = self.gesture_recognizer.detect_right_index_finger_only(results)
-                detection_text = f"Right Index Finger: {right_index_finger_text}"
-                cv2.putText(frame, detection_text, (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
-                
-                # 检测是否伸出右手食指和中指
-                right_index_middle_text = self.gesture_recognizer.detect_right_index_and_middle_fingers(results)
-                detection_text2 = f"Right Index+Middle: {right_index_middle_text}"
-                cv2.putText(frame, detection_text2, (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 100, 0), 1)
-                
-                # 如果启用了鼠标控制，且检测到只有右手食指伸出，则控制鼠标
-                try:
-                    import pyautogui
-                    pyautogui_available = True
-                except ImportError:
-                    pyautogui_available = False
-                
-                if self.mouse_control_enabled and pyautogui_available and right_index_finger_text == "YES":
-                    self.control_mouse_with_right_index_finger(results)
-                    
-                    # 在图像上显示鼠标控制状态
-                    mouse_control_text = "Mouse Control: ACTIVE"
-                    cv2.putText(frame, mouse_control_text, (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
-                elif self.mouse_control_enabled:
-                    mouse_control_text = "Mouse Control: WAITING"
-                    cv2.putText(frame, mouse_control_text, (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 1)
-                
-                # 如果检测到食指和中指同时伸出，并且时间间隔满足要求，则执行左键点击
-                import time
-                current_time = time.time()
-                if (pyautogui_available and right_index_middle_text == "YES" and 
-                    current_time - self.mouse_controller.last_click_time >= self.mouse_controller.click_interval):
-                    self.mouse_controller.left_click()  # 执行左键点击
-                    
-                    # 在图像上显示点击状态
-                    click_text = "Left Click: EXECUTED"
-                    cv2.putText(frame, click_text, (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
-            else:
-                gesture_text = "Hand Gesture: OFF"
-                cv2.putText(frame, gesture_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 1)
-            
-            # 将BGR转换为RGB
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # 获取图像尺寸
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
+            # 更新HUD内容，只有文字变化时覆盖层才会重绘
+            stage_start = time.perf_counter()
+            self.hud_overlay.set_lines(self.build_hud_lines())
             
-            # 创建QImage
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            
-            # 调整图像大小以适应标签
-            pixmap = QPixmap.fromImage(qt_image)
-            scaled_pixmap = pixmap.scaled(
-                self.video_label.width(), 
-                self.video_label.height(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            
-            # 显示图像
-            self.video_label.setPixmap(scaled_pixmap)
+            # 显示图像（预览控件直接使用BGR数据，缩放在绘制时完成）
+            self.video_label.set_frame(frame)
+            now = time.perf_counter()
+            if metrics is not None:
+                metrics.record("display", now - stage_start)
+            self.gui_frame_time += now - frame_start
+            self.gui_frames += 1
+            if self.metrics_exporter is not None:
+                self.metrics_exporter.maybe_export()
         else:
             # 如果读取失败，显示错误消息
             self.video_label.setText("无法读取摄像头数据")
     
-    def resizeEvent(self, event):
-        """当窗口大小改变时调整图像大小"""
-        # 如果摄像头正在运行，重新调整当前帧的大小
-        if self.camera_handler.is_opened():
-            # 稍微延迟以确保窗口已完全重绘
-            QTimer.singleShot(10, self.update_frame)
-        super().resizeEvent(event)
+    def build_hud_lines(self):
+        """根据当前状态生成HUD文字行"""
+        lines = [(f"FPS: {self.current_fps:.1f}", HUD_GREEN)]
+        if not self.hand_gesture_enabled:
+            lines.append(("Hand Gesture: OFF", HUD_ORANGE))
+        elif not self.gesture_recognizer.model_loaded:
+            lines.append(("Hand Gesture: LOADING MODEL", HUD_CYAN))
+        else:
+            self.build_gesture_hud_lines(lines)
+        if self.show_metrics:
+            lines.extend(self.build_metrics_hud_lines())
+        return lines
+    
+    def build_metrics_hud_lines(self):
+        """延迟面板文字行，按METRICS_PANEL_REFRESH间隔刷新，避免覆盖层每帧重绘"""
+        from constants import METRICS_PANEL_REFRESH
+        now = time.monotonic()
+        if now - self.metrics_lines_time >= METRICS_PANEL_REFRESH:
+            self.metrics_lines_time = now
+            stages = ("capture", "mirror", "gate", "queue", "inference", "analysis",
+                      "control", "inject", "e2e_move", "e2e_click", "display", "render")
+            self.metrics_lines = [(text, HUD_GRAY) for text in self.metrics.format_lines(stages)]
+        return self.metrics_lines
+    
+    def build_gesture_hud_lines(self, lines):
+        """手势识别开启时的状态行"""
+        lines.append(("Hand Gesture: ON", HUD_YELLOW))
+        lines.append((f"Right Index Finger: {self.right_index_finger_text}", HUD_GREEN))
+        lines.append((f"Right Index+Middle: {self.right_index_middle_text}", HUD_BLUE))
+        
+        # 鼠标控制状态
+        if self.gesture_controller.calibrating:
+            lines.append(("Mouse Control: CALIBRATING", HUD_MAGENTA))
+        elif self.mouse_control_enabled and self.mouse_control_active:
+            lines.append(("Mouse Control: ACTIVE", HUD_YELLOW))
+        elif self.mouse_control_enabled:
+            lines.append(("Mouse Control: WAITING", HUD_CYAN))
+        else:
+            lines.append(None)
+        
+        # 点击状态
+        if self.mouse_controller.button_down:
+            dragging = self.gesture_controller.gesture_state.dragging
+            lines.append(("Left Button: DRAGGING" if dragging else "Left Button: DOWN", HUD_YELLOW))
+        else:
+            lines.append(("Left Click: EXECUTED", HUD_YELLOW) if self.click_executed else None)
+        
+        # 当前检测频率和空闲状态
+        idle_state = "IDLE" if self.idle_policy.idle else "ACTIVE"
+        rate_text = f"Detection: {self.idle_policy.detection_rate:.1f} Hz ({idle_state})"
+        if self.motion_gate is not None:
+            rate_text += f" Gate skip: {self.motion_gate.skip_ratio:.0%}"
+        if self.quality_controller is not None:
+            rate_text += f" {self.quality_controller.describe()}"
+        lines.append((rate_text, HUD_GRAY))
+    
+    def should_run_inference(self, frame):
+        """依次经过画质控制的检测间隔、空闲策略和运动门控，判断当前帧是否需要推理"""
+        return should_run_inference(frame, self.hand_present, self.idle_policy, self.motion_gate,
+                                    self.quality_controller)
+    
+    def on_inference_result(self, payload):
+        """处理推理线程发出的结果（在界面线程中执行）"""
+        if not self.hand_gesture_enabled:
+            return
+        results = payload['results']
+        self.latest_results = results
+        
+        # 更新预览中叠加的手部骨架，多进程推理时结果中直接带有关键点数组
+        if 'hands' in payload:
+            hands = [landmarks for _, _, landmarks in payload['hands']]
+        elif results and results.multi_hand_landmarks:
+            hands = [landmarks_to_array(hand_landmarks) for hand_landmarks in results.multi_hand_landmarks]
+        else:
+            hands = []
+        self.video_label.set_hands(hands)
+        self.hand_present = bool(hands)
+        self.idle_policy.report(self.hand_present)
+        
+        # 推理线程已完成右手的一次性分析，这里直接读取结果
+        analysis = payload['analysis']
+        index_only = analysis is not None and analysis.index_only
+        index_and_middle = analysis is not None and analysis.index_and_middle
+        self.right_index_finger_text = "YES" if index_only else "NO"
+        self.right_index_middle_text = "YES" if index_and_middle else "NO"
+        
+        # 根据分析结果移动鼠标或执行左键点击
+        control_start = time.perf_counter()
+        try:
+            self.mouse_control_active, self.click_executed = self.gesture_controller.update(
+                analysis,
+                mouse_control_enabled=self.mouse_control_enabled and self.PYAUTOGUI_AVAILABLE,
+                click_enabled=self.PYAUTOGUI_AVAILABLE,
+                timestamp=payload['timestamp'],
+            )
+        except MouseBackendError as e:
+            self.disable_mouse_backend(e)
+        control_time = time.perf_counter() - control_start
+        if self.metrics is not None:
+            self.metrics.record("control", control_time)
+        
+        # 画质控制按完整的每帧开销调整：推理耗时按检测间隔和进程数摊薄，
+        # 界面线程的取帧、显示和手势控制每帧都要执行，按上次测量以来的平均值计入
+        if self.quality_controller is not None:
+            overhead = (self.gui_frame_time + control_time) / max(1, self.gui_frames)
+            self.quality_controller.observe(payload['inference_time'], overhead=overhead)
+            self.gui_frame_time = 0.0
+            self.gui_frames = 0
     
     def closeEvent(self, event):
         """关闭窗口时释放资源"""
         self.camera_handler.close_camera()
         if self.timer.isActive():
             self.timer.stop()
+        self.inference_worker.stop()
+        self.mouse_controller.close()
+        self.stop_recording()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.export()
+        if self.discovery_worker is not None:
+            self.discovery_worker.wait(1000)
         event.accept()
-
-    def control_mouse_with_right_index_finger(self, results):
-        """使用右手食指控制鼠标"""
-        # Get the right index finger position from the gesture recognizer
-        finger_pos = self.gesture_recognizer.get_right_index_finger_position(results)
-        if finger_pos is None:
-            return
-        
-        # Get screen dimensions
-        screen_width, screen_height = self.mouse_controller.screen_width, self.mouse_controller.screen_height
-        
-        # Convert normalized coordinates to screen coordinates
-        screen_x = int(finger_pos[0] * screen_width)
-        screen_y = int(finger_pos[1] * screen_height)
-        
-        # If this is the first frame detecting the right index finger, record initial position
-        if not self.right_index_finger_detected_prev:
-            self.prev_index_tip_x = screen_x
-            self.prev_index_tip_y = screen_y
-            self.right_index_finger_detected_prev = True
-            # Reset mouse controller velocity
-            self.mouse_controller.reset_velocity()
-            return
-        
-        # Calculate movement distance
-        dx = screen_x - self.prev_index_tip_x
-        dy = screen_y - self.prev_index_tip_y
-        
-        # Move mouse using the mouse controller
-        self.mouse_controller.move_mouse_relative(dx, dy)
-        
-        # Update previous frame coordinates
-        self.prev_index_tip_x = screen_x
-        self.prev_index_tip_y = screen_y
-        self.right_index_finger_detected_prev = True
\ No newline at end of file
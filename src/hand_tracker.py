@@ -0,0 +1,126 @@
+"""手部身份跟踪模块，跨帧为检测到的手分配稳定的ID
+
+MediaPipe逐帧给出左右手分类，分类结果会在相邻帧之间跳变（尤其是手掌侧对摄像头时），
+只按标签查找右手会导致控制手时有时无。跟踪器按手腕位置就近匹配前后帧的手，
+用累积的分类置信度决定每条轨迹的左右标签，一旦选定控制手，就一直跟随这条轨迹直到它消失。
+"""
+
+import numpy as np
+from constants import HAND_TRACK_MAX_DISTANCE, HAND_TRACK_MAX_MISSED, HAND_TRACK_LABEL_DECAY
+
+WRIST = 0  # MediaPipe手腕关键点索引
+
+
+class HandTrack:
+    """一只手的跨帧轨迹"""
+    
+    __slots__ = ('id', 'landmarks', 'raw_label', 'score', 'label_evidence', 'age', 'missed')
+    
+    def __init__(self, track_id, landmarks):
+        self.id = track_id
+        self.landmarks = landmarks  # 最近一次匹配到的 (21, 3) 关键点
+        self.raw_label = None  # 最近一帧的原始分类
+        self.score = 0.0  # 最近一帧的分类置信度
+        self.label_evidence = 0.0  # 累积的分类证据，正值为Right，负值为Left
+        self.age = 0  # 匹配到的帧数
+        self.missed = 0  # 连续未匹配的帧数
+    
+    @property
+    def wrist(self):
+        return self.landmarks[WRIST, :2]
+    
+    @property
+    def label(self):
+        """累积证据决定的稳定标签"""
+        return "Right" if self.label_evidence >= 0 else "Left"
+    
+    def observe(self, landmarks, label, score, decay):
+        """用本帧检测结果更新轨迹"""
+        self.landmarks = landmarks
+        self.raw_label = label
+        self.score = score
+        vote = score if label == "Right" else -score
+        self.label_evidence = self.label_evidence * decay + vote
+        self.age += 1
+        self.missed = 0
+
+
+class HandTracker:
+    """按手腕距离做前后帧匹配的多手跟踪器，并维护当前的控制手"""
+    
+    def __init__(self, label="Right", max_distance=HAND_TRACK_MAX_DISTANCE, max_missed=HAND_TRACK_MAX_MISSED,
+                 label_decay=HAND_TRACK_LABEL_DECAY):
+        self.label = label  # 控制手应具有的标签
+        self.max_distance = max_distance  # 匹配时手腕的最大位移（归一化坐标）
+        self.max_missed = max_missed  # 轨迹连续未匹配超过该帧数即删除
+        self.label_decay = label_decay  # 标签证据每帧的衰减系数，越接近1标签越不容易翻转
+        self.tracks = []
+        self.active_id = None  # 控制手的轨迹ID（轨迹消失后保留，用于统计更换次数）
+        self._next_id = 1
+        self.switch_count = 0  # 控制手更换次数
+        self.label_flips = 0  # 控制手的原始分类与稳定标签不一致的帧数
+    
+    def reset(self):
+        self.tracks = []
+        self.active_id = None
+    
+    def update(self, hands):
+        """输入本帧检测到的 [(label, score, landmarks)]，返回控制手的HandTrack，本帧没有时返回None"""
+        unmatched = list(range(len(hands)))
+        matched_tracks = set()
+        if self.tracks and hands:
+            # 按距离从小到大贪心匹配，手数很少，不需要匈牙利算法
+            wrists = np.array([np.asarray(landmarks)[WRIST, :2] for _, _, landmarks in hands])
+            track_wrists = np.array([track.wrist for track in self.tracks])
+            distances = np.linalg.norm(track_wrists[:, None, :] - wrists[None, :, :], axis=2)
+            for flat in np.argsort(distances, axis=None):
+                t, h = np.unravel_index(flat, distances.shape)
+                if distances[t, h] > self.max_distance:
+                    break
+                if t in matched_tracks or h not in unmatched:
+                    continue
+                label, score, landmarks = hands[h]
+                self.tracks[t].observe(np.asarray(landmarks), label, score, self.label_decay)
+                matched_tracks.add(t)
+                unmatched.remove(h)
+        
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        
+        for h in unmatched:
+            label, score, landmarks = hands[h]
+            track = HandTrack(self._next_id, np.asarray(landmarks))
+            track.observe(track.landmarks, label, score, self.label_decay)
+            self._next_id += 1
+            self.tracks.append(track)
+        
+        return self._select()
+    
+    def _select(self):
+        """保持已有的控制手；没有时从本帧可见的轨迹中选标签证据最强的一只"""
+        active = self.track(self.active_id)
+        if active is None:
+            candidates = [track for track in self.tracks if track.missed == 0 and track.label == self.label]
+            if not candidates:
+                return None
+            active = max(candidates, key=lambda track: abs(track.label_evidence))
+            if self.active_id is not None:
+                self.switch_count += 1
+            self.active_id = active.id
+        if active.missed:
+            # 控制手本帧短暂丢失，保留身份但不产生结果
+            return None
+        if active.raw_label != active.label:
+            self.label_flips += 1
+        return active
+    
+    def track(self, track_id):
+        """按ID查找轨迹，不存在时返回None"""
+        if track_id is None:
+            return None
+        for track in self.tracks:
+            if track.id == track_id:
+                return track
+        return None
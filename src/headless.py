@@ -0,0 +1,291 @@
+"""无界面运行模式，复用摄像头、手势识别和鼠标控制模块，不创建任何Qt窗口"""
+
+import signal
+import time
+import cv2
+
+from camera_handler import CameraHandler
+from gesture_recognizer import GestureRecognizer
+from gesture_controller import GestureController
+from mouse_controller import MouseController
+from inference_gating import IdlePolicy, MotionGate, should_run_inference
+from mouse_backends import MouseBackendError, RecordingMouseAPI
+from latency_metrics import LatencyMetrics, MetricsExporter
+from multi_camera import MultiCameraPipeline
+from quality_controller import QualityController
+
+
+class HeadlessRunner:
+    """无界面运行器：捕获 → 检测 → 鼠标控制，周期性输出吞吐量统计
+    
+    camera_index为列表时进入多摄像头模式，各摄像头并行推理，融合后的结果驱动鼠标
+    """
+    
+    def __init__(self, camera_index=0, width=None, height=None, fps=None, mirror=True,
+                 mouse_control=True, mouse_mode=None, motion_gate=True, stats_interval=5.0,
+                 recognizer_options=None, realtime=True, metrics_file=None, processes=0,
+                 remote=None, quality_control=None, frame_budget_ms=None):
+        from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, MOUSE_CONTROL_MODE, QUALITY_CONTROL_ENABLED, \
+            QUALITY_TARGET_FRAME_MS
+        self.camera_index = camera_index  # 摄像头索引，也可以是视频文件路径、"synthetic[:帧数]"或它们的列表
+        self.realtime = realtime  # 视频文件和合成帧源是否按帧率实时输出
+        self.width = width or CAMERA_WIDTH
+        self.height = height or CAMERA_HEIGHT
+        self.fps = fps or CAMERA_FPS
+        self.mirror = mirror
+        self.mouse_control = mouse_control
+        self.stats_interval = stats_interval
+        
+        # 各阶段延迟统计，metrics_file不为空时定期导出
+        self.metrics = LatencyMetrics()
+        self.metrics_exporter = MetricsExporter(self.metrics, metrics_file) if metrics_file else None
+        
+        self.camera_handler = CameraHandler()
+        self.recognizer_options = recognizer_options or {}
+        # 模型在run中加载，多摄像头模式下每个视角各自创建识别器
+        self.gesture_recognizer = GestureRecognizer(lazy=True, **self.recognizer_options)
+        self.pipeline = None  # 多摄像头模式下的MultiCameraPipeline
+        # processes大于0时手部检测在工作进程中进行，本进程只做身份跟踪、分析和鼠标控制
+        self.pool = None
+        if processes > 0:
+            from process_inference import ProcessInferencePool, default_recognizer_factory
+            worker_options = {key: value for key, value in self.recognizer_options.items() if key != 'hand_tracking'}
+            self.pool = ProcessInferencePool(processes, default_recognizer_factory(**worker_options),
+                                             analyzer=self.gesture_recognizer.analyze_hands)
+        # 画质控制：按实测的每帧处理时间调整推理分辨率、模型复杂度和检测间隔。
+        # 多进程推理时识别器在工作进程中，只调整检测间隔
+        self.quality = None
+        if QUALITY_CONTROL_ENABLED if quality_control is None else quality_control:
+            self.quality = QualityController(None if self.pool is not None else self.gesture_recognizer,
+                                             target_ms=frame_budget_ms or QUALITY_TARGET_FRAME_MS,
+                                             parallelism=processes)
+        # 不控制鼠标时使用记录替身，避免加载真实的注入后端；remote为"主机[:端口]"时发送到远程接收端
+        if not mouse_control:
+            mouse_api = RecordingMouseAPI()
+        elif remote:
+            from remote_mouse import UDPMouseSender, parse_address
+            mouse_api = UDPMouseSender(*parse_address(remote, default_host="127.0.0.1"))
+        else:
+            mouse_api = None
+        self.mouse_controller = MouseController(mouse_api, metrics=self.metrics)
+        self.gesture_controller = GestureController(self.mouse_controller, mode=mouse_mode or MOUSE_CONTROL_MODE)
+        self.idle_policy = IdlePolicy()
+        self.motion_gate = MotionGate() if motion_gate else None
+        
+        self.hand_present = False  # 最近一次检测是否发现手
+        self.running = False
+        self._reset_stats()
+    
+    def _reset_stats(self):
+        self.stats_start = time.monotonic()
+        self.stats_cpu_start = time.process_time()
+        self.frames = 0
+        self.inferences = 0
+        self.hand_frames = 0
+        self.moves = 0
+        self.clicks = 0
+    
+    def stop(self, *_):
+        """请求停止主循环（可作为信号处理函数）"""
+        self.running = False
+    
+    def run(self):
+        """运行主循环直到收到SIGINT/SIGTERM或摄像头关闭，返回退出码"""
+        if isinstance(self.camera_index, (list, tuple)):
+            return self.run_multi()
+        if self.pool is not None:
+            available = self.pool.start()
+            self.gesture_recognizer.set_model_state(available)
+        else:
+            available = self.gesture_recognizer.load_model()
+        if not available:
+            print("MediaPipe不可用，无法以无界面模式运行")
+            if self.pool is not None:
+                self.pool.close()
+            return 1
+        if not self.camera_handler.open_camera(self.camera_index, threaded=True, width=self.width,
+                                               height=self.height, fps=self.fps, realtime=self.realtime):
+            print(f"无法打开摄像头 {self.camera_index}")
+            if self.pool is not None:
+                self.pool.close()
+            return 1
+        
+        previous_handlers = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        # 输出帧源实际生效的参数，而不是请求的参数
+        print(f"无界面模式已启动: 帧源 {self.camera_index}, {self.camera_handler.cap.describe()}, "
+              f"鼠标控制 {'开启' if self.mouse_control else '关闭'}", flush=True)
+        self.running = True
+        self._reset_stats()
+        last_seq = 0
+        try:
+            while self.running:
+                ret, frame, timestamp, seq = self.camera_handler.wait_for_frame(last_seq, timeout=0.5)
+                if self.pool is not None:
+                    self.collect_pool_results()
+                if not ret:
+                    if not self.camera_handler.is_capturing():
+                        print("摄像头已断开")
+                        break
+                    continue
+                last_seq = seq
+                self.process_frame(frame, timestamp, seq)
+                
+                if time.monotonic() - self.stats_start >= self.stats_interval:
+                    self.log_stats()
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            self.shutdown()
+        return 0
+    
+    def run_multi(self):
+        """多摄像头模式主循环：各视角在自己的线程中推理，这里只消费融合后的结果"""
+        self.pipeline = MultiCameraPipeline(
+            self.camera_index, lambda: GestureRecognizer(lazy=True, **self.recognizer_options),
+            mirror=self.mirror, metrics=self.metrics)
+        # 在打开摄像头前加载各视角的模型，避免首帧等待
+        if not all([view.recognizer.load_model() for view in self.pipeline.views]):
+            print("MediaPipe不可用，无法以无界面模式运行")
+            return 1
+        if not self.pipeline.start(self.width, self.height, self.fps, realtime=self.realtime):
+            print(f"无法打开任何摄像头 {self.camera_index}")
+            return 1
+        
+        previous_handlers = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        print(f"无界面模式已启动: {len(self.pipeline.views)} 个帧源 "
+              f"{', '.join(view.camera_handler.cap.describe() for view in self.pipeline.views if view.is_running())}, "
+              f"鼠标控制 {'开启' if self.mouse_control else '关闭'}", flush=True)
+        self.running = True
+        self._reset_stats()
+        try:
+            while self.running:
+                result = self.pipeline.wait_for_result(timeout=0.5)
+                if result is None:
+                    if not self.pipeline.is_running():
+                        print("所有摄像头已断开")
+                        break
+                    continue
+                self.frames += 1
+                self.inferences += 1
+                if result.analysis is not None:
+                    self.hand_frames += 1
+                self.apply_analysis(result.analysis, result.timestamp)
+                
+                if time.monotonic() - self.stats_start >= self.stats_interval:
+                    self.log_stats()
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            self.shutdown()
+        return 0
+    
+    def process_frame(self, frame, timestamp, seq=0):
+        """处理一帧：门控、检测并驱动鼠标，使用多进程推理时只提交，结果由collect_pool_results处理"""
+        metrics = self.metrics
+        frame_start = time.perf_counter()
+        self.frames += 1
+        metrics.record("capture", max(0.0, time.monotonic() - timestamp))
+        if self.mirror:
+            with metrics.time("mirror"):
+                frame = cv2.flip(frame, 1)
+        
+        with metrics.time("gate"):
+            run_inference = should_run_inference(frame, self.hand_present, self.idle_policy, self.motion_gate,
+                                                 self.quality)
+        if not run_inference:
+            return
+        
+        if self.pool is not None:
+            self.pool.submit(frame, seq, timestamp)
+            return
+        
+        with metrics.time("inference"):
+            results = self.gesture_recognizer.process_frame(frame)
+        self.inferences += 1
+        self.hand_present = bool(results and results.multi_hand_landmarks)
+        self.idle_policy.report(self.hand_present)
+        with metrics.time("analysis"):
+            analysis = self.gesture_recognizer.analyze(results)
+        if analysis is not None:
+            self.hand_frames += 1
+        self.apply_analysis(analysis, timestamp)
+        if self.quality is not None:
+            self.quality.observe(time.perf_counter() - frame_start)
+    
+    def collect_pool_results(self):
+        """按帧序号取出工作进程已完成的结果并驱动鼠标"""
+        for result in self.pool.poll():
+            self.metrics.record("inference", result['inference_time'])
+            if self.quality is not None:
+                self.quality.observe(result['inference_time'])
+            self.inferences += 1
+            self.hand_present = bool(result['hands'])
+            self.idle_policy.report(self.hand_present)
+            analysis = result['analysis']
+            if analysis is not None:
+                self.hand_frames += 1
+            self.apply_analysis(analysis, result['timestamp'])
+    
+    def apply_analysis(self, analysis, timestamp):
+        """将一帧的分析结果交给手势控制器"""
+        with self.metrics.time("control"):
+            try:
+                moved, clicked = self.gesture_controller.update(
+                    analysis, mouse_control_enabled=self.mouse_control, click_enabled=self.mouse_control,
+                    timestamp=timestamp)
+            except MouseBackendError as e:
+                print(f"鼠标后端不可用，已禁用鼠标控制: {e}", flush=True)
+                self.mouse_control = False
+                return
+        self.moves += moved
+        self.clicks += clicked
+    
+    def log_stats(self):
+        """输出并重置吞吐量统计"""
+        elapsed = time.monotonic() - self.stats_start
+        cpu = time.process_time() - self.stats_cpu_start
+        if self.pipeline is not None:
+            stats = self.pipeline.get_stats()
+            capture = {'dropped': sum(view['dropped'] for view in stats['views'])}
+        else:
+            capture = self.camera_handler.get_capture_stats()
+        print(f"[统计] 帧率 {self.frames / elapsed:.1f} FPS, 检测 {self.inferences / elapsed:.1f} Hz"
+              f"{' (空闲)' if self.idle_policy.idle else ''}, 有手 {self.hand_frames} 帧, "
+              f"移动 {self.moves} 次, 点击 {self.clicks} 次, CPU {cpu / elapsed:.0%}, "
+              f"捕获丢帧 {capture['dropped']}", flush=True)
+        snapshot = self.metrics.snapshot()
+        stages = [f"{stage} {stats['p95_ms']:.1f}" for stage, stats in snapshot.items() if 'p95_ms' in stats]
+        if stages:
+            print(f"[延迟p95 ms] {', '.join(stages)}", flush=True)
+        if self.pipeline is not None:
+            views = ", ".join(f"#{i} {view['frames']}帧/有手{view['hand_frames']}/输出{view['outputs']}"
+                              f"{'' if view['running'] else '(已断开)'}" for i, view in enumerate(stats['views']))
+            print(f"[多摄像头] {views}, 当前视角 #{stats['selected']}, 切换 {stats['switches']} 次", flush=True)
+        if self.quality is not None:
+            quality = self.quality.get_stats()
+            print(f"[画质] 等级 {quality['level']}, 推理分辨率 x{quality['inference_scale']:g}, "
+                  f"模型复杂度 {quality['model_complexity']}, 每 {quality['detection_interval']} 帧检测一次, "
+                  f"每帧耗时 {quality['frame_ms'] or 0:.1f}/{quality['target_ms']:.1f}ms, "
+                  f"已调整 {quality['changes']} 次", flush=True)
+        sent_packets = getattr(self.mouse_controller.mouse_api, 'sent_packets', None)
+        if sent_packets is not None:
+            print(f"[远程] 已发送 {sent_packets} 包, 发送失败 {self.mouse_controller.mouse_api.send_errors} 次",
+                  flush=True)
+        tracker = self.gesture_recognizer.hand_tracker
+        if self.pipeline is None and tracker is not None:
+            print(f"[手部跟踪] 控制手 #{tracker.active_id}, 轨迹 {len(tracker.tracks)} 条, "
+                  f"更换 {tracker.switch_count} 次, 标签跳变 {tracker.label_flips} 帧", flush=True)
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.export()
+        self._reset_stats()
+    
+    def shutdown(self):
+        """释放摄像头和鼠标注入线程"""
+        self.running = False
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.camera_handler.close_camera()
+        if self.pool is not None:
+            self.pool.close()
+        self.mouse_controller.close()
+        print("无界面模式已退出", flush=True)
@@ -0,0 +1,98 @@
+"""HUD覆盖层模块，负责在预览画面之上绘制状态文字和手部骨架
+
+覆盖层与视频帧分离，在显示时由预览控件合成，捕获和推理使用的帧数据不会被修改。
+状态文字被渲染到缓存的透明QImage中，只有文字内容变化时才重新绘制。
+"""
+
+from PySide6.QtCore import Qt, QPointF
+from PySide6.QtGui import QImage, QPainter, QColor, QFont, QPen
+
+# 手部21个关键点之间的连接（与MediaPipe的HAND_CONNECTIONS一致）
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+# HUD使用的颜色（RGB）
+HUD_GREEN = (0, 255, 0)
+HUD_YELLOW = (255, 255, 0)
+HUD_ORANGE = (255, 200, 0)
+HUD_BLUE = (0, 100, 255)
+HUD_CYAN = (0, 255, 255)
+HUD_MAGENTA = (255, 0, 255)
+HUD_GRAY = (200, 200, 200)
+
+HUD_LINE_HEIGHT = 24
+HUD_MARGIN = 10
+
+
+class HudOverlay:
+    """缓存的HUD文字层
+    
+    lines为 (文字, RGB颜色) 元组的序列，None表示空行。内容不变时image()直接返回缓存。
+    """
+    
+    def __init__(self):
+        self._lines = None
+        self._image = None
+        self.font = QFont("Sans Serif", 11)
+        self.font.setBold(True)
+        self.redraw_count = 0  # 实际重绘次数
+    
+    def set_lines(self, lines):
+        """更新HUD内容，返回内容是否发生变化"""
+        lines = tuple(lines)
+        if lines == self._lines:
+            return False
+        self._lines = lines
+        self._image = None
+        return True
+    
+    def image(self):
+        """返回渲染好的透明图层，没有内容时返回None"""
+        if self._image is None and self._lines:
+            self._image = self._render()
+        return self._image
+    
+    def _render(self):
+        width = 420
+        height = HUD_MARGIN * 2 + HUD_LINE_HEIGHT * len(self._lines)
+        image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(self.font)
+        for row, line in enumerate(self._lines):
+            if line is None:
+                continue
+            text, color = line
+            baseline = HUD_MARGIN + HUD_LINE_HEIGHT * (row + 1) - 6
+            # 先画一层深色描边，保证在明亮背景上也能看清
+            painter.setPen(QColor(0, 0, 0, 160))
+            painter.drawText(HUD_MARGIN + 1, baseline + 1, text)
+            painter.setPen(QColor(*color))
+            painter.drawText(HUD_MARGIN, baseline, text)
+        painter.end()
+        self.redraw_count += 1
+        return image
+
+
+def draw_hand_skeletons(painter, hands, target_rect):
+    """在目标矩形内绘制手部骨架，hands为归一化坐标的 (21, 2+) 数组列表"""
+    if not hands:
+        return
+    left, top = target_rect.x(), target_rect.y()
+    width, height = target_rect.width(), target_rect.height()
+    painter.setRenderHint(QPainter.Antialiasing)
+    for landmarks in hands:
+        points = [QPointF(left + x * width, top + y * height) for x, y in landmarks[:, :2]]
+        painter.setPen(QPen(QColor(255, 255, 255), 2))
+        for start, end in HAND_CONNECTIONS:
+            painter.drawLine(points[start], points[end])
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(255, 48, 48))
+        for point in points:
+            painter.drawEllipse(point, 3, 3)
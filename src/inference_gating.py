@@ -0,0 +1,138 @@
+"""推理调度模块，决定每一帧是否需要运行手部检测"""
+
+import time
+import cv2
+from constants import IDLE_AFTER_FRAMES, IDLE_DETECTION_RATE_HZ, \
+    MOTION_GATE_SIZE, MOTION_GATE_PIXEL_THRESHOLD, MOTION_GATE_THRESHOLD
+
+
+class IdlePolicy:
+    """空闲策略：连续多帧未检测到手时降低检测频率，一旦检测到手立即恢复全速"""
+    
+    def __init__(self, idle_after_frames=IDLE_AFTER_FRAMES, idle_rate_hz=IDLE_DETECTION_RATE_HZ):
+        self.idle_after_frames = idle_after_frames  # 连续无手多少帧后进入空闲
+        self.idle_interval = 1.0 / idle_rate_hz  # 空闲时两次检测的最小间隔（秒）
+        self.idle = False
+        self.frames_without_hand = 0
+        self.last_run_time = 0.0
+        
+        # 检测频率统计，按约1秒的窗口计算
+        self._detection_rate = 0.0
+        self._rate_count = 0
+        self._rate_start = time.monotonic()
+    
+    def reset(self):
+        """恢复到全速检测状态"""
+        self.idle = False
+        self.frames_without_hand = 0
+        self.last_run_time = 0.0
+    
+    def should_run(self, now=None):
+        """判断当前帧是否允许运行检测，只做判断，确实运行时由调用方调用record_run"""
+        if now is None:
+            now = time.monotonic()
+        return not self.idle or now - self.last_run_time >= self.idle_interval
+    
+    def record_run(self, now=None):
+        """记录一次实际运行的检测"""
+        if now is None:
+            now = time.monotonic()
+        self.last_run_time = now
+        self._roll_rate_window(now)
+        self._rate_count += 1
+    
+    def report(self, hand_present):
+        """报告一次检测结果"""
+        if hand_present:
+            self.frames_without_hand = 0
+            self.idle = False
+        else:
+            self.frames_without_hand += 1
+            if self.frames_without_hand >= self.idle_after_frames:
+                self.idle = True
+    
+    @property
+    def detection_rate(self):
+        """最近一个统计窗口内的实际检测频率（Hz）
+        
+        读取时也会结束已满1秒的窗口，检测停止（门控跳过、模型未加载等）后频率最多2秒就降为0，不再停留在最后一次检测时的数值
+        """
+        self._roll_rate_window(time.monotonic())
+        return self._detection_rate
+    
+    def _roll_rate_window(self, now):
+        """窗口满1秒时按其中的检测次数更新频率并开始新窗口"""
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self._detection_rate = self._rate_count / elapsed
+            self._rate_count = 0
+            self._rate_start = now
+
+
+def should_run_inference(frame, hand_present, idle_policy, motion_gate=None, quality_controller=None, now=None):
+    """依次经过画质控制的检测间隔、空闲策略和运动门控，判断当前帧是否需要推理，放行时记录空闲策略的一次运行
+    
+    运动门控必须放在最后：它在放行时更新参考帧和放行计数，如果放行后又被检测间隔或空闲策略丢弃，
+    带有运动的帧就成了参考帧，之后静止的手不再产生运动，空闲时进入画面的手可能一直得不到检测
+    """
+    if quality_controller is not None and not quality_controller.should_detect():
+        return False
+    if now is None:
+        now = time.monotonic()
+    if not idle_policy.should_run(now):
+        return False
+    if motion_gate is not None and not motion_gate.should_run(frame, hand_present):
+        return False
+    idle_policy.record_run(now)
+    return True
+
+
+class MotionGate:
+    """运动门控：画面静止且上一帧没有手时跳过MediaPipe推理
+    
+    将帧缩小为灰度小图，与上一次放行推理时的参考图比较，变化像素比例超过阈值即视为有运动。
+    """
+    
+    def __init__(self, threshold=MOTION_GATE_THRESHOLD, pixel_threshold=MOTION_GATE_PIXEL_THRESHOLD,
+                 size=MOTION_GATE_SIZE):
+        self.threshold = threshold  # 变化像素比例阈值
+        self.pixel_threshold = pixel_threshold  # 单个像素灰度变化阈值
+        self.size = size  # 比较用小图尺寸 (宽, 高)
+        self.reference = None
+        self.motion_level = 0.0  # 最近一次计算的变化像素比例
+        self.hits = 0  # 放行推理的次数（只统计经过门控比较的帧）
+        self.skips = 0  # 因画面静止跳过推理的次数
+    
+    def reset(self):
+        """清除参考帧，下一帧必定放行"""
+        self.reference = None
+    
+    def set_threshold(self, threshold):
+        """设置变化像素比例阈值"""
+        self.threshold = threshold
+    
+    def should_run(self, frame, hand_present):
+        """判断当前帧是否需要推理"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        
+        if self.reference is None:
+            self.motion_level = 1.0
+        else:
+            diff = cv2.absdiff(small, self.reference)
+            self.motion_level = cv2.countNonZero(cv2.threshold(
+                diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+        
+        if hand_present or self.motion_level >= self.threshold:
+            # 放行时更新参考帧，缓慢的累积变化最终也会触发检测
+            self.reference = small
+            self.hits += 1
+            return True
+        self.skips += 1
+        return False
+    
+    @property
+    def skip_ratio(self):
+        """跳过推理的帧占比"""
+        total = self.hits + self.skips
+        return self.skips / total if total else 0.0
@@ -0,0 +1,233 @@
+"""推理工作线程模块，负责在后台线程中运行MediaPipe手部检测"""
+
+import threading
+import time
+from PySide6.QtCore import QThread, Signal
+
+
+class InferenceWorker(QThread):
+    """手势推理工作线程
+    
+    界面线程通过submit提交帧，工作线程在后台调用GestureRecognizer.process_frame，
+    并通过result_ready信号发出结果。待处理槽位只有一个，推理跟不上时旧帧会被新帧覆盖丢弃，
+    不会排队积压。
+    """
+    
+    # 发出的字典包含: results, analysis, seq, timestamp, inference_time
+    result_ready = Signal(object)
+    # 模型加载完成，参数表示MediaPipe是否可用
+    model_loaded = Signal(bool)
+    
+    def __init__(self, gesture_recognizer, parent=None, metrics=None):
+        super().__init__(parent)
+        self.gesture_recognizer = gesture_recognizer
+        self.metrics = metrics  # 可选的LatencyMetrics，记录推理、分析和录制耗时
+        self._condition = threading.Condition()
+        self._pending = None  # (frame, seq, timestamp)
+        self._running = False
+        self.processed_frames = 0  # 已完成推理的帧数
+        self.dropped_frames = 0  # 因背压被丢弃的帧数
+        self.recorder = None  # 可选的LandmarkRecorder，设置后每帧结果都会被录制
+        self._load_requested = False
+    
+    def submit(self, frame, seq=0, timestamp=None):
+        """提交一帧进行推理，如果上一帧尚未开始处理则将其丢弃
+        
+        返回True表示没有丢帧
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._condition:
+            replaced = self._pending is not None
+            if replaced:
+                self.dropped_frames += 1
+            self._pending = (frame, seq, timestamp)
+            self._condition.notify()
+        return not replaced
+    
+    def request_model_load(self):
+        """请求在工作线程中加载模型，加载完成后发出model_loaded信号"""
+        with self._condition:
+            if self.gesture_recognizer.model_loaded:
+                self._load_requested = False
+            else:
+                self._load_requested = True
+                self._condition.notify()
+        if self.gesture_recognizer.model_loaded:
+            self.model_loaded.emit(self.gesture_recognizer.MEDIAPIPE_AVAILABLE)
+    
+    def is_busy(self):
+        """检查是否有帧正在等待推理"""
+        with self._condition:
+            return self._pending is not None
+    
+    def stop(self):
+        """停止工作线程并等待其退出"""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify()
+        self.wait(2000)
+    
+    def start(self, *args, **kwargs):
+        """启动工作线程"""
+        self._running = True
+        super().start(*args, **kwargs)
+    
+    def run(self):
+        """工作线程主循环"""
+        while True:
+            with self._condition:
+                while self._running and self._pending is None and not self._load_requested:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                load_requested = self._load_requested
+                self._load_requested = False
+            
+            # 首次使用前在后台导入MediaPipe并构建模型，不阻塞界面线程
+            if load_requested or not self.gesture_recognizer.model_loaded:
+                available = self.gesture_recognizer.load_model()
+                self.model_loaded.emit(available)
+                if not available:
+                    with self._condition:
+                        self._pending = None
+                    continue
+            
+            with self._condition:
+                if self._pending is None:
+                    continue
+                frame, seq, timestamp = self._pending
+                self._pending = None
+            
+            dequeue_time = time.monotonic()
+            start_time = time.perf_counter()
+            try:
+                results = self.gesture_recognizer.process_frame(frame)
+                analysis_start = time.perf_counter()
+                analysis = self.gesture_recognizer.analyze(results)
+            except Exception as e:
+                print(f"手势推理出错: {e}")
+                continue
+            end_time = time.perf_counter()
+            inference_time = end_time - start_time
+            self.processed_frames += 1
+            
+            metrics = self.metrics
+            if metrics is not None:
+                # queue: 从捕获（或提交）到开始推理的等待时间
+                metrics.record("queue", max(0.0, dequeue_time - timestamp))
+                metrics.record("inference", analysis_start - start_time)
+                metrics.record("analysis", end_time - analysis_start)
+            
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.write_results(results, timestamp, seq)
+            
+            self.result_ready.emit({
+                'results': results,
+                'analysis': analysis,
+                'seq': seq,
+                'timestamp': timestamp,
+                'inference_time': inference_time,
+            })
+
+
+class ProcessInferenceWorker(QThread):
+    """多进程推理线程，接口和信号与InferenceWorker相同
+    
+    手部检测在ProcessInferencePool的工作进程中并行执行，本线程负责启动进程池、
+    按帧序号收集结果，并在主进程中完成手部身份跟踪和手势分析后发出result_ready。
+    发出的字典中results为None，检测到的手以 [(label, score, landmarks)] 放在hands中。
+    """
+    
+    result_ready = Signal(object)
+    model_loaded = Signal(bool)
+    
+    def __init__(self, gesture_recognizer, processes, parent=None, metrics=None):
+        super().__init__(parent)
+        from process_inference import ProcessInferencePool, default_recognizer_factory
+        self.gesture_recognizer = gesture_recognizer  # 主进程中的识别器，只用于身份跟踪和分析
+        self.metrics = metrics
+        options = {
+            'inference_scale': gesture_recognizer.inference_scale,
+            'max_num_hands': gesture_recognizer.max_num_hands,
+            'min_detection_confidence': gesture_recognizer.min_detection_confidence,
+            'min_tracking_confidence': gesture_recognizer.min_tracking_confidence,
+        }
+        self.pool = ProcessInferencePool(processes, default_recognizer_factory(**options),
+                                         analyzer=gesture_recognizer.analyze_hands)
+        self._condition = threading.Condition()
+        self._running = False
+        self._load_requested = False
+        self.recorder = None
+    
+    @property
+    def processed_frames(self):
+        return self.pool.submitted - self.pool.pending()
+    
+    @property
+    def dropped_frames(self):
+        return self.pool.dropped_frames
+    
+    def submit(self, frame, seq=0, timestamp=None):
+        """提交一帧进行推理，所有共享内存槽位都在使用中时丢弃该帧，返回True表示没有丢帧"""
+        if self.pool.available is None:
+            return False
+        return self.pool.submit(frame, seq, timestamp)
+    
+    def request_model_load(self):
+        """请求在本线程中启动工作进程，各进程加载完模型后发出model_loaded信号"""
+        if self.pool.available is not None:
+            self.model_loaded.emit(self.pool.available)
+            return
+        with self._condition:
+            self._load_requested = True
+            self._condition.notify()
+    
+    def is_busy(self):
+        return self.pool.pending() > 0
+    
+    def stop(self):
+        """停止线程并关闭工作进程"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self.wait(3000)
+        self.pool.close()
+    
+    def start(self, *args, **kwargs):
+        self._running = True
+        super().start(*args, **kwargs)
+    
+    def run(self):
+        # 等待加载请求后再启动进程，与InferenceWorker的延迟加载行为一致
+        with self._condition:
+            while self._running and not self._load_requested:
+                self._condition.wait()
+            if not self._running:
+                return
+        available = self.pool.start()
+        self.gesture_recognizer.set_model_state(available)
+        self.model_loaded.emit(available)
+        
+        while self._running:
+            for result in self.pool.poll(timeout=0.05):
+                timestamp = result['timestamp']
+                metrics = self.metrics
+                if metrics is not None:
+                    metrics.record("queue", max(0.0, time.monotonic() - timestamp - result['inference_time']))
+                    metrics.record("inference", result['inference_time'])
+                recorder = self.recorder
+                if recorder is not None:
+                    hands = result['hands']
+                    recorder.write(timestamp, result['seq'], [hand[0] for hand in hands],
+                                   [hand[1] for hand in hands], [hand[2] for hand in hands])
+                self.result_ready.emit({
+                    'results': None,
+                    'hands': result['hands'],
+                    'analysis': result['analysis'],
+                    'seq': result['seq'],
+                    'timestamp': timestamp,
+                    'inference_time': result['inference_time'],
+                })
@@ -0,0 +1,185 @@
+"""手部关键点录制与回放模块
+
+录制文件由16字节文件头和定长记录组成，只追加写入，可直接用numpy.memmap映射读取。
+每条记录包含捕获时间戳、帧序号、手数、左右手标签、置信度和 (MAX_RECORD_HANDS, 21, 3) 关键点。
+回放时无需解码视频，也无需MediaPipe。
+"""
+
+import os
+import struct
+import threading
+import numpy as np
+from constants import MAX_NUM_HANDS
+from gesture_recognizer import analyze_hand
+
+FILE_MAGIC = b"RMLM"
+FILE_VERSION = 1
+MAX_RECORD_HANDS = MAX_NUM_HANDS
+NUM_LANDMARKS = 21
+
+# 文件头: magic(4s) version(H) max_hands(H) record_size(I) reserved(I)
+_HEADER_STRUCT = struct.Struct("<4sHHII")
+HEADER_SIZE = _HEADER_STRUCT.size
+
+# 左右手标签编码
+HANDEDNESS_NONE = 0
+HANDEDNESS_LEFT = 1
+HANDEDNESS_RIGHT = 2
+_LABEL_TO_CODE = {"Left": HANDEDNESS_LEFT, "Right": HANDEDNESS_RIGHT}
+_CODE_TO_LABEL = {HANDEDNESS_LEFT: "Left", HANDEDNESS_RIGHT: "Right"}
+
+
+def record_dtype(max_hands=MAX_RECORD_HANDS):
+    """返回单条记录的结构化dtype"""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('seq', '<u4'),
+        ('num_hands', 'u1'),
+        ('handedness', 'u1', (max_hands,)),
+        ('score', '<f4', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, NUM_LANDMARKS, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """关键点录制器，将每帧的检测结果追加写入二进制文件"""
+    
+    def __init__(self, path, max_hands=MAX_RECORD_HANDS):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.frames_written = 0
+        self._lock = threading.Lock()
+        self._record = np.zeros(1, dtype=self.dtype)
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            # 追加到已有文件前检查格式是否一致
+            read_header(path, expected_dtype=self.dtype)
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(_HEADER_STRUCT.pack(FILE_MAGIC, FILE_VERSION, max_hands, self.dtype.itemsize, 0))
+    
+    def write(self, timestamp, seq, labels, scores, landmarks):
+        """写入一帧
+        
+        labels为左右手标签列表，scores为置信度列表，landmarks为 (num_hands, 21, 3) 数组
+        """
+        num_hands = min(len(labels), self.max_hands)
+        record = self._record
+        record.fill(0)
+        record['timestamp'] = timestamp
+        record['seq'] = seq
+        record['num_hands'] = num_hands
+        for i in range(num_hands):
+            record['handedness'][0, i] = _LABEL_TO_CODE.get(labels[i], HANDEDNESS_NONE)
+            record['score'][0, i] = scores[i]
+        if num_hands:
+            record['landmarks'][0, :num_hands] = np.asarray(landmarks, dtype=np.float32)[:num_hands]
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(record.tobytes())
+            self.frames_written += 1
+    
+    def write_results(self, results, timestamp, seq=0):
+        """写入一帧MediaPipe检测结果，未检测到手时写入空记录"""
+        labels, scores, landmarks = [], [], []
+        if results and results.multi_hand_landmarks and results.multi_handedness:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+                classification = handedness.classification[0]
+                labels.append(classification.label)
+                scores.append(classification.score)
+                landmarks.append([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark])
+        self.write(timestamp, seq, labels, scores, landmarks)
+    
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+    
+    def close(self):
+        """关闭录制文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_header(path, expected_dtype=None):
+    """读取并校验文件头，返回 (version, max_hands, dtype)"""
+    with open(path, "rb") as f:
+        data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"关键点录制文件过短: {path}")
+    magic, version, max_hands, record_size, _ = _HEADER_STRUCT.unpack(data)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"不是关键点录制文件: {path}")
+    if version != FILE_VERSION:
+        raise ValueError(f"不支持的录制文件版本 {version}: {path}")
+    dtype = record_dtype(max_hands)
+    if dtype.itemsize != record_size:
+        raise ValueError(f"录制文件记录大小不匹配: {path}")
+    if expected_dtype is not None and expected_dtype != dtype:
+        raise ValueError(f"录制文件格式与录制器不一致: {path}")
+    return version, max_hands, dtype
+
+
+class LandmarkReplay:
+    """关键点回放源，通过内存映射读取录制文件"""
+    
+    def __init__(self, path):
+        self.path = path
+        _, self.max_hands, self.dtype = read_header(path)
+        # 忽略末尾未写完整的记录（例如录制过程中被中断）
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+    
+    def __len__(self):
+        return len(self.records)
+    
+    @property
+    def timestamps(self):
+        return self.records['timestamp']
+    
+    def hands(self, index):
+        """返回第index帧的 [(label, score, landmarks)] 列表"""
+        record = self.records[index]
+        return [
+            (_CODE_TO_LABEL.get(int(record['handedness'][i]), "Unknown"),
+             float(record['score'][i]),
+             np.asarray(record['landmarks'][i]))
+            for i in range(int(record['num_hands']))
+        ]
+    
+    def analyze(self, index, label="Right"):
+        """对第index帧中第一只指定标签的手进行分析，未找到返回None"""
+        record = self.records[index]
+        code = _LABEL_TO_CODE[label]
+        for i in range(int(record['num_hands'])):
+            if record['handedness'][i] == code:
+                return analyze_hand(np.asarray(record['landmarks'][i]), label, float(record['score'][i]))
+        return None
+    
+    def iter_analyses(self, label="Right", tracker=None):
+        """逐帧产生 (timestamp, seq, analysis)，指定HandTracker时按跟踪到的控制手分析"""
+        for index in range(len(self.records)):
+            record = self.records[index]
+            if tracker is None:
+                analysis = self.analyze(index, label)
+            else:
+                track = tracker.update(self.hands(index))
+                analysis = None if track is None else analyze_hand(track.landmarks, track.label, track.score, track.id)
+            yield float(record['timestamp']), int(record['seq']), analysis
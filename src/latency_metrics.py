@@ -0,0 +1,172 @@
+"""延迟统计模块，记录流水线各阶段耗时并计算滚动百分位
+
+每个阶段使用固定大小的环形缓冲区保存最近的样本，记录一次只是一次数组写入，
+百分位只在显示或导出时计算，因此可以在正式运行时一直开启。
+MetricsExporter定期把统计结果追加到JSONL文件，或写成Prometheus文本格式供node_exporter的textfile收集器读取。
+"""
+
+import json
+import os
+import threading
+import time
+import numpy as np
+from constants import METRICS_WINDOW, METRICS_EXPORT_INTERVAL
+
+
+class RollingHistogram:
+    """最近window个样本的滚动统计"""
+    
+    def __init__(self, window=METRICS_WINDOW):
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._index = 0
+        self.count = 0  # 累计记录的样本数
+        self.total = 0.0  # 累计耗时（秒）
+    
+    def record(self, seconds):
+        self._samples[self._index] = seconds
+        self._index = (self._index + 1) % self._samples.size
+        self.count += 1
+        self.total += seconds
+    
+    def values(self):
+        """返回窗口内的样本（秒）"""
+        return self._samples[:min(self.count, self._samples.size)].copy()
+    
+    def summary(self):
+        """返回窗口内样本的百分位（毫秒）"""
+        values = self.values()
+        if values.size == 0:
+            return {'count': self.count}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000.0
+        return {
+            'count': self.count,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(values.max() * 1000.0),
+            'sum_s': self.total,
+        }
+
+
+class _StageTimer:
+    """with语句计时器，退出时记录耗时"""
+    
+    __slots__ = ('_metrics', '_stage', '_start')
+    
+    def __init__(self, metrics, stage):
+        self._metrics = metrics
+        self._stage = stage
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._metrics.record(self._stage, time.perf_counter() - self._start)
+
+
+class LatencyMetrics:
+    """按阶段名称收集耗时，可被捕获、推理、注入和界面线程同时写入"""
+    
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def record(self, stage, seconds):
+        """记录一次阶段耗时（秒）"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, RollingHistogram(self.window))
+        histogram.record(seconds)
+    
+    def time(self, stage):
+        """返回计时上下文：with metrics.time("inference"): ..."""
+        return _StageTimer(self, stage)
+    
+    def values(self, stage):
+        """返回某阶段窗口内的样本（秒），没有记录过时返回空数组"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            return np.zeros(0)
+        return histogram.values()
+    
+    def stages(self):
+        with self._lock:
+            return list(self._histograms)
+    
+    def snapshot(self):
+        """返回 {阶段: 百分位统计}"""
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return {stage: histogram.summary() for stage, histogram in histograms}
+    
+    def format_lines(self, stages=None):
+        """生成用于覆盖层显示的文字行"""
+        snapshot = self.snapshot()
+        lines = []
+        for stage in stages or snapshot:
+            stats = snapshot.get(stage)
+            if not stats or 'p50_ms' not in stats:
+                continue
+            lines.append(f"{stage:<9} p50 {stats['p50_ms']:5.1f}  p95 {stats['p95_ms']:5.1f}  "
+                         f"p99 {stats['p99_ms']:5.1f} ms")
+        return lines
+
+
+def format_prometheus(snapshot, prefix="remote_mouse"):
+    """将统计快照转换为Prometheus文本格式（summary类型，单位秒）"""
+    name = f"{prefix}_stage_latency_seconds"
+    lines = [f"# HELP {name} Pipeline stage latency.", f"# TYPE {name} summary"]
+    for stage, stats in snapshot.items():
+        if 'p50_ms' not in stats:
+            continue
+        for quantile, key in (("0.5", 'p50_ms'), ("0.95", 'p95_ms'), ("0.99", 'p99_ms')):
+            lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {stats[key] / 1000.0:.6f}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum_s"]:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """定期导出统计结果，文件扩展名为.prom时写Prometheus文本格式，否则追加JSONL"""
+    
+    def __init__(self, metrics, path, interval=METRICS_EXPORT_INTERVAL, extra=None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.extra = extra  # 可选的回调，返回附加到每条JSONL记录中的字典
+        self.prometheus = path.endswith(".prom")
+        self.last_export = time.monotonic()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def maybe_export(self, now=None):
+        """距离上次导出超过interval时导出一次，返回是否导出"""
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_export < self.interval:
+            return False
+        self.export()
+        self.last_export = now
+        return True
+    
+    def export(self):
+        snapshot = self.metrics.snapshot()
+        try:
+            if self.prometheus:
+                # 先写临时文件再替换，避免收集器读到写了一半的文件
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(format_prometheus(snapshot))
+                os.replace(tmp_path, self.path)
+            else:
+                record = {'time': time.time(), 'stages': snapshot}
+                if self.extra is not None:
+                    record.update(self.extra())
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"无法导出延迟统计到 {self.path}: {e}")
@@ -1,16 +1,176 @@
 """应用程序入口点"""
 
+import argparse
+import json
 import sys
-from PySide6.QtWidgets import QApplication
-from gui_main_window import CameraApp
+import time
+
+
+def parse_args(argv=None):
+    from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, HAND_DETECTION_CONFIDENCE, \
+        HAND_TRACKING_CONFIDENCE, MAX_NUM_HANDS, HAND_INFERENCE_SCALE, SINGLE_HAND_MODE, HAND_IDENTITY_TRACKING, \
+        INFERENCE_PROCESSES, REMOTE_PORT, QUALITY_CONTROL_ENABLED, QUALITY_TARGET_FRAME_MS
+    parser = argparse.ArgumentParser(description="隔空控制鼠标")
+    parser.add_argument("--headless", action="store_true", help="无界面模式运行，不显示预览窗口")
+    parser.add_argument("--camera", default="0",
+                        help="帧源（无界面模式）：摄像头索引、/dev/video*、视频文件路径或 synthetic[:帧数]，"
+                             "用逗号分隔多个帧源时进入多摄像头模式")
+    parser.add_argument("--fast", action="store_true", help="视频文件和合成帧源不按帧率限速，用于吞吐量测试")
+    parser.add_argument("--width", type=int, default=CAMERA_WIDTH, help="捕获宽度")
+    parser.add_argument("--height", type=int, default=CAMERA_HEIGHT, help="捕获高度")
+    parser.add_argument("--fps", type=int, default=CAMERA_FPS, help="目标帧率")
+    parser.add_argument("--no-mirror", action="store_true", help="不进行镜像翻转")
+    parser.add_argument("--no-mouse", action="store_true", help="只识别手势，不控制鼠标")
+    parser.add_argument("--mouse-mode", choices=("relative", "absolute"), help="鼠标定位模式")
+    parser.add_argument("--max-hands", type=int, default=MAX_NUM_HANDS, help="最多检测的手数")
+    parser.add_argument("--single-hand", action=argparse.BooleanOptionalAction, default=SINGLE_HAND_MODE,
+                        help="只检测一只手（覆盖 --max-hands）")
+    parser.add_argument("--hand-tracking", action=argparse.BooleanOptionalAction, default=HAND_IDENTITY_TRACKING,
+                        help="跨帧跟踪控制手，不受左右分类跳变影响")
+    parser.add_argument("--detection-confidence", type=float, default=HAND_DETECTION_CONFIDENCE,
+                        help="最小检测置信度")
+    parser.add_argument("--tracking-confidence", type=float, default=HAND_TRACKING_CONFIDENCE,
+                        help="最小跟踪置信度")
+    parser.add_argument("--inference-scale", type=float, default=HAND_INFERENCE_SCALE,
+                        help="整帧送入MediaPipe前的缩放比例（0-1]")
+    parser.add_argument("--no-motion-gate", action="store_true", help="禁用运动门控")
+    parser.add_argument("--processes", type=int, default=INFERENCE_PROCESSES,
+                        help="在这么多个工作进程中并行推理，0表示在本进程中推理")
+    parser.add_argument("--quality-control", action=argparse.BooleanOptionalAction, default=QUALITY_CONTROL_ENABLED,
+                        help="根据每帧处理时间自动调整推理分辨率、模型复杂度和检测间隔")
+    parser.add_argument("--frame-budget-ms", type=float, default=QUALITY_TARGET_FRAME_MS,
+                        help="画质控制的每帧处理时间目标（毫秒）")
+    parser.add_argument("--remote", metavar="主机[:端口]",
+                        help="无界面模式下把鼠标事件通过UDP发送到远程接收端，而不是控制本机鼠标")
+    parser.add_argument("--receiver", nargs="?", const=str(REMOTE_PORT), metavar="[主机:]端口",
+                        help="作为远程鼠标接收端运行，不打开摄像头")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="统计输出间隔（秒）")
+    parser.add_argument("--metrics-file", help="每个统计间隔导出各阶段延迟，扩展名为.prom时写Prometheus文本格式，否则追加JSONL")
+    parser.add_argument("--startup-trace", metavar="PATH",
+                        help="记录首个窗口和首次推理的时间到PATH后退出，用于启动时间基准测试")
+    return parser.parse_args(argv)
+
+
+def parse_camera(text):
+    """解析 --camera 参数，数字转换为摄像头索引，逗号分隔时返回列表"""
+    sources = [int(item) if item.isdigit() else item for item in text.split(",") if item]
+    return sources if len(sources) > 1 else sources[0]
+
+
+def run_headless(args):
+    from headless import HeadlessRunner
+    runner = HeadlessRunner(
+        camera_index=parse_camera(args.camera),
+        realtime=not args.fast,
+        metrics_file=args.metrics_file,
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        mirror=not args.no_mirror,
+        mouse_control=not args.no_mouse,
+        mouse_mode=args.mouse_mode,
+        motion_gate=not args.no_motion_gate,
+        stats_interval=args.stats_interval,
+        processes=args.processes,
+        remote=args.remote,
+        quality_control=args.quality_control,
+        frame_budget_ms=args.frame_budget_ms,
+        recognizer_options={
+            'inference_scale': args.inference_scale,
+            'max_num_hands': args.max_hands,
+            'single_hand': args.single_hand,
+            'hand_tracking': args.hand_tracking,
+            'min_detection_confidence': args.detection_confidence,
+            'min_tracking_confidence': args.tracking_confidence,
+        },
+    )
+    return runner.run()
+
+
+def run_receiver(args):
+    """运行远程鼠标接收端，直到收到SIGINT/SIGTERM"""
+    import signal
+    from latency_metrics import LatencyMetrics
+    from mouse_controller import MouseController
+    from remote_mouse import RemoteMouseReceiver, parse_address
+    host, port = parse_address(args.receiver)
+    metrics = LatencyMetrics()
+    # 发送端已经做过滤波，接收端按收到的像素位置原样注入
+    mouse_controller = MouseController(pointer_filter=None, metrics=metrics)
+    receiver = RemoteMouseReceiver(mouse_controller, host, port, metrics=metrics)
+    previous_handlers = {sig: signal.signal(sig, receiver.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        receiver.run(stats_interval=args.stats_interval)
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        receiver.close()
+        mouse_controller.close()
+        print("远程鼠标接收端已退出", flush=True)
+    return 0
+
+
+def trace_startup(app, window, path):
+    """记录启动里程碑（time.time()时间戳）到JSON文件，首次推理完成后退出程序
+    
+    窗口显示后立即在后台加载模型，并用一张空白帧完成一次推理
+    """
+    import numpy as np
+    from PySide6.QtCore import QTimer
+    from constants import CAMERA_WIDTH, CAMERA_HEIGHT
+    
+    trace = {}
+    worker = window.inference_worker
+    
+    def finish():
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        app.quit()
+    
+    def on_first_window():
+        trace['first_window'] = time.time()
+        window.start_model_load()
+    
+    def on_model_loaded(available):
+        trace['model_loaded'] = time.time()
+        trace['mediapipe_available'] = bool(available)
+        if not available:
+            finish()
+            return
+        worker.submit(np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8))
+    
+    def on_first_result(payload):
+        if 'first_inference' in trace:
+            return
+        trace['first_inference'] = time.time()
+        trace['inference_time'] = payload['inference_time']
+        finish()
+    
+    worker.model_loaded.connect(on_model_loaded)
+    worker.result_ready.connect(on_first_result)
+    # 事件循环开始处理后窗口才真正完成首次显示
+    QTimer.singleShot(0, on_first_window)
 
 
 def main():
+    # 打包后的可执行文件中启动多进程推理的工作进程
+    import multiprocessing
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.receiver:
+        sys.exit(run_receiver(args))
+    if args.headless:
+        sys.exit(run_headless(args))
+    
+    from PySide6.QtWidgets import QApplication
+    from gui_main_window import CameraApp
     app = QApplication(sys.argv)
     window = CameraApp()
     window.show()
+    if args.startup_trace:
+        trace_startup(app, window, args.startup_trace)
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
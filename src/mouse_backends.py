@@ -0,0 +1,296 @@
+"""鼠标注入后端模块
+
+所有后端都实现与pyautogui相同的 size() / moveRel(dx, dy) / moveTo(x, y) / click() / mouseDown() / mouseUp() 接口，
+可直接传给MouseController。
+AsyncMouseInjector在独立线程中调用后端，合并尚未执行的相对移动，使视觉流水线不被注入阻塞。
+"""
+
+import threading
+import time
+from collections import deque
+from constants import MOUSE_BACKEND_TIMEOUT
+
+
+class PyAutoGUIBackend:
+    """基于pyautogui的注入后端"""
+    
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = True  # 启用安全模式
+        self._pyautogui = pyautogui
+    
+    def size(self):
+        return self._pyautogui.size()
+    
+    def moveRel(self, dx, dy):
+        # _pause=False跳过pyautogui每次调用后的PAUSE等待
+        self._pyautogui.moveRel(dx, dy, _pause=False)
+    
+    def moveTo(self, x, y):
+        self._pyautogui.moveTo(x, y, _pause=False)
+    
+    def click(self):
+        self._pyautogui.click(_pause=False)
+    
+    def mouseDown(self):
+        self._pyautogui.mouseDown(_pause=False)
+    
+    def mouseUp(self):
+        self._pyautogui.mouseUp(_pause=False)
+
+
+class XTestBackend:
+    """基于Xlib XTest扩展的注入后端，仅适用于X11"""
+    
+    def __init__(self, display_name=None):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            raise RuntimeError("X服务器不支持XTEST扩展")
+        self._screen = self._display.screen()
+    
+    def size(self):
+        return self._screen.width_in_pixels, self._screen.height_in_pixels
+    
+    def moveRel(self, dx, dy):
+        # detail为True表示相对移动
+        self._xtest.fake_input(self._display, self._X.MotionNotify, detail=True, x=dx, y=dy)
+        self._display.flush()
+    
+    def moveTo(self, x, y):
+        self._xtest.fake_input(self._display, self._X.MotionNotify, detail=False, x=x, y=y)
+        self._display.flush()
+    
+    def click(self):
+        self._xtest.fake_input(self._display, self._X.ButtonPress, 1)
+        self._xtest.fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.flush()
+    
+    def mouseDown(self):
+        self._xtest.fake_input(self._display, self._X.ButtonPress, 1)
+        self._display.flush()
+    
+    def mouseUp(self):
+        self._xtest.fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.flush()
+
+
+class RecordingMouseAPI:
+    """记录鼠标操作的pyautogui替身，用于基准测试和离线回放"""
+    
+    def __init__(self, screen_width=1920, screen_height=1080):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.events = []  # (time.monotonic()时间, 事件类型, 参数)
+        self.x = screen_width // 2
+        self.y = screen_height // 2
+    
+    def size(self):
+        return self.screen_width, self.screen_height
+    
+    def moveRel(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        self.events.append((time.monotonic(), 'move', (dx, dy)))
+    
+    def moveTo(self, x, y):
+        self.x = x
+        self.y = y
+        self.events.append((time.monotonic(), 'move_to', (x, y)))
+    
+    def click(self):
+        self.events.append((time.monotonic(), 'click', (self.x, self.y)))
+    
+    def mouseDown(self):
+        self.events.append((time.monotonic(), 'down', (self.x, self.y)))
+    
+    def mouseUp(self):
+        self.events.append((time.monotonic(), 'up', (self.x, self.y)))
+    
+    def clear(self):
+        self.events = []
+
+
+MOUSE_BACKENDS = {
+    "pyautogui": PyAutoGUIBackend,
+    "xtest": XTestBackend,
+    "recording": RecordingMouseAPI,
+}
+
+
+def create_mouse_backend(name):
+    """按名称创建注入后端"""
+    try:
+        backend_class = MOUSE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"未知的鼠标后端: {name}，可选: {', '.join(MOUSE_BACKENDS)}")
+    return backend_class()
+
+
+class MouseBackendError(RuntimeError):
+    """鼠标后端创建失败或未在限定时间内就绪"""
+
+
+class AsyncMouseInjector:
+    """异步鼠标注入器，在独立线程中执行后端调用
+    
+    moveRel、moveTo、click、mouseDown和mouseUp只把命令放入队列并立即返回。队列末尾的相对移动会与新的移动合并，
+    新的绝对移动会取代末尾尚未执行的移动，按键命令前已排队的移动仍会先执行，保证点击位置正确。
+    
+    命令可以携带触发它的帧的捕获时间（time.monotonic()），后端调用完成后将 注入时间-捕获时间
+    作为端到端延迟记录到metrics的e2e_move / e2e_click（点击和按下）阶段。合并的命令保留最早的捕获时间。
+    """
+    
+    timestamped_api = True  # 各方法接受timestamp参数并自行记录端到端延迟
+    
+    def __init__(self, backend=None, backend_factory=None, backend_timeout=MOUSE_BACKEND_TIMEOUT):
+        # 传入backend_factory时后端在注入线程中创建，pyautogui等模块的导入不会阻塞调用方
+        if backend is None and backend_factory is None:
+            raise ValueError("backend和backend_factory至少需要提供一个")
+        self.backend = backend
+        self._backend_factory = backend_factory
+        self._backend_ready = threading.Event()
+        self._backend_error = None
+        self.backend_timeout = backend_timeout
+        if backend is not None:
+            self._backend_ready.set()
+        self._condition = threading.Condition()
+        self._commands = deque()  # [类型, x, y, 捕获时间]
+        self._running = True
+        self.submitted = 0  # 提交的命令数
+        self.coalesced = 0  # 被合并的移动命令数
+        self.injected = 0  # 实际执行的后端调用数
+        self.last_inject_time = 0.0  # 最近一次后端调用耗时（秒）
+        self.inject_errors = 0  # 后端调用失败的次数
+        self._reported_errors = set()  # 已输出过的失败类型，同类失败只输出一次
+        self._in_flight = False  # 注入线程是否正在执行已取出的命令
+        self.metrics = None  # 可选的LatencyMetrics，记录每次后端调用耗时
+        self._thread = threading.Thread(target=self._run, name="mouse-injector", daemon=True)
+        self._thread.start()
+    
+    def size(self):
+        """返回屏幕尺寸，后端仍在创建时最多等待backend_timeout秒，超时或创建失败时抛出MouseBackendError"""
+        if not self._backend_ready.wait(self.backend_timeout):
+            raise MouseBackendError(f"鼠标后端在 {self.backend_timeout:g} 秒内未就绪")
+        if self.backend is None:
+            raise MouseBackendError(f"鼠标后端创建失败: {self._backend_error}")
+        return self.backend.size()
+    
+    def moveRel(self, dx, dy, timestamp=None):
+        with self._condition:
+            self.submitted += 1
+            if self._commands and self._commands[-1][0] == 'move':
+                last = self._commands[-1]
+                last[1] += dx
+                last[2] += dy
+                if last[3] is None:
+                    last[3] = timestamp
+                self.coalesced += 1
+            else:
+                self._commands.append(['move', dx, dy, timestamp])
+                self._condition.notify()
+    
+    def moveTo(self, x, y, timestamp=None):
+        with self._condition:
+            self.submitted += 1
+            if self._commands and self._commands[-1][0] in ('move', 'move_to'):
+                previous_timestamp = self._commands[-1][3]
+                self._commands[-1] = ['move_to', x, y,
+                                      timestamp if previous_timestamp is None else previous_timestamp]
+                self.coalesced += 1
+            else:
+                self._commands.append(['move_to', x, y, timestamp])
+                self._condition.notify()
+    
+    def click(self, timestamp=None):
+        self._append_button('click', timestamp)
+    
+    def mouseDown(self, timestamp=None):
+        self._append_button('down', timestamp)
+    
+    def mouseUp(self, timestamp=None):
+        self._append_button('up', timestamp)
+    
+    def _append_button(self, kind, timestamp):
+        with self._condition:
+            self.submitted += 1
+            self._commands.append([kind, 0, 0, timestamp])
+            self._condition.notify()
+    
+    def flush(self, timeout=1.0):
+        """等待队列中的命令全部执行完毕（包括正在执行的后端调用）"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while (self._commands or self._in_flight) and time.monotonic() < deadline:
+                self._condition.wait(0.005)
+    
+    def stop(self):
+        """停止注入线程，丢弃未执行的命令"""
+        with self._condition:
+            self._running = False
+            self._commands.clear()
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+    
+    def _create_backend(self):
+        try:
+            self.backend = self._backend_factory()
+        except Exception as e:
+            self._backend_error = e
+            print(f"鼠标后端创建失败: {e}")
+        finally:
+            self._backend_ready.set()
+    
+    def _run(self):
+        if self.backend is None:
+            self._create_backend()
+        while True:
+            with self._condition:
+                while self._running and not self._commands:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                kind, x, y, timestamp = self._commands.popleft()
+                self._in_flight = True
+            try:
+                self._execute(kind, x, y, timestamp)
+            finally:
+                with self._condition:
+                    self._in_flight = False
+                    if not self._commands:
+                        self._condition.notify_all()
+    
+    def _execute(self, kind, x, y, timestamp):
+        """执行一条命令并记录耗时"""
+        if self.backend is None:
+            return
+        start_time = time.perf_counter()
+        try:
+            if kind == 'move':
+                if x or y:
+                    self.backend.moveRel(x, y)
+            elif kind == 'move_to':
+                self.backend.moveTo(x, y)
+            elif kind == 'down':
+                self.backend.mouseDown()
+            elif kind == 'up':
+                self.backend.mouseUp()
+            else:
+                self.backend.click()
+        except Exception as e:
+            # 例如pyautogui的FailSafeException，不应终止注入线程。
+            # 光标停在屏幕角落时每帧都会失败，同类失败只输出一次
+            self.inject_errors += 1
+            if type(e) not in self._reported_errors:
+                self._reported_errors.add(type(e))
+                print(f"鼠标注入失败: {e}（同类失败之后不再输出）")
+        self.last_inject_time = time.perf_counter() - start_time
+        self.injected += 1
+        if self.metrics is not None:
+            self.metrics.record("inject", self.last_inject_time)
+            if timestamp is not None and kind != 'up':
+                self.metrics.record("e2e_click" if kind in ('click', 'down') else "e2e_move",
+                                    time.monotonic() - timestamp)
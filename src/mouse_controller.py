@@ -1,7 +1,11 @@
-import pyautogui
+"""鼠标控制模块，负责鼠标移动和点击操作"""
+
 import time
 import math
-from constants import MOUSE_SMOOTH_FACTOR, MOUSE_MAX_VELOCITY, CLICK_INTERVAL, \
+from pointer_filters import create_pointer_filter
+from mouse_backends import AsyncMouseInjector, create_mouse_backend
+from constants import MOUSE_BACKEND, MOUSE_ASYNC_INJECTION, POINTER_FILTER, \
+    MOUSE_SMOOTH_FACTOR, MOUSE_MAX_VELOCITY, \
     SMALL_MOVEMENT_THRESHOLD, MEDIUM_MOVEMENT_THRESHOLD, \
     SMALL_MOVEMENT_SENSITIVITY, MEDIUM_MOVEMENT_SENSITIVITY, BASE_LARGE_MOVEMENT_SENSITIVITY
 
@@ -9,9 +13,24 @@ from constants import MOUSE_SMOOTH_FACTOR, MOUSE_MAX_VELOCITY, CLICK_INTERVAL, \
 class MouseController:
     """鼠标控制器类，负责鼠标移动和点击操作"""
     
-    def __init__(self):
-        pyautogui.FAILSAFE = True  # 启用安全模式
-        self.screen_width, self.screen_height = pyautogui.size()
+    def __init__(self, mouse_api=None, pointer_filter=POINTER_FILTER, metrics=None):
+        # mouse_api为兼容pyautogui接口（size/moveRel/click）的对象，
+        # 默认按MOUSE_BACKEND创建后端，并在MOUSE_ASYNC_INJECTION开启时放到独立注入线程中执行，
+        # 此时后端（及pyautogui的导入）也在注入线程中创建，不阻塞启动
+        if mouse_api is None:
+            if MOUSE_ASYNC_INJECTION:
+                mouse_api = AsyncMouseInjector(backend_factory=lambda: create_mouse_backend(MOUSE_BACKEND))
+            else:
+                mouse_api = create_mouse_backend(MOUSE_BACKEND)
+        self.mouse_api = mouse_api
+        self._screen_size = None  # 首次使用时查询
+        
+        # 端到端延迟统计：注入完成时间减去触发它的帧的捕获时间。
+        # 异步注入器和远程发送端（timestamped_api为True）接受timestamp参数，由它们自己记录
+        self.metrics = metrics
+        self._async_injection = getattr(mouse_api, 'timestamped_api', False)
+        if self._async_injection:
+            mouse_api.metrics = metrics
         
         # 鼠标移动平滑处理
         self.smooth_factor = MOUSE_SMOOTH_FACTOR  # 平滑因子，越小越平滑
@@ -19,12 +38,35 @@ class MouseController:
         self.velocity_y = 0  # y轴速度
         self.max_velocity = MOUSE_MAX_VELOCITY  # 最大速度限制，增加以支持更大范围移动
         
-        # 左键点击控制
-        self.last_click_time = 0  # 上次点击时间
-        self.click_interval = CLICK_INTERVAL  # 点击间隔时间（秒）
+        # 指针滤波器：对累计的目标光标位置滤波，可传入滤波器名称或实例，为None时使用上面的速度平滑
+        if pointer_filter is None or isinstance(pointer_filter, str):
+            pointer_filter = create_pointer_filter(pointer_filter)
+        self.pointer_filter = pointer_filter
+        self.target_x = 0.0  # 未滤波的累计目标位置（相对于开始移动时的光标）
+        self.target_y = 0.0
+        self.emitted_x = 0  # 已发送给系统的累计整数位移
+        self.emitted_y = 0
+        self.remainder_x = 0.0  # 速度平滑模式下尚未发送的小数位移
+        self.remainder_y = 0.0
+        self.last_absolute_position = None  # 绝对定位模式下最近一次发送的像素位置
+        self.button_down = False  # 左键是否处于按下状态（拖动中）
+    
+    @property
+    def screen_width(self):
+        return self.screen_size()[0]
+    
+    @property
+    def screen_height(self):
+        return self.screen_size()[1]
     
-    def move_mouse_relative(self, dx, dy):
-        """相对移动鼠标"""
+    def screen_size(self):
+        """返回屏幕尺寸，首次调用时向后端查询并缓存"""
+        if self._screen_size is None:
+            self._screen_size = tuple(self.mouse_api.size())
+        return self._screen_size
+    
+    def move_mouse_relative(self, dx, dy, timestamp=None):
+        """相对移动鼠标，timestamp为该位移对应的帧捕获时间（秒）"""
         # 使用平方函数来增强大动作的灵敏度，同时保持小动作的精确性
         # 当手势移动距离较大时，应用更高的放大倍数
         magnitude = math.sqrt(dx*dx + dy*dy)
@@ -48,34 +90,112 @@ class MouseController:
             adjusted_dx = 0
             adjusted_dy = 0
         
-        # 使用加速度和速度的物理模型来平滑移动
-        # 计算目标速度
-        target_velocity_x = adjusted_dx
-        target_velocity_y = adjusted_dy
-        
         # 限制最大速度，防止过度快速移动
         max_speed = self.max_velocity
-        target_velocity_x = max(-max_speed, min(max_speed, target_velocity_x))
-        target_velocity_y = max(-max_speed, min(max_speed, target_velocity_y))
+        target_velocity_x = max(-max_speed, min(max_speed, adjusted_dx))
+        target_velocity_y = max(-max_speed, min(max_speed, adjusted_dy))
+        
+        if self.pointer_filter is not None:
+            self._move_filtered(target_velocity_x, target_velocity_y, timestamp)
+            return
         
+        # 使用加速度和速度的物理模型来平滑移动
         # 平滑过渡到目标速度
         self.velocity_x = self.smooth_factor * target_velocity_x + (1 - self.smooth_factor) * self.velocity_x
         self.velocity_y = self.smooth_factor * target_velocity_y + (1 - self.smooth_factor) * self.velocity_y
         
-        # 执行相对鼠标移动
+        # 执行相对鼠标移动，截断后的小数部分累计到下一帧
         if abs(self.velocity_x) > 0.1 or abs(self.velocity_y) > 0.1:
-            pyautogui.moveRel(int(self.velocity_x), int(self.velocity_y))
+            move_x = self.velocity_x + self.remainder_x
+            move_y = self.velocity_y + self.remainder_y
+            int_x, int_y = int(move_x), int(move_y)
+            self.remainder_x = move_x - int_x
+            self.remainder_y = move_y - int_y
+            if int_x or int_y:
+                self._inject('moveRel', (int_x, int_y), timestamp)
+    
+    def _move_filtered(self, dx, dy, timestamp):
+        """累计目标位置并经过指针滤波器，只发送整数像素的变化量"""
+        self.target_x += dx
+        self.target_y += dy
+        filter_time = time.monotonic() if timestamp is None else timestamp
+        filtered_x, filtered_y = self.pointer_filter.filter(self.target_x, self.target_y, filter_time)
+        
+        # 与已发送位移比较，小数部分保留到下一帧，避免截断造成的漂移
+        move_x = int(round(filtered_x)) - self.emitted_x
+        move_y = int(round(filtered_y)) - self.emitted_y
+        if move_x or move_y:
+            self._inject('moveRel', (move_x, move_y), timestamp)
+            self.emitted_x += move_x
+            self.emitted_y += move_y
+    
+    def move_mouse_absolute(self, x, y, timestamp=None):
+        """将光标移动到屏幕坐标 (x, y)，坐标可以是小数，目标像素未变化时不注入"""
+        if self.pointer_filter is not None:
+            x, y = self.pointer_filter.filter(x, y, time.monotonic() if timestamp is None else timestamp)
+        pixel_x = max(0, min(self.screen_width - 1, int(round(x))))
+        pixel_y = max(0, min(self.screen_height - 1, int(round(y))))
+        if (pixel_x, pixel_y) == self.last_absolute_position:
+            return False
+        self._inject('moveTo', (pixel_x, pixel_y), timestamp)
+        self.last_absolute_position = (pixel_x, pixel_y)
+        return True
+    
+    def move_mouse_pixels(self, dx, dy, timestamp=None):
+        """按整数像素直接相对移动，不做灵敏度放大和滤波（远程接收端使用，发送端已处理过）"""
+        if dx or dy:
+            self._inject('moveRel', (int(dx), int(dy)), timestamp)
     
     def reset_velocity(self):
         """重置鼠标移动速度"""
         self.velocity_x = 0
         self.velocity_y = 0
+        if self.pointer_filter is not None:
+            self.pointer_filter.reset()
+        self.target_x = 0.0
+        self.target_y = 0.0
+        self.emitted_x = 0
+        self.emitted_y = 0
+        self.remainder_x = 0.0
+        self.remainder_y = 0.0
+        self.last_absolute_position = None
+    
+    def close(self):
+        """释放仍按下的左键，并停止异步注入线程或关闭远程发送端（如果有）"""
+        self.mouse_up()
+        if isinstance(self.mouse_api, AsyncMouseInjector):
+            self.mouse_api.flush()
+            self.mouse_api.stop()
+        elif hasattr(self.mouse_api, 'close'):
+            self.mouse_api.close()
+    
+    def _inject(self, method, args, timestamp):
+        """调用注入接口，timestamp为触发该操作的帧的捕获时间（time.monotonic()），用于统计端到端延迟"""
+        if self._async_injection:
+            getattr(self.mouse_api, method)(*args, timestamp=timestamp)
+            return
+        getattr(self.mouse_api, method)(*args)
+        if self.metrics is not None and timestamp is not None and method != 'mouseUp':
+            stage = "e2e_click" if method in ('click', 'mouseDown') else "e2e_move"
+            self.metrics.record(stage, time.monotonic() - timestamp)
+    
+    def left_click(self, timestamp=None):
+        """执行左键点击，去抖由GestureStateMachine负责，这里不再限制点击间隔"""
+        self._inject('click', (), timestamp)
+        return True
+    
+    def mouse_down(self, timestamp=None):
+        """按下左键（开始点击或拖动）"""
+        if self.button_down:
+            return False
+        self._inject('mouseDown', (), timestamp)
+        self.button_down = True
+        return True
     
-    def left_click(self):
-        """执行左键点击"""
-        current_time = time.time()
-        if current_time - self.last_click_time >= self.click_interval:
-            pyautogui.click()  # 执行左键点击
-            self.last_click_time = current_time  # 更新上次点击时间
-            return True
-        return False
\ No newline at end of file
+    def mouse_up(self, timestamp=None):
+        """释放左键"""
+        if not self.button_down:
+            return False
+        self._inject('mouseUp', (), timestamp)
+        self.button_down = False
+        return True
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""多摄像头模块，多个摄像头并行捕获和推理，并把各视角的结果融合为一路手势流
+
+每个摄像头（CameraView）有独立的CameraHandler捕获线程、GestureRecognizer和推理线程，
+互不阻塞。ResultFusion按置信度和时间戳从各视角的最新结果中选出一路：
+当前视角仍能看到手时保持不变，只有别的视角置信度明显更高或当前视角丢失/过期时才切换，
+因此一个视角被遮挡或断开时，另一个视角继续提供手势。
+不同视角的食指坐标不在同一坐标系中，切换视角时HandAnalysis的hand_id随之改变，
+GestureController会重新开始相对跟踪，光标不会跳动。
+"""
+
+import threading
+import time
+from collections import deque
+import cv2
+from camera_handler import CameraHandler
+from constants import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, FRAME_SOURCE_REALTIME, MULTI_CAMERA_MAX_AGE, \
+    MULTI_CAMERA_SWITCH_MARGIN, MULTI_CAMERA_QUEUE_SIZE
+
+
+class ViewResult:
+    """一个视角一帧的推理结果"""
+    
+    __slots__ = ('view', 'seq', 'timestamp', 'analysis', 'hand_present')
+    
+    def __init__(self, view, seq, timestamp, analysis, hand_present):
+        self.view = view  # 视角序号
+        self.seq = seq  # 该视角的帧序号
+        self.timestamp = timestamp  # 捕获时间（time.monotonic()）
+        self.analysis = analysis  # 控制手的HandAnalysis，未检测到时为None
+        self.hand_present = hand_present  # 画面中是否有任意一只手
+    
+    @property
+    def confidence(self):
+        return self.analysis.score if self.analysis is not None else 0.0
+
+
+class ResultFusion:
+    """按置信度和时间戳融合多个视角的结果"""
+    
+    def __init__(self, num_views, max_age=MULTI_CAMERA_MAX_AGE, switch_margin=MULTI_CAMERA_SWITCH_MARGIN):
+        self.max_age = max_age  # 结果过期时间（秒）
+        self.switch_margin = switch_margin  # 切换视角所需的置信度优势
+        self.latest = [None] * num_views  # 各视角最新的ViewResult
+        self.selected = None  # 当前输出的视角
+        self.last_timestamp = 0.0  # 最近一次输出结果的捕获时间
+        self.switch_count = 0  # 视角切换次数
+        self.stale_count = 0  # 因比已输出结果更旧而丢弃的次数
+        self.view_outputs = [0] * num_views  # 各视角被输出的帧数
+    
+    def update(self, result):
+        """输入一个视角的新结果，返回需要输出的ViewResult，本次不需要输出时返回None"""
+        self.latest[result.view] = result
+        fresh = [r for r in self.latest if r is not None and result.timestamp - r.timestamp <= self.max_age]
+        candidates = [r for r in fresh if r.analysis is not None]
+        
+        best = max(candidates, key=lambda r: (r.confidence, r.timestamp), default=None)
+        current = self.latest[self.selected] if self.selected is not None else None
+        if current in candidates and best.confidence <= current.confidence + self.switch_margin:
+            best = current
+        if best is not None and best.view != self.selected:
+            if self.selected is not None:
+                self.switch_count += 1
+            self.selected = best.view
+        
+        # 选中视角有新结果时输出；所有视角都没有手时，由序号最小的未过期视角驱动"无手"帧，
+        # 保证下游手势状态机按单路帧率收到更新
+        if best is not None:
+            if result is not best:
+                return None
+        elif result.view != min(r.view for r in fresh):
+            return None
+        if result.timestamp < self.last_timestamp:
+            self.stale_count += 1
+            return None
+        self.last_timestamp = result.timestamp
+        self.view_outputs[result.view] += 1
+        return result
+
+
+class CameraView:
+    """单个视角：后台捕获线程 + 推理线程"""
+    
+    def __init__(self, view, source, recognizer, mirror=True, metrics=None):
+        self.view = view
+        self.source = source  # 摄像头索引、视频文件路径、"synthetic[:帧数]"或FrameSource
+        self.recognizer = recognizer
+        self.mirror = mirror
+        self.metrics = metrics
+        self.camera_handler = CameraHandler()
+        self._thread = None
+        self._running = False
+        self.frames = 0  # 已推理的帧数
+        self.hand_frames = 0  # 检测到控制手的帧数
+    
+    def start(self, on_result, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+              realtime=FRAME_SOURCE_REALTIME):
+        """打开帧源并启动推理线程，on_result在推理线程中以ViewResult调用"""
+        if not self.camera_handler.open_camera(self.source, threaded=True, width=width, height=height, fps=fps,
+                                               realtime=realtime):
+            print(f"视角 {self.view} 无法打开帧源 {self.source}")
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(on_result,), name=f"camera-view-{self.view}",
+                                        daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.camera_handler.close_camera()
+    
+    def is_running(self):
+        return self._running and self.camera_handler.is_capturing()
+    
+    def _run(self, on_result):
+        """推理线程主循环：等待新帧 → 检测 → 分析 → 回调"""
+        metrics = self.metrics
+        last_seq = 0
+        while self._running:
+            ret, frame, timestamp, seq = self.camera_handler.wait_for_frame(last_seq, timeout=0.5)
+            if not ret:
+                if not self.camera_handler.is_capturing():
+                    print(f"视角 {self.view} 已断开")
+                    break
+                continue
+            last_seq = seq
+            if self.mirror:
+                frame = cv2.flip(frame, 1)
+            start_time = time.perf_counter()
+            try:
+                results = self.recognizer.process_frame(frame)
+                analysis_start = time.perf_counter()
+                analysis = self.recognizer.analyze(results)
+            except Exception as e:
+                print(f"视角 {self.view} 手势推理出错: {e}")
+                continue
+            end_time = time.perf_counter()
+            if metrics is not None:
+                metrics.record("capture", max(0.0, time.monotonic() - timestamp))
+                metrics.record("inference", analysis_start - start_time)
+                metrics.record("analysis", end_time - analysis_start)
+            self.frames += 1
+            if analysis is not None:
+                self.hand_frames += 1
+                # 各视角的跟踪ID互相独立，加上视角序号后切换视角时下游能识别出控制手发生了变化
+                analysis.hand_id = (self.view, analysis.hand_id)
+            hand_present = analysis is not None or bool(getattr(results, 'multi_hand_landmarks', None))
+            on_result(ViewResult(self.view, seq, timestamp, analysis, hand_present))
+        self._running = False
+
+
+class MultiCameraPipeline:
+    """N个摄像头并行捕获和推理，融合后的结果通过wait_for_result按时间顺序取出"""
+    
+    def __init__(self, sources, recognizer_factory, mirror=True, metrics=None, queue_size=MULTI_CAMERA_QUEUE_SIZE):
+        self.views = [CameraView(i, source, recognizer_factory(), mirror, metrics) for i, source in enumerate(sources)]
+        self.fusion = ResultFusion(len(self.views))
+        self.metrics = metrics
+        self._condition = threading.Condition()
+        self._results = deque(maxlen=queue_size)
+        self.dropped_results = 0  # 消费跟不上被丢弃的融合结果数
+    
+    def start(self, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS, realtime=FRAME_SOURCE_REALTIME):
+        """启动所有视角，只要有一个视角打开成功即返回True"""
+        opened = [view.start(self._on_result, width, height, fps, realtime) for view in self.views]
+        return any(opened)
+    
+    def stop(self):
+        for view in self.views:
+            view.stop()
+        with self._condition:
+            self._condition.notify_all()
+    
+    def is_running(self):
+        """是否还有视角在运行"""
+        return any(view.is_running() for view in self.views)
+    
+    def _on_result(self, result):
+        with self._condition:
+            fused = self.fusion.update(result)
+            if fused is None:
+                return
+            if len(self._results) == self._results.maxlen:
+                self.dropped_results += 1
+            self._results.append(fused)
+            self._condition.notify()
+    
+    def wait_for_result(self, timeout=None):
+        """取出下一个融合结果（ViewResult），超时或全部视角停止时返回None"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._results or not self.is_running(), timeout)
+            if not self._results:
+                return None
+            return self._results.popleft()
+    
+    def get_stats(self):
+        """各视角和融合的统计信息"""
+        with self._condition:
+            return {
+                'views': [
+                    {
+                        'source': str(view.source),
+                        'running': view.is_running(),
+                        'frames': view.frames,
+                        'hand_frames': view.hand_frames,
+                        'outputs': self.fusion.view_outputs[view.view],
+                        'dropped': view.camera_handler.dropped_frames,
+                    }
+                    for view in self.views
+                ],
+                'selected': self.fusion.selected,
+                'switches': self.fusion.switch_count,
+                'stale': self.fusion.stale_count,
+                'dropped_results': self.dropped_results,
+            }
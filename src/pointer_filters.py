@@ -0,0 +1,172 @@
+"""指针滤波模块，提供可替换的光标位置滤波器
+
+所有滤波器都实现 filter(x, y, timestamp) -> (x, y) 和 reset()。
+prediction_time（秒）不为0时，输出会按估计速度外推，用于补偿已知的捕获和推理延迟。
+"""
+
+import math
+from constants import CAMERA_FPS, MOUSE_SMOOTH_FACTOR, POINTER_FILTER, POINTER_PREDICTION_MS, \
+    ONE_EURO_MIN_CUTOFF, ONE_EURO_BETA, ONE_EURO_D_CUTOFF, \
+    KALMAN_PROCESS_NOISE, KALMAN_MEASUREMENT_NOISE
+
+_DEFAULT_DT = 1.0 / CAMERA_FPS
+
+
+def _time_step(last_timestamp, timestamp):
+    """计算两次输入之间的时间间隔，时间戳无效时使用默认帧间隔"""
+    if last_timestamp is None:
+        return _DEFAULT_DT
+    dt = timestamp - last_timestamp
+    return dt if dt > 1e-6 else _DEFAULT_DT
+
+
+class ExponentialFilter:
+    """固定系数的指数平滑滤波器"""
+    
+    def __init__(self, smooth_factor=MOUSE_SMOOTH_FACTOR, prediction_time=0.0):
+        self.smooth_factor = smooth_factor  # 平滑因子，越小越平滑
+        self.prediction_time = prediction_time
+        self.reset()
+    
+    def reset(self):
+        self.x = None
+        self.y = None
+        self.vx = 0.0
+        self.vy = 0.0
+        self.last_timestamp = None
+    
+    def filter(self, x, y, timestamp):
+        if self.x is None:
+            self.x, self.y = x, y
+            self.last_timestamp = timestamp
+            return x, y
+        dt = _time_step(self.last_timestamp, timestamp)
+        self.last_timestamp = timestamp
+        new_x = self.smooth_factor * x + (1 - self.smooth_factor) * self.x
+        new_y = self.smooth_factor * y + (1 - self.smooth_factor) * self.y
+        self.vx = (new_x - self.x) / dt
+        self.vy = (new_y - self.y) / dt
+        self.x, self.y = new_x, new_y
+        return self.x + self.vx * self.prediction_time, self.y + self.vy * self.prediction_time
+
+
+class OneEuroFilter:
+    """One Euro滤波器：低速时强平滑抑制抖动，高速时提高截止频率减少滞后"""
+    
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF,
+                 prediction_time=0.0):
+        self.min_cutoff = min_cutoff  # 最小截止频率（Hz）
+        self.beta = beta  # 速度对截止频率的影响系数
+        self.d_cutoff = d_cutoff  # 速度估计的截止频率（Hz）
+        self.prediction_time = prediction_time
+        self.reset()
+    
+    def reset(self):
+        self.x = None
+        self.y = None
+        self.dx = 0.0
+        self.dy = 0.0
+        self.last_timestamp = None
+    
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+    
+    def filter(self, x, y, timestamp):
+        if self.x is None:
+            self.x, self.y = x, y
+            self.last_timestamp = timestamp
+            return x, y
+        dt = _time_step(self.last_timestamp, timestamp)
+        self.last_timestamp = timestamp
+        
+        # 平滑速度估计
+        alpha_d = self._alpha(self.d_cutoff, dt)
+        self.dx = alpha_d * (x - self.x) / dt + (1 - alpha_d) * self.dx
+        self.dy = alpha_d * (y - self.y) / dt + (1 - alpha_d) * self.dy
+        
+        # 根据速度调整截止频率
+        speed = math.hypot(self.dx, self.dy)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        self.x = alpha * x + (1 - alpha) * self.x
+        self.y = alpha * y + (1 - alpha) * self.y
+        return self.x + self.dx * self.prediction_time, self.y + self.dy * self.prediction_time
+
+
+class _KalmanAxis:
+    """单轴匀速模型卡尔曼滤波，状态为 [位置, 速度]"""
+    
+    def __init__(self, position):
+        self.p = position
+        self.v = 0.0
+        # 协方差矩阵 [[p00, p01], [p01, p11]]
+        self.p00 = 1.0
+        self.p01 = 0.0
+        self.p11 = 1000.0
+    
+    def step(self, measurement, dt, q, r):
+        # 预测
+        self.p += self.v * dt
+        dt2 = dt * dt
+        p00 = self.p00 + 2 * dt * self.p01 + dt2 * self.p11 + q * dt2 * dt2 / 4
+        p01 = self.p01 + dt * self.p11 + q * dt2 * dt / 2
+        p11 = self.p11 + q * dt2
+        
+        # 更新
+        innovation = measurement - self.p
+        s = p00 + r
+        k0 = p00 / s
+        k1 = p01 / s
+        self.p += k0 * innovation
+        self.v += k1 * innovation
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+
+
+class KalmanFilter:
+    """匀速模型卡尔曼滤波器，速度由模型估计，适合做短时预测"""
+    
+    def __init__(self, process_noise=KALMAN_PROCESS_NOISE, measurement_noise=KALMAN_MEASUREMENT_NOISE,
+                 prediction_time=0.0):
+        self.process_noise = process_noise  # 加速度噪声强度（像素/秒²）²
+        self.measurement_noise = measurement_noise  # 测量噪声方差（像素²）
+        self.prediction_time = prediction_time
+        self.reset()
+    
+    def reset(self):
+        self.axis_x = None
+        self.axis_y = None
+        self.last_timestamp = None
+    
+    def filter(self, x, y, timestamp):
+        if self.axis_x is None:
+            self.axis_x = _KalmanAxis(x)
+            self.axis_y = _KalmanAxis(y)
+            self.last_timestamp = timestamp
+            return x, y
+        dt = _time_step(self.last_timestamp, timestamp)
+        self.last_timestamp = timestamp
+        self.axis_x.step(x, dt, self.process_noise, self.measurement_noise)
+        self.axis_y.step(y, dt, self.process_noise, self.measurement_noise)
+        return (self.axis_x.p + self.axis_x.v * self.prediction_time,
+                self.axis_y.p + self.axis_y.v * self.prediction_time)
+
+
+POINTER_FILTERS = {
+    "ema": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def create_pointer_filter(name=POINTER_FILTER, prediction_ms=POINTER_PREDICTION_MS, **kwargs):
+    """按名称创建指针滤波器，name为None或"none"时返回None（使用原有的速度平滑）"""
+    if name is None or name == "none":
+        return None
+    try:
+        filter_class = POINTER_FILTERS[name]
+    except KeyError:
+        raise ValueError(f"未知的指针滤波器: {name}，可选: {', '.join(POINTER_FILTERS)}")
+    return filter_class(prediction_time=prediction_ms / 1000.0, **kwargs)
@@ -0,0 +1,295 @@
+"""多进程推理模块，在多个工作进程中运行手部检测，突破单个解释器GIL的限制
+
+帧通过multiprocessing.shared_memory中的环形槽位传给工作进程：主进程把帧复制到空闲槽位，
+任务队列里只传递槽位号、帧形状和序号，避免对整帧图像做pickle。工作进程各自持有一个识别器
+（MediaPipe Hands实例），只返回检测到的手 [(label, score, landmarks)]；主进程按帧序号重新排序后
+再做手部身份跟踪和手势分析，因此下游看到的结果顺序与单线程推理一致。
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+from constants import INFERENCE_RING_SLOTS, INFERENCE_REORDER_TIMEOUT
+
+
+class SharedFrameRing:
+    """共享内存中的固定大小帧槽位"""
+    
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+    
+    @property
+    def name(self):
+        return self.shm.name
+    
+    def view(self, slot, shape, dtype=np.uint8):
+        """返回槽位中指定形状的数组视图（不复制）"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+    
+    def write(self, slot, frame):
+        """把帧复制到槽位"""
+        self.view(slot, frame.shape, frame.dtype)[...] = frame
+    
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def detect_hands(recognizer, frame):
+    """在工作进程中检测一帧，返回 [(label, score, landmarks)]"""
+    results = recognizer.process_frame(frame)
+    if hasattr(recognizer, 'detected_hands'):
+        return recognizer.detected_hands(results)
+    # 只提供analyze的识别器（如基准测试中的替身）只返回控制手
+    analysis = recognizer.analyze(results)
+    return [] if analysis is None else [(analysis.label, analysis.score, analysis.landmarks)]
+
+
+def _worker_main(recognizer_factory, tasks, results):
+    """工作进程入口：加载模型，然后循环处理任务直到收到None"""
+    recognizer = recognizer_factory()
+    load_model = getattr(recognizer, 'load_model', None)
+    available = load_model() if load_model is not None else True
+    results.put(('ready', os.getpid(), available))
+    rings = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        ring_name, slot_bytes, slot, shape, ticket, seq, timestamp = task
+        ring = rings.get(ring_name)
+        if ring is None:
+            # 主进程扩大槽位时会创建新的共享内存，旧的不再使用
+            for old in rings.values():
+                old.close()
+            ring = SharedFrameRing(0, slot_bytes, name=ring_name)
+            rings = {ring_name: ring}
+        start = time.perf_counter()
+        try:
+            hands = detect_hands(recognizer, ring.view(slot, shape))
+            error = None
+        except Exception as e:
+            hands, error = [], str(e)
+        results.put(('result', ring_name, slot, ticket, seq, timestamp, hands, time.perf_counter() - start, error))
+    for ring in rings.values():
+        ring.close()
+
+
+class ProcessInferencePool:
+    """多进程推理池
+    
+    submit把帧放入空闲槽位并分发给任意空闲的工作进程，所有槽位都在使用中时丢弃该帧；
+    poll按提交顺序返回已完成的结果，某一帧超过INFERENCE_REORDER_TIMEOUT仍未返回时跳过它。
+    排序使用池内部递增的提交编号，调用方传入的seq只作为数据原样返回，可以重复（例如同步读取时恒为0）。
+    """
+    
+    def __init__(self, workers, recognizer_factory, analyzer=None, slots=INFERENCE_RING_SLOTS,
+                 reorder_timeout=INFERENCE_REORDER_TIMEOUT):
+        self.num_workers = max(1, workers)
+        self.recognizer_factory = recognizer_factory  # 可pickle的可调用对象，在工作进程中创建识别器
+        self.analyzer = analyzer  # 主进程中按顺序调用的 hands -> HandAnalysis，为None时不做分析
+        self.slots = slots or self.num_workers * 2
+        self.reorder_timeout = reorder_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks = None
+        self._results = None
+        self._processes = []
+        self._ring = None
+        self._retired = {}  # 已被替换但仍有帧在处理的旧槽位: name -> [ring, 剩余帧数]
+        self._free = deque()
+        self._ticket = 0  # 池内部的提交编号，只增不减，不受调用方seq影响
+        self._order = deque()  # 按提交顺序排列的 (提交编号, 提交时间)
+        self._done = {}  # 提交编号 -> 结果字典
+        self._skipped = set()  # 已超时跳过的提交编号，之后返回的结果直接丢弃
+        self._lock = threading.Lock()  # submit和poll可以在不同线程中调用
+        self.available = None  # 工作进程中的识别器是否可用，启动完成前为None
+        self.submitted = 0
+        self.dropped_frames = 0  # 没有空闲槽位而丢弃的帧数
+        self.skipped_results = 0  # 超时未返回而跳过的帧数
+    
+    def start(self, timeout=60.0):
+        """启动工作进程并等待模型加载完成，返回识别器是否可用"""
+        if self._processes:
+            return self.available
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        for index in range(self.num_workers):
+            process = self._context.Process(target=_worker_main, name=f"inference-{index}", daemon=True,
+                                            args=(self.recognizer_factory, self._tasks, self._results))
+            process.start()
+            self._processes.append(process)
+        
+        ready = 0
+        available = True
+        deadline = time.monotonic() + timeout
+        while ready < self.num_workers:
+            try:
+                message = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if not all(process.is_alive() for process in self._processes):
+                    print(f"推理进程启动失败（{ready}/{self.num_workers} 个就绪）")
+                    available = False
+                    break
+                if time.monotonic() > deadline:
+                    print(f"推理进程启动超时（{ready}/{self.num_workers} 个就绪）")
+                    available = False
+                    break
+                continue
+            if message[0] == 'ready':
+                ready += 1
+                available = available and bool(message[2])
+        self.available = available
+        print(f"推理进程已启动: {ready} 个进程, {self.slots} 个共享内存槽位")
+        return available
+    
+    def close(self):
+        """停止工作进程并释放共享内存"""
+        if self._tasks is not None:
+            for _ in self._processes:
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        for ring in [self._ring] + [ring for ring, _ in self._retired.values()]:
+            if ring is not None:
+                ring.close()
+        self._ring = None
+        self._retired = {}
+        self._free.clear()
+        self._order.clear()
+        self._done.clear()
+        self._skipped.clear()
+    
+    def _ensure_ring(self, nbytes):
+        """槽位放不下当前帧时（例如切换到更高分辨率的摄像头）换用更大的共享内存"""
+        if self._ring is not None and self._ring.slot_bytes >= nbytes:
+            return
+        old = self._ring
+        if old is not None:
+            in_flight = self.slots - len(self._free)
+            if in_flight:
+                self._retired[old.name] = [old, in_flight]
+            else:
+                old.close()
+        self._ring = SharedFrameRing(self.slots, nbytes)
+        self._free = deque(range(self.slots))
+    
+    def submit(self, frame, seq, timestamp=None):
+        """提交一帧，seq随结果原样返回，不要求唯一；返回False表示没有空闲槽位、帧被丢弃"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            self._ensure_ring(frame.nbytes)
+            self._drain()
+            if not self._free:
+                self.dropped_frames += 1
+                return False
+            slot = self._free.popleft()
+            ring = self._ring
+            self._ticket += 1
+            ticket = self._ticket
+            self._order.append((ticket, time.monotonic()))
+            self.submitted += 1
+        ring.write(slot, frame)
+        self._tasks.put((ring.name, ring.slot_bytes, slot, frame.shape, ticket, seq, timestamp))
+        return True
+    
+    def pending(self):
+        """已提交但尚未按顺序返回的帧数"""
+        with self._lock:
+            return len(self._order)
+    
+    def _release(self, ring_name, slot):
+        if self._ring is not None and ring_name == self._ring.name:
+            self._free.append(slot)
+            return
+        retired = self._retired.get(ring_name)
+        if retired is not None:
+            retired[1] -= 1
+            if retired[1] <= 0:
+                retired[0].close()
+                del self._retired[ring_name]
+    
+    def _handle(self, message):
+        """处理工作进程返回的一条消息，调用方持有锁"""
+        if message[0] != 'result':
+            return
+        _, ring_name, slot, ticket, seq, timestamp, hands, inference_time, error = message
+        self._release(ring_name, slot)
+        if error is not None:
+            print(f"手势推理出错: {error}")
+        if ticket in self._skipped:
+            self._skipped.discard(ticket)
+            return
+        self._done[ticket] = {'seq': seq, 'timestamp': timestamp, 'hands': hands, 'inference_time': inference_time}
+    
+    def _drain(self):
+        """非阻塞地读取所有已返回的结果，调用方持有锁"""
+        while True:
+            try:
+                message = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._handle(message)
+    
+    def poll(self, timeout=0.0):
+        """按提交顺序返回已完成的结果列表，timeout大于0且下一帧尚未完成时最多等待这么久"""
+        with self._lock:
+            self._drain()
+            waiting = not self._order or self._order[0][0] not in self._done
+        if waiting and timeout > 0:
+            # 在锁外阻塞等待，不影响界面线程提交新帧
+            try:
+                message = self._results.get(timeout=timeout)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                with self._lock:
+                    self._handle(message)
+                    self._drain()
+        
+        ready = []
+        with self._lock:
+            now = time.monotonic()
+            while self._order:
+                ticket, submit_time = self._order[0]
+                result = self._done.pop(ticket, None)
+                if result is None:
+                    if now - submit_time < self.reorder_timeout:
+                        break
+                    # 结果迟迟未返回（工作进程异常退出等），跳过该帧，不阻塞后续结果
+                    self.skipped_results += 1
+                    self._skipped.add(ticket)
+                    self._order.popleft()
+                    continue
+                self._order.popleft()
+                if self.analyzer is not None:
+                    result['analysis'] = self.analyzer(result['hands'])
+                ready.append(result)
+        return ready
+
+
+def default_recognizer_factory(**options):
+    """返回在工作进程中创建GestureRecognizer的可pickle工厂，工作进程不做身份跟踪"""
+    from gesture_recognizer import GestureRecognizer
+    return partial(GestureRecognizer, lazy=True, hand_tracking=False, **options)
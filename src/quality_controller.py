@@ -0,0 +1,147 @@
+"""画质控制模块，根据实测的每帧处理时间自动调整推理开销，使处理时间保持在目标以内
+
+画质等级由QUALITY_LEVELS从高到低排列，每级是 (推理分辨率缩放, MediaPipe模型复杂度, 检测间隔帧数)。
+较弱的机器上处理跟不上帧率时逐级降低，性能有余量时逐级恢复；升降级都带有滞回，每次调整都会输出日志。
+"""
+
+import time
+from constants import QUALITY_TARGET_FRAME_MS, QUALITY_LEVELS, QUALITY_SMOOTHING, QUALITY_UPGRADE_RATIO, \
+    QUALITY_DOWNGRADE_FRAMES, QUALITY_UPGRADE_FRAMES, QUALITY_SETTLE_FRAMES
+
+
+class QualityController:
+    """画质控制器
+    
+    observe输入每次检测的处理耗时，除以检测间隔和并行的工作进程数，再加上每个捕获帧都要付出的固定开销
+    （例如界面线程的取帧和显示），得到摊到每个捕获帧上的耗时，指数平滑后与目标比较：连续downgrade_frames次超过目标时降一级，连续upgrade_frames次低于
+    目标的upgrade_ratio倍时升一级。每次调整后丢弃settle_frames次测量（模型重建等一次性开销）；
+    升级后很快又被迫降回时，再次升到该等级所需的次数加倍，避免在两个等级之间来回振荡。
+    
+    recognizer不为None时，推理分辨率和模型复杂度通过set_inference_quality应用到识别器；
+    检测间隔由调用方在每帧调用should_detect决定。
+    """
+    
+    def __init__(self, recognizer=None, target_ms=QUALITY_TARGET_FRAME_MS, levels=QUALITY_LEVELS, initial_level=0,
+                 parallelism=1, smoothing=QUALITY_SMOOTHING, upgrade_ratio=QUALITY_UPGRADE_RATIO,
+                 downgrade_frames=QUALITY_DOWNGRADE_FRAMES, upgrade_frames=QUALITY_UPGRADE_FRAMES,
+                 settle_frames=QUALITY_SETTLE_FRAMES):
+        self.recognizer = recognizer
+        self.target = target_ms / 1000.0  # 每帧处理时间目标（秒）
+        self.levels = tuple(levels)
+        self.parallelism = max(1, parallelism)  # 多进程推理时同时处理的帧数
+        self.smoothing = smoothing
+        self.upgrade_ratio = upgrade_ratio
+        self.downgrade_frames = downgrade_frames
+        self.upgrade_frames = upgrade_frames
+        self.settle_frames = settle_frames
+        self.level = max(0, min(len(self.levels) - 1, initial_level))
+        self.frame_time = None  # 平滑后的每帧耗时（秒）
+        self.history = []  # 每次调整的记录
+        self._over = 0  # 连续超出目标的测量次数
+        self._under = 0  # 连续低于升级阈值的测量次数
+        self._settle = 0  # 剩余需要丢弃的测量次数
+        self._backoff = [0] * len(self.levels)  # 各等级升级失败的次数
+        self._upgraded = False  # 当前等级是否由升级得到
+        self._since_change = 0  # 上次调整后的有效测量次数
+        self._frame_counter = 0
+        self._apply()
+    
+    @property
+    def inference_scale(self):
+        return self.levels[self.level][0]
+    
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][1]
+    
+    @property
+    def detection_interval(self):
+        return self.levels[self.level][2]
+    
+    def should_detect(self):
+        """按当前等级的检测间隔判断本帧是否运行检测"""
+        self._frame_counter += 1
+        if self._frame_counter >= self.detection_interval:
+            self._frame_counter = 0
+            return True
+        return False
+    
+    def observe(self, seconds, overhead=0.0):
+        """输入一次检测的处理耗时（秒），等级发生变化时返回True
+        
+        overhead为每个捕获帧上不随检测间隔和并行进程数摊薄的耗时（秒）
+        """
+        if self._settle > 0:
+            self._settle -= 1
+            return False
+        self._since_change += 1
+        frame_time = seconds / (self.detection_interval * self.parallelism) + overhead
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += self.smoothing * (frame_time - self.frame_time)
+        
+        if self.frame_time > self.target:
+            self._over += 1
+            self._under = 0
+            if self._over >= self.downgrade_frames and self.level < len(self.levels) - 1:
+                # 升级后不久就降回，说明该等级承受不了当前负载，下次升到该等级需要更长时间
+                if self._upgraded and self._since_change < self.upgrade_frames:
+                    self._backoff[self.level] = min(self._backoff[self.level] + 1, 5)
+                self._set_level(self.level + 1)
+                return True
+        elif self.frame_time < self.target * self.upgrade_ratio:
+            self._under += 1
+            self._over = 0
+            if self.level > 0 and self._under >= self.upgrade_frames * 2 ** self._backoff[self.level - 1]:
+                self._set_level(self.level - 1)
+                return True
+        else:
+            self._over = 0
+            self._under = 0
+        return False
+    
+    def _set_level(self, level):
+        previous_level = self.level
+        frame_ms = self.frame_time * 1000.0
+        self.level = level
+        self._upgraded = level < previous_level
+        self._over = 0
+        self._under = 0
+        self._since_change = 0
+        self._settle = self.settle_frames
+        self._frame_counter = 0
+        # 切换等级后耗时分布会整体变化，从新的测量重新开始平滑
+        self.frame_time = None
+        self._apply()
+        self.history.append({
+            'time': time.time(),
+            'from': previous_level,
+            'to': level,
+            'frame_ms': frame_ms,
+            'target_ms': self.target * 1000.0,
+        })
+        print(f"[画质] {'升级' if self._upgraded else '降级'}: 等级 {previous_level} → {level}, "
+              f"推理分辨率 x{self.inference_scale:g}, 模型复杂度 {self.model_complexity}, 每 {self.detection_interval} 帧检测一次 "
+              f"(每帧耗时 {frame_ms:.1f}ms, 目标 {self.target * 1000.0:.1f}ms)", flush=True)
+    
+    def _apply(self):
+        if self.recognizer is not None:
+            self.recognizer.set_inference_quality(self.inference_scale, self.model_complexity)
+    
+    def describe(self):
+        """当前等级的简短描述，用于HUD和统计输出"""
+        frame_ms = f"{self.frame_time * 1000.0:.1f}ms" if self.frame_time is not None else "-"
+        return (f"Q{self.level} x{self.inference_scale:g}/c{self.model_complexity}/1:{self.detection_interval} "
+                f"{frame_ms}")
+    
+    def get_stats(self):
+        return {
+            'level': self.level,
+            'inference_scale': self.inference_scale,
+            'model_complexity': self.model_complexity,
+            'detection_interval': self.detection_interval,
+            'frame_ms': self.frame_time * 1000.0 if self.frame_time is not None else None,
+            'target_ms': self.target * 1000.0,
+            'changes': len(self.history),
+        }
@@ -0,0 +1,373 @@
+"""远程鼠标模块，通过UDP把手势产生的鼠标事件从捕获主机发送到光标所在的主机
+
+每个数据包固定20字节（网络字节序）：
+    magic "RM" | 版本 (uint8) | 类型 (uint8) | 序号 (uint32) | 发送时间 (int64, 微秒) | a (int16) | b (int16)
+MOVE的a、b为相对位移，MOVE_TO为绝对坐标，SIZE为接收端屏幕尺寸，HEARTBEAT的a为发送端左键状态。
+每条鼠标事件占用一个序号，按键包重复发送时使用相同的序号。
+
+发送端UDPMouseSender实现与pyautogui相同的鼠标接口，可直接传给MouseController，灵敏度、滤波和
+手势状态机都在捕获端完成，网络上只传输最终的像素位移和按键事件。
+接收端RemoteMouseReceiver把数据包交给本机的MouseController：比已执行事件更旧的移动包直接丢弃，
+不会补发或重放；按键包按序号去重后总会执行，丢失的按键状态由心跳补齐。
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+from constants import REMOTE_PORT, REMOTE_BUTTON_REPEAT, REMOTE_HEARTBEAT_INTERVAL, REMOTE_TIMEOUT, \
+    REMOTE_SIZE_TIMEOUT, REMOTE_DEFAULT_SCREEN_SIZE
+
+
+PROTOCOL_MAGIC = b"RM"
+PROTOCOL_VERSION = 1
+PACKET = struct.Struct("!2sBBIqhh")
+
+# 数据包类型
+MOVE = 1
+MOVE_TO = 2
+CLICK = 3
+DOWN = 4
+UP = 5
+HELLO = 6
+SIZE = 7
+HEARTBEAT = 8
+
+MOTION_TYPES = (MOVE, MOVE_TO)
+BUTTON_TYPES = (CLICK, DOWN, UP)
+
+# int16能表示的最大位移，更大的相对移动拆成多个包
+MAX_DELTA = 32767
+
+
+def encode_packet(kind, seq, sent_us, a=0, b=0):
+    """编码一个数据包"""
+    return PACKET.pack(PROTOCOL_MAGIC, PROTOCOL_VERSION, kind, seq & 0xFFFFFFFF, sent_us, a, b)
+
+
+def decode_packet(data):
+    """解码数据包，返回 (类型, 序号, 发送时间微秒, a, b)，格式不符时返回None"""
+    if len(data) != PACKET.size:
+        return None
+    magic, version, kind, seq, sent_us, a, b = PACKET.unpack(data)
+    if magic != PROTOCOL_MAGIC or version != PROTOCOL_VERSION:
+        return None
+    return kind, seq, sent_us, a, b
+
+
+def monotonic_us():
+    return int(time.monotonic() * 1e6)
+
+
+def parse_address(text, default_host="0.0.0.0", default_port=REMOTE_PORT):
+    """解析 "主机:端口"、"主机" 或 "端口"，返回 (host, port)"""
+    text = str(text).strip()
+    if text.isdigit():
+        return default_host, int(text)
+    host, sep, port = text.rpartition(":")
+    if not sep:
+        return text, default_port
+    return host or default_host, int(port)
+
+
+class UDPMouseSender:
+    """远程鼠标发送端，实现 size / moveRel / moveTo / click / mouseDown / mouseUp 接口
+    
+    各方法只做一次非阻塞的sendto，不需要单独的注入线程。后台线程接收接收端返回的屏幕尺寸，
+    并周期性发送携带左键状态的心跳（尚未收到屏幕尺寸时改为重发HELLO）。
+    """
+    
+    timestamped_api = True  # 各方法接受timestamp参数，发送时记录端到端延迟
+    
+    def __init__(self, host, port=REMOTE_PORT, button_repeat=REMOTE_BUTTON_REPEAT,
+                 heartbeat_interval=REMOTE_HEARTBEAT_INTERVAL, size_timeout=REMOTE_SIZE_TIMEOUT):
+        self.address = (host, port)
+        self.button_repeat = max(1, button_repeat)
+        self.heartbeat_interval = heartbeat_interval
+        self.size_timeout = size_timeout
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.connect(self.address)
+        self.metrics = None  # 可选的LatencyMetrics，记录从帧捕获到发送的时间
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._last_heartbeat = time.monotonic()
+        self._screen_size = None
+        self._size_ready = threading.Event()
+        self.button_down = False  # 已发送的左键状态，随心跳发送
+        self.sent_packets = 0
+        self.send_errors = 0
+        self._running = True
+        self._send(HELLO, 0)
+        self._thread = threading.Thread(target=self._run, name="remote-mouse-sender", daemon=True)
+        self._thread.start()
+    
+    def size(self):
+        """返回接收端的屏幕尺寸，等待size_timeout秒仍未收到时使用REMOTE_DEFAULT_SCREEN_SIZE"""
+        if not self._size_ready.wait(self.size_timeout):
+            print(f"未收到远程接收端 {self.address[0]}:{self.address[1]} 的屏幕尺寸，"
+                  f"使用默认值 {REMOTE_DEFAULT_SCREEN_SIZE}")
+            return REMOTE_DEFAULT_SCREEN_SIZE
+        return self._screen_size
+    
+    def moveRel(self, dx, dy, timestamp=None):
+        dx, dy = int(dx), int(dy)
+        while dx or dy:
+            step_x = max(-MAX_DELTA, min(MAX_DELTA, dx))
+            step_y = max(-MAX_DELTA, min(MAX_DELTA, dy))
+            self._send_event(MOVE, step_x, step_y)
+            dx -= step_x
+            dy -= step_y
+        self._record("e2e_move", timestamp)
+    
+    def moveTo(self, x, y, timestamp=None):
+        self._send_event(MOVE_TO, max(0, min(MAX_DELTA, int(x))), max(0, min(MAX_DELTA, int(y))))
+        self._record("e2e_move", timestamp)
+    
+    def click(self, timestamp=None):
+        self._send_event(CLICK, repeat=self.button_repeat)
+        self._record("e2e_click", timestamp)
+    
+    def mouseDown(self, timestamp=None):
+        self.button_down = True
+        self._send_event(DOWN, repeat=self.button_repeat)
+        self._record("e2e_click", timestamp)
+    
+    def mouseUp(self, timestamp=None):
+        self.button_down = False
+        self._send_event(UP, repeat=self.button_repeat)
+    
+    def close(self):
+        """停止后台线程并关闭套接字"""
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.socket.close()
+    
+    def _record(self, stage, timestamp):
+        if self.metrics is not None and timestamp is not None:
+            self.metrics.record(stage, time.monotonic() - timestamp)
+    
+    def _send_event(self, kind, a=0, b=0, repeat=1):
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        for _ in range(repeat):
+            self._send(kind, seq, a, b)
+    
+    def _send(self, kind, seq, a=0, b=0):
+        try:
+            self.socket.send(encode_packet(kind, seq, monotonic_us(), a, b))
+            self.sent_packets += 1
+        except OSError:
+            # 接收端未启动时本机会收到ICMP端口不可达，不影响后续发送
+            self.send_errors += 1
+    
+    def _run(self):
+        while self._running:
+            try:
+                readable, _, _ = select.select([self.socket], [], [], self.heartbeat_interval)
+            except (OSError, ValueError):
+                break
+            if readable:
+                try:
+                    data = self.socket.recv(PACKET.size)
+                except OSError:
+                    continue
+                packet = decode_packet(data)
+                if packet is not None and packet[0] == SIZE:
+                    if self._screen_size is None:
+                        print(f"已连接远程接收端 {self.address[0]}:{self.address[1]}，屏幕 {packet[3]}x{packet[4]}")
+                    self._screen_size = (packet[3], packet[4])
+                    self._size_ready.set()
+            if self._running and time.monotonic() - self._last_heartbeat >= self.heartbeat_interval:
+                self._last_heartbeat = time.monotonic()
+                if self._screen_size is None:
+                    self._send(HELLO, 0)
+                else:
+                    # 心跳使用最近一个事件的序号，接收端据此判断它是否比已执行的按键更新
+                    self._send(HEARTBEAT, self._seq, int(self.button_down))
+
+
+class RemoteMouseReceiver:
+    """远程鼠标接收端，把收到的事件交给本机的MouseController
+    
+    同一时间只服务一个发送端：收到HELLO的地址成为当前发送端并重置序号，之前没有发送端时
+    接受第一个发来事件的地址。移动包的序号不大于已执行的最新事件时视为迟到并丢弃；
+    按键包序号大于上一个已执行的按键时执行，重复和更旧的按键包丢弃。
+    
+    same_clock为True时（回环测试，两端共用同一个单调时钟）直接用 接收时间-发送时间 作为单向延迟；
+    不同主机的时钟不可比，此时以观察到的最小差值为零点，记录的是超出最快包的排队延迟。
+    """
+    
+    def __init__(self, mouse_controller, host="0.0.0.0", port=REMOTE_PORT, same_clock=False, metrics=None,
+                 timeout=REMOTE_TIMEOUT):
+        self.mouse_controller = mouse_controller
+        self.metrics = metrics
+        self.same_clock = same_clock
+        self.timeout = timeout
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+        self.peer = None  # 当前发送端地址
+        self.running = False
+        self._clock_offset = None  # 本机时钟 - 发送端时钟（秒）
+        self._reset_sequence()
+        self.received = 0  # 收到的有效数据包数
+        self.moves = 0  # 执行的移动事件数
+        self.buttons = 0  # 执行的按键事件数
+        self.late = 0  # 迟到而丢弃的移动包数
+        self.duplicates = 0  # 重复或更旧而丢弃的按键包数
+        self.lost = 0  # 序号缺口中始终没有到达的事件数（估计值）
+        self.recovered = 0  # 由心跳补齐的按键状态次数
+        self.invalid = 0  # 格式不符或来自其他发送端的包数
+    
+    def _reset_sequence(self):
+        self.last_seq = 0  # 已执行的最新事件序号
+        self.last_button_seq = 0  # 已执行的最新按键事件序号
+        self.highest_seq = 0  # 收到过的最大序号
+        self.last_packet_time = time.monotonic()
+    
+    def handle_packet(self, data, address, received=None):
+        """处理一个数据包，received为接收时间（time.monotonic()），返回是否执行了鼠标事件"""
+        if received is None:
+            received = time.monotonic()
+        packet = decode_packet(data)
+        if packet is None:
+            self.invalid += 1
+            return False
+        kind, seq, sent_us, a, b = packet
+        
+        if kind == HELLO:
+            if self.peer != address:
+                print(f"远程发送端已连接: {address[0]}:{address[1]}")
+            self.peer = address
+            self._reset_sequence()
+            self._clock_offset = None
+            width, height = self.mouse_controller.screen_size()
+            self.socket.sendto(encode_packet(SIZE, 0, monotonic_us(), width, height), address)
+            return False
+        if self.peer is None:
+            self.peer = address
+        elif address != self.peer:
+            self.invalid += 1
+            return False
+        self.received += 1
+        self.last_packet_time = received
+        timestamp = self._local_time(sent_us / 1e6, received)
+        
+        if kind == HEARTBEAT:
+            return self._reconcile_button(seq, bool(a), timestamp)
+        if kind not in MOTION_TYPES and kind not in BUTTON_TYPES:
+            self.invalid += 1
+            return False
+        
+        # 序号缺口：跳过的事件可能稍后迟到，迟到时再从lost中扣除
+        if seq > self.highest_seq:
+            self.lost += seq - self.highest_seq - 1
+            self.highest_seq = seq
+        
+        if kind in MOTION_TYPES:
+            if seq <= self.last_seq:
+                self.late += 1
+                self.lost = max(0, self.lost - 1)
+                return False
+            self.last_seq = seq
+            if kind == MOVE:
+                self.mouse_controller.move_mouse_pixels(a, b, timestamp)
+            else:
+                self.mouse_controller.move_mouse_absolute(a, b, timestamp)
+            self.moves += 1
+            return True
+        
+        if seq <= self.last_button_seq:
+            self.duplicates += 1
+            return False
+        if seq < self.highest_seq:
+            self.lost = max(0, self.lost - 1)
+        self.last_button_seq = seq
+        self.last_seq = max(self.last_seq, seq)
+        if kind == DOWN:
+            self.mouse_controller.mouse_down(timestamp)
+        elif kind == UP:
+            self.mouse_controller.mouse_up(timestamp)
+        else:
+            self.mouse_controller.left_click(timestamp)
+        self.buttons += 1
+        return True
+    
+    def _local_time(self, sent, received):
+        """把发送时间换算到本机时钟，并记录单向延迟"""
+        if self.same_clock:
+            offset = 0.0
+        else:
+            offset = received - sent
+            if self._clock_offset is not None:
+                offset = min(offset, self._clock_offset)
+            self._clock_offset = offset
+        if self.metrics is not None:
+            self.metrics.record("network", max(0.0, received - sent - offset))
+        return sent + offset
+    
+    def _reconcile_button(self, seq, down, timestamp):
+        """心跳中的左键状态比已执行的按键更新且与本机不一致时补齐，例如按键包全部丢失"""
+        if seq < self.last_button_seq or down == self.mouse_controller.button_down:
+            return False
+        self.last_button_seq = seq
+        if down:
+            self.mouse_controller.mouse_down(timestamp)
+        else:
+            self.mouse_controller.mouse_up(timestamp)
+        self.recovered += 1
+        return True
+    
+    def poll(self, timeout=REMOTE_HEARTBEAT_INTERVAL):
+        """最多等待timeout秒，处理所有已到达的数据包，返回处理的包数"""
+        handled = 0
+        readable, _, _ = select.select([self.socket], [], [], timeout)
+        while readable:
+            try:
+                data, address = self.socket.recvfrom(PACKET.size + 1)
+            except OSError:
+                break
+            self.handle_packet(data, address)
+            handled += 1
+            readable, _, _ = select.select([self.socket], [], [], 0)
+        # 发送端长时间没有消息（进程退出或网络中断）时不能让左键一直按着
+        if self.mouse_controller.button_down and time.monotonic() - self.last_packet_time > self.timeout:
+            print("远程发送端超时，释放左键")
+            self.mouse_controller.mouse_up()
+        return handled
+    
+    def run(self, stats_interval=None):
+        """运行接收循环直到stop被调用，stats_interval不为空时周期性输出统计"""
+        self.running = True
+        last_stats = time.monotonic()
+        print(f"远程鼠标接收端已启动: 监听 {self.address[0]}:{self.address[1]}", flush=True)
+        while self.running:
+            self.poll()
+            if stats_interval and time.monotonic() - last_stats >= stats_interval:
+                last_stats = time.monotonic()
+                stats = self.get_stats()
+                print(f"[远程] 收到 {stats['received']} 包, 移动 {stats['moves']}, 按键 {stats['buttons']}, "
+                      f"迟到丢弃 {stats['late']}, 重复 {stats['duplicates']}, 丢失 {stats['lost']}, "
+                      f"心跳补齐 {stats['recovered']}", flush=True)
+    
+    def stop(self, *_):
+        """请求停止接收循环（可作为信号处理函数）"""
+        self.running = False
+    
+    def close(self):
+        self.socket.close()
+    
+    def get_stats(self):
+        return {
+            'peer': self.peer,
+            'received': self.received,
+            'moves': self.moves,
+            'buttons': self.buttons,
+            'late': self.late,
+            'duplicates': self.duplicates,
+            'lost': self.lost,
+            'recovered': self.recovered,
+            'invalid': self.invalid,
+        }
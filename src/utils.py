@@ -1,6 +1,5 @@
 """工具函数模块"""
 
-import cv2
 import numpy as np
 from PySide6.QtGui import QImage
 
@@ -35,11 +34,18 @@ def get_screen_size():
 
 
 def convert_cv_to_qt_image(cv_image):
-    """将OpenCV图像转换为Qt图像"""
-    rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-    h, w, ch = rgb_image.shape
-    bytes_per_line = ch * w
-    qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
+    """将OpenCV的BGR图像包装为Qt图像
+    
+    使用Format_BGR888直接引用原始数据，不做颜色转换和拷贝，调用方需要在QImage使用期间保持cv_image存活
+    """
+    if not cv_image.flags['C_CONTIGUOUS']:
+        # 非连续内存（例如切片视图）只能先拷贝，此时让QImage持有自己的数据
+        contiguous = np.ascontiguousarray(cv_image)
+        h, w, _ = contiguous.shape
+        return QImage(contiguous.data, w, h, contiguous.strides[0], QImage.Format_BGR888).copy()
+    h, w, _ = cv_image.shape
+    bytes_per_line = cv_image.strides[0]
+    qt_image = QImage(cv_image.data, w, h, bytes_per_line, QImage.Format_BGR888)
     return qt_image
 
 
@@ -0,0 +1,130 @@
+"""视频预览控件模块，负责以最少的拷贝和缩放开销显示摄像头画面"""
+
+import time
+from PySide6.QtWidgets import QWidget, QSizePolicy
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QPainter, QColor
+
+from utils import convert_cv_to_qt_image
+from hud_overlay import draw_hand_skeletons
+
+
+class _VideoPaintMixin:
+    """预览控件的公共绘制逻辑
+    
+    直接用BGR888格式的QImage包装OpenCV帧，不做颜色转换也不生成QPixmap；
+    保持宽高比的目标矩形只在控件或帧尺寸变化时重新计算，缩放由QPainter在绘制时完成。
+    HUD文字层和手部骨架在绘制时叠加到画面之上，不修改帧数据。
+    """
+    
+    def _init_video(self):
+        self._frame = None  # 保持对帧数据的引用，QImage不拥有这块内存
+        self._image = None
+        self._text = ""
+        self._image_size = None
+        self._target_rect = QRect()
+        self._overlay = None  # HudOverlay
+        self._hands = []  # 归一化坐标的手部关键点数组列表
+        self.smooth_scaling = True
+        self.metrics = None  # 可选的LatencyMetrics，记录每次绘制耗时
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    
+    def set_frame(self, frame):
+        """显示一帧BGR图像"""
+        self._frame = frame
+        self._image = convert_cv_to_qt_image(frame)
+        self._text = ""
+        size = (self._image.width(), self._image.height())
+        if size != self._image_size:
+            self._image_size = size
+            self._update_target_rect()
+        self.update()
+    
+    def set_overlay(self, overlay):
+        """设置HUD文字层"""
+        self._overlay = overlay
+        self.update()
+    
+    def set_hands(self, hands):
+        """设置要绘制的手部骨架"""
+        self._hands = hands
+        self.update()
+    
+    def setText(self, text):
+        """清除画面并显示文字"""
+        self._frame = None
+        self._image = None
+        self._text = text
+        self.update()
+    
+    def clear(self):
+        self.setText("")
+    
+    def _update_target_rect(self):
+        """按保持宽高比的方式计算画面在控件中的绘制区域"""
+        if self._image_size is None:
+            return
+        image_width, image_height = self._image_size
+        scale = min(self.width() / image_width, self.height() / image_height)
+        width, height = int(image_width * scale), int(image_height * scale)
+        self._target_rect = QRect((self.width() - width) // 2, (self.height() - height) // 2, width, height)
+    
+    def _paint_video(self):
+        start_time = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().window())
+        if self._image is not None:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, self.smooth_scaling)
+            painter.drawImage(self._target_rect, self._image)
+            draw_hand_skeletons(painter, self._hands, self._target_rect)
+            if self._overlay is not None:
+                hud = self._overlay.image()
+                if hud is not None:
+                    painter.drawImage(self._target_rect.topLeft(), hud)
+        elif self._text:
+            painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+        painter.setPen(QColor("gray"))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
+        if self.metrics is not None and self._image is not None:
+            self.metrics.record("render", time.perf_counter() - start_time)
+
+
+class VideoWidget(_VideoPaintMixin, QWidget):
+    """基于QPainter的视频预览控件"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_video()
+    
+    def paintEvent(self, event):
+        self._paint_video()
+    
+    def resizeEvent(self, event):
+        self._update_target_rect()
+        super().resizeEvent(event)
+
+
+def create_video_widget(use_opengl=False, parent=None):
+    """创建视频预览控件，use_opengl为True时由OpenGL负责缩放，不可用时回退到普通控件"""
+    if use_opengl:
+        try:
+            from PySide6.QtOpenGLWidgets import QOpenGLWidget
+        except ImportError:
+            print("QOpenGLWidget不可用，使用普通预览控件")
+        else:
+            class GLVideoWidget(_VideoPaintMixin, QOpenGLWidget):
+                """基于QOpenGLWidget的视频预览控件，缩放在GPU上完成"""
+                
+                def __init__(self, parent=None):
+                    super().__init__(parent)
+                    self._init_video()
+                
+                def paintGL(self):
+                    self._paint_video()
+                
+                def resizeGL(self, width, height):
+                    self._update_target_rect()
+            
+            return GLVideoWidget(parent)
+    return VideoWidget(parent)